@@ -5,10 +5,16 @@ PLC API for SAMABOT UI Light
 
 API Flask para comunicación con PLC Siemens que puede ser integrado
 con la interfaz web de SAMABOT UI Light.
+
+En producción se ejecuta con un solo worker para que el servicio PLC
+sea compartido entre todos los hilos:
+
+    gunicorn -k gthread -w 1 --threads 8 -b 0.0.0.0:5001 plc_api:app
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, request
 from flask_cors import CORS
+import orjson
 import sys
 import os
 import threading
@@ -22,33 +28,106 @@ from plc_service import PLCService
 app = Flask(__name__)
 CORS(app)  # Permitir CORS para la interfaz web
 
-# Variable global para el servicio PLC
-plc_service = None
-plc_lock = threading.Lock()
+# Servicio PLC publicado: los lectores lo cargan sin lock y update_config lo
+# reemplaza con una única reasignación atómica del atributo del módulo
+plc_service = PLCService()
+plc_lock = threading.Lock()  # Solo serializa reconfiguraciones
+
+# Última instantánea de datos publicada por el poller en background
+SNAPSHOT_INTERVAL = 0.2  # segundos
+_latest_snapshot = None
+
+# Caché con TTL de la instantánea y de sus respuestas ya serializadas
+SNAPSHOT_TTL = 0.1  # segundos
+_cache = {'t': 0.0, 'data': None, 'json': {}}
+_cache_lock = threading.Lock()
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+def _ojson(payload, status=200):
+    """Construye una respuesta JSON serializada con orjson."""
+    return app.response_class(
+        orjson.dumps(payload, option=ORJSON_OPTIONS),
+        status=status,
+        mimetype='application/json'
+    )
+
+def _raw_json(body, status=200):
+    """Construye una respuesta JSON a partir de bytes ya serializados."""
+    return app.response_class(body, status=status, mimetype='application/json')
+
+# Respuestas estáticas serializadas una sola vez al importar el módulo
+_RESP_CONNECT_OK = orjson.dumps({
+    "success": True,
+    "message": "PLC conectado exitosamente"
+})
+_RESP_CONNECT_FAILED = orjson.dumps({
+    "success": False,
+    "error": "No se pudo conectar al PLC"
+})
+_RESP_DISCONNECT_OK = orjson.dumps({
+    "success": True,
+    "message": "PLC desconectado"
+})
+_RESP_OUTPUT_MISSING = orjson.dumps({
+    "success": False,
+    "error": "Se requiere 'output' y 'value'"
+})
 
 def get_plc_service():
-    """Obtiene o crea el servicio PLC."""
-    global plc_service
-    with plc_lock:
-        if plc_service is None:
-            plc_service = PLCService()
-        return plc_service
+    """Obtiene el servicio PLC publicado actualmente."""
+    return plc_service
+
+def _snapshot_poller():
+    """Refresca periódicamente la instantánea de datos del PLC."""
+    global _latest_snapshot
+    while True:
+        try:
+            # Reasignación atómica: los lectores ven la instantánea vieja o la nueva
+            _latest_snapshot = get_plc_service().get_data()
+        except Exception as e:
+            print(f"⚠️ Error actualizando instantánea del PLC: {e}")
+        time.sleep(SNAPSHOT_INTERVAL)
+
+def get_snapshot():
+    """Obtiene la última instantánea sin tocar el PLC ni tomar locks."""
+    snapshot = _latest_snapshot
+    if snapshot is None:
+        snapshot = get_plc_service().get_data()
+    return snapshot
+
+def _get_cached_snapshot(ttl=SNAPSHOT_TTL):
+    """Obtiene la instantánea y sus respuestas serializadas, compartidas durante el TTL."""
+    with _cache_lock:
+        now = time.monotonic()
+        if _cache['data'] is None or now - _cache['t'] >= ttl:
+            _cache['data'] = get_snapshot()
+            _cache['json'] = {}
+            _cache['t'] = now
+        return _cache['data'], _cache['json']
+
+def _cached_data_response(section=None):
+    """Respuesta {"success": True, "data": ...} reutilizando los bytes ya serializados."""
+    data, serialized = _get_cached_snapshot()
+    body = serialized.get(section)
+    if body is None:
+        payload = data if section is None else data[section]
+        body = orjson.dumps({"success": True, "data": payload}, option=ORJSON_OPTIONS)
+        serialized[section] = body
+    return _raw_json(body)
+
+threading.Thread(target=_snapshot_poller, daemon=True).start()
 
 @app.route('/api/plc/status', methods=['GET'])
 def get_plc_status():
     """Obtiene el estado actual del PLC."""
     try:
-        plc = get_plc_service()
-        data = plc.get_data()
-        return jsonify({
-            "success": True,
-            "data": data
-        })
+        return _cached_data_response()
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/connect', methods=['POST'])
 def connect_plc():
@@ -59,21 +138,15 @@ def connect_plc():
         
         if success:
             plc.start_monitoring()
-            return jsonify({
-                "success": True,
-                "message": "PLC conectado exitosamente"
-            })
+            return _raw_json(_RESP_CONNECT_OK)
         else:
-            return jsonify({
-                "success": False,
-                "error": "No se pudo conectar al PLC"
-            }), 400
+            return _raw_json(_RESP_CONNECT_FAILED, 400)
             
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/disconnect', methods=['POST'])
 def disconnect_plc():
@@ -81,175 +154,150 @@ def disconnect_plc():
     try:
         plc = get_plc_service()
         plc.disconnect()
-        return jsonify({
-            "success": True,
-            "message": "PLC desconectado"
-        })
+        return _raw_json(_RESP_DISCONNECT_OK)
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/output', methods=['POST'])
 def write_output():
     """Escribe una salida digital."""
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data())
         output = data.get('output')
         value = data.get('value')
         
         if output is None or value is None:
-            return jsonify({
-                "success": False,
-                "error": "Se requiere 'output' y 'value'"
-            }), 400
+            return _raw_json(_RESP_OUTPUT_MISSING, 400)
         
         plc = get_plc_service()
         success = plc.write_output(output, bool(value))
         
         if success:
-            return jsonify({
+            return _ojson({
                 "success": True,
                 "message": f"{output} = {'ON' if value else 'OFF'}"
             })
         else:
-            return jsonify({
+            return _ojson({
                 "success": False,
                 "error": f"No se pudo escribir {output}"
-            }), 400
+            }, 400)
             
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/outputs', methods=['POST'])
 def write_multiple_outputs():
     """Escribe múltiples salidas digitales."""
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data())
         outputs = data.get('outputs', {})
         
         if not outputs:
-            return jsonify({
+            return _ojson({
                 "success": False,
                 "error": "Se requiere 'outputs' con formato {'A0.0': true, 'A0.1': false}"
-            }), 400
+            }, 400)
         
         plc = get_plc_service()
-        results = {}
-        
-        for output, value in outputs.items():
-            success = plc.write_output(output, bool(value))
-            results[output] = success
+        results = plc.write_outputs(outputs)
         
-        return jsonify({
+        return _ojson({
             "success": True,
             "results": results
         })
             
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/inputs', methods=['GET'])
 def get_inputs():
     """Obtiene el estado de las entradas digitales."""
     try:
-        plc = get_plc_service()
-        data = plc.get_data()
-        return jsonify({
-            "success": True,
-            "data": data['inputs']
-        })
+        return _cached_data_response('inputs')
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/outputs', methods=['GET'])
 def get_outputs():
     """Obtiene el estado de las salidas digitales."""
     try:
-        plc = get_plc_service()
-        data = plc.get_data()
-        return jsonify({
-            "success": True,
-            "data": data['outputs']
-        })
+        return _cached_data_response('outputs')
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/analog', methods=['GET'])
 def get_analog():
     """Obtiene los valores analógicos."""
     try:
-        plc = get_plc_service()
-        data = plc.get_data()
-        return jsonify({
-            "success": True,
-            "data": data['analog']
-        })
+        return _cached_data_response('analog')
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/config', methods=['POST'])
 def update_config():
     """Actualiza la configuración del PLC."""
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data())
         ip = data.get('ip', '192.168.1.5')
         rack = data.get('rack', 0)
         slot = data.get('slot', 1)
         
         global plc_service
         with plc_lock:
-            if plc_service:
-                plc_service.disconnect()
-            plc_service = PLCService(ip, rack, slot)
+            new_service = PLCService(ip, rack, slot)
+            old_service = plc_service
+            old_service.disconnect()
+            plc_service = new_service
         
-        return jsonify({
+        return _ojson({
             "success": True,
             "message": f"Configuración actualizada: {ip}:{rack}:{slot}"
         })
             
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 @app.route('/api/plc/health', methods=['GET'])
 def health_check():
     """Health check del API."""
     try:
-        plc = get_plc_service()
-        data = plc.get_data()
+        info = get_plc_service().get_connection_info()
         
-        return jsonify({
+        return _ojson({
             "success": True,
             "status": "healthy",
-            "plc_connected": data['connection']['status'] == 'connected',
-            "uptime": data['connection']['uptime'],
-            "last_update": data['connection']['last_update']
+            "plc_connected": info['status'] == 'connected',
+            "uptime": info['uptime'],
+            "last_update": info['last_update']
         })
     except Exception as e:
-        return jsonify({
+        return _ojson({
             "success": False,
             "status": "unhealthy",
             "error": str(e)
-        }), 500
+        }, 500)
 
 if __name__ == '__main__':
     print("🚀 Iniciando PLC API...")
@@ -264,5 +312,6 @@ if __name__ == '__main__':
     print("  POST /api/plc/config     - Actualizar configuración")
     print("  GET  /api/plc/health     - Health check")
     print("\n🌐 API iniciada en http://localhost:5001")
+    print("💡 En producción: gunicorn -k gthread -w 1 --threads 8 -b 0.0.0.0:5001 plc_api:app")
     
-    app.run(host='0.0.0.0', port=5001, debug=True) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5001, threaded=True) 
\ No newline at end of file
@@ -0,0 +1,42 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Decodificador compilado de buffers S7
+=====================================
+
+Extrae bits y words big-endian de los buffers leídos por área usando
+las tablas de offsets precalculadas por IndustrialMonitor.
+
+Compilar con:
+    cythonize -i _snapshot.pyx
+"""
+
+
+cpdef list decode_bits(const unsigned char[:] buf,
+                       const Py_ssize_t[:] offsets,
+                       const unsigned char[:] masks):
+    """Devuelve el valor de cada bit definido por (offset, máscara)."""
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n = offsets.shape[0]
+    cdef bint value
+    cdef list out = [False] * n
+
+    for i in range(n):
+        value = (buf[offsets[i]] & masks[i]) != 0
+        out[i] = value
+
+    return out
+
+
+cpdef list decode_words_be(const unsigned char[:] buf,
+                           const Py_ssize_t[:, ::1] indices):
+    """Devuelve cada word con signo (big-endian) definida por sus dos índices de byte."""
+    cdef Py_ssize_t i
+    cdef Py_ssize_t n = indices.shape[0]
+    cdef short value
+    cdef list out = [0] * n
+
+    for i in range(n):
+        value = <short>((buf[indices[i, 0]] << 8) | buf[indices[i, 1]])
+        out[i] = value
+
+    return out
@@ -19,6 +19,8 @@ import sys
 from typing import Dict, Any
 from datetime import datetime
 
+import numpy as np
+
 # Importar el esqueleto industrial
 from siemens_plc import (
     SiemensPLC, 
@@ -29,12 +31,50 @@ from siemens_plc import (
 )
 from snap7 import Area
 
+# Áreas enlazadas como constantes del módulo (evita LOAD_ATTR en cada lectura)
+AREA_PE = Area.PE
+AREA_PA = Area.PA
+AREA_MK = Area.MK
+AREA_DB = Area.DB
+
+try:
+    # Decodificador compilado opcional (cythonize -i _snapshot.pyx)
+    from _snapshot import decode_bits, decode_words_be
+    CYTHON_DECODER_AVAILABLE = True
+except ImportError:
+    CYTHON_DECODER_AVAILABLE = False
+
+try:
+    # Alternativa sin compilación previa: Numba genera el código en la primera llamada
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _jit_decode_bits(buf, offsets, masks, out):
+        """Extrae cada bit definido por (offset, máscara) en el array de salida."""
+        for i in range(offsets.size):
+            out[i] = (buf[offsets[i]] & masks[i]) != 0
+    
+    @njit(cache=True)
+    def _jit_decode_words_be(buf, indices, out):
+        """Extrae words con signo (big-endian) en el array de salida."""
+        for i in range(indices.shape[0]):
+            value = (buf[indices[i, 0]] << 8) | buf[indices[i, 1]]
+            if value >= 0x8000:
+                value -= 0x10000
+            out[i] = value
+
 
 class IndustrialMonitor:
     """Monitor industrial completo para PLC Siemens."""
     
-    def __init__(self, plc_ip: str = "192.168.1.5"):
+    def __init__(self, plc_ip: str = "192.168.1.5", poll_interval: float = 0.2):
         self.plc_ip = plc_ip
+        self.poll_interval = poll_interval  # segundos
         self.running = False
         
         # Configurar PLC con reconexión automática
@@ -71,16 +111,74 @@ class IndustrialMonitor:
             "data_blocks": ["DB1.DBW0", "DB1.DBW2", "DB1.DBW4"]
         }
         
-        # Datos en tiempo real
-        self.real_time_data = {
-            "digital_inputs": {},
-            "digital_outputs": {},
-            "analog_inputs": {},
-            "analog_outputs": {},
-            "marks": {},
-            "data_blocks": {}
+        # Direcciones parseadas una sola vez a tuplas de enteros
+        config = self.monitoring_config
+        self._parsed = {
+            "digital_inputs": [(a, *self._parse_bit_address(a)) for a in config["digital_inputs"]],
+            "digital_outputs": [(a, *self._parse_bit_address(a)) for a in config["digital_outputs"]],
+            "marks": [(a, *self._parse_bit_address(a)) for a in config["marks"]],
+            "analog_inputs": [(a, self._parse_word_address(a)) for a in config["analog_inputs"]],
+            "analog_outputs": [(a, self._parse_word_address(a)) for a in config["analog_outputs"]],
+            "data_blocks": [(a, *self._parse_db_address(a)) for a in config["data_blocks"]]
+        }
+        
+        # Rangos de bytes por área: una sola lectura por área en cada ciclo
+        parsed = self._parsed
+        self._read_spans = {
+            AREA_PE: self._compute_span(
+                [(byte, 1) for _, byte, _ in parsed["digital_inputs"]] +
+                [(byte, 2) for _, byte in parsed["analog_inputs"]]
+            ),
+            AREA_PA: self._compute_span(
+                [(byte, 1) for _, byte, _ in parsed["digital_outputs"]] +
+                [(byte, 2) for _, byte in parsed["analog_outputs"]]
+            ),
+            AREA_MK: self._compute_span(
+                [(byte, 1) for _, byte, _ in parsed["marks"]]
+            )
+        }
+        
+        # Tablas de decodificación vectorizada (offsets relativos a cada rango)
+        self._bit_tables = {
+            key: self._build_bit_table(parsed[key], self._read_spans[area][0])
+            for key, area in (("digital_inputs", AREA_PE),
+                              ("digital_outputs", AREA_PA),
+                              ("marks", AREA_MK))
+        }
+        self._word_tables = {
+            key: self._build_word_table(parsed[key], self._read_spans[area][0])
+            for key, area in (("analog_inputs", AREA_PE),
+                              ("analog_outputs", AREA_PA))
+        }
+        
+        # Una lectura por número de DB cubriendo todas sus variables
+        db_groups = {}
+        for address, db_number, byte in parsed["data_blocks"]:
+            db_groups.setdefault(db_number, []).append((address, byte))
+        self._db_reads = []
+        for db_number, entries in db_groups.items():
+            start, size = self._compute_span([(byte, 2) for _, byte in entries])
+            self._db_reads.append(
+                (db_number, start, size, self._build_word_table(entries, start))
+            )
+        
+        # Datos en tiempo real: arrays estables (uno por tabla) en orden de categoría
+        self._tables_by_key = {
+            "digital_inputs": [self._bit_tables["digital_inputs"]],
+            "digital_outputs": [self._bit_tables["digital_outputs"]],
+            "analog_inputs": [self._word_tables["analog_inputs"]],
+            "analog_outputs": [self._word_tables["analog_outputs"]],
+            "marks": [self._bit_tables["marks"]],
+            "data_blocks": [table for _, _, _, table in self._db_reads]
         }
         
+        # Detección de cambios: bits empaquetados y words del ciclo anterior
+        self._bit_arrays = [table[-1] for table in self._bit_tables.values()]
+        self._word_arrays = [table[-1] for table in self._word_tables.values()]
+        self._word_arrays += [table[-1] for _, _, _, table in self._db_reads]
+        self._prev_packed_bits = None
+        self._prev_words = None
+        
         print("🏭 Monitor Industrial Siemens Inicializado")
         print("=" * 50)
     
@@ -123,17 +221,20 @@ class IndustrialMonitor:
         print("📍 Presiona Ctrl+C para detener")
         print("-" * 50)
         
+        # Planificación sobre reloj monotónico para evitar deriva acumulada
+        period = self.poll_interval
+        next_tick = time.monotonic() + period
+        
         while self.running:
             try:
                 if self.plc.is_connected():
                     # Actualizar datos en tiempo real
                     self._update_real_time_data()
                     
-                    # Mostrar estado del sistema
-                    self._display_system_status()
-                    
-                    # Mostrar datos críticos
-                    self._display_critical_data()
+                    # Mostrar estado y datos críticos solo si algo cambió
+                    if self._detect_changes():
+                        self._display_system_status()
+                        self._display_critical_data()
                     
                     # Actualizar estado
                     self.system_status["last_update"] = datetime.now()
@@ -142,8 +243,16 @@ class IndustrialMonitor:
                 else:
                     print("⚠️ PLC desconectado, esperando reconexión...")
                 
-                # Pausa entre actualizaciones
-                time.sleep(1.0)
+                # Esperar hasta el siguiente tick del periodo
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                    next_tick += period
+                elif delay < -period:
+                    # Atrasados más de un periodo: saltar los ticks perdidos
+                    next_tick = time.monotonic() + period
+                else:
+                    next_tick += period
                 
             except KeyboardInterrupt:
                 break
@@ -154,122 +263,143 @@ class IndustrialMonitor:
     def _update_real_time_data(self):
         """Actualiza los datos en tiempo real."""
         try:
-            # Leer entradas digitales
-            for address in self.monitoring_config["digital_inputs"]:
-                value = self._read_digital_input(address)
-                self.real_time_data["digital_inputs"][address] = value
-            
-            # Leer salidas digitales
-            for address in self.monitoring_config["digital_outputs"]:
-                value = self._read_digital_output(address)
-                self.real_time_data["digital_outputs"][address] = value
+            # Enlazar a variables locales lo que se usa en cada ciclo
+            read_span = self._read_span
+            decode_bits = self._decode_bits
+            decode_words = self._decode_words
+            bit_tables = self._bit_tables
+            word_tables = self._word_tables
             
-            # Leer entradas analógicas
-            for address in self.monitoring_config["analog_inputs"]:
-                value = self._read_analog_input(address)
-                self.real_time_data["analog_inputs"][address] = value
+            # Leer cada área completa una sola vez
+            pe_data = read_span(AREA_PE)
+            pa_data = read_span(AREA_PA)
+            mk_data = read_span(AREA_MK)
             
-            # Leer salidas analógicas
-            for address in self.monitoring_config["analog_outputs"]:
-                value = self._read_analog_output(address)
-                self.real_time_data["analog_outputs"][address] = value
+            # Decodificar entradas/salidas digitales y marcas
+            decode_bits(bit_tables["digital_inputs"], pe_data)
+            decode_bits(bit_tables["digital_outputs"], pa_data)
+            decode_bits(bit_tables["marks"], mk_data)
             
-            # Leer marcas
-            for address in self.monitoring_config["marks"]:
-                value = self._read_mark(address)
-                self.real_time_data["marks"][address] = value
+            # Decodificar entradas/salidas analógicas
+            decode_words(word_tables["analog_inputs"], pe_data)
+            decode_words(word_tables["analog_outputs"], pa_data)
             
-            # Leer bloques de datos
-            for address in self.monitoring_config["data_blocks"]:
-                value = self._read_data_block(address)
-                self.real_time_data["data_blocks"][address] = value
+            # Leer bloques de datos (una lectura por DB)
+            read_data_block = self._read_data_block
+            for db_number, start, size, table in self._db_reads:
+                decode_words(table, read_data_block(db_number, start, size))
                 
         except Exception as e:
             print(f"⚠️ Error actualizando datos: {e}")
     
-    def _read_digital_input(self, address: str) -> bool:
-        """Lee una entrada digital."""
-        try:
-            # Parsear dirección (ej: "I0.0" -> byte=0, bit=0)
-            parts = address.split('.')
-            byte = int(parts[0][1:])
-            bit = int(parts[1])
-            
-            # Leer byte completo
-            data = self.plc.read_area(Area.PE, 0, byte, 1)
-            return bool(data[0] & (1 << bit))
-            
-        except Exception as e:
-            print(f"⚠️ Error leyendo entrada digital {address}: {e}")
-            return False
+    @staticmethod
+    def _parse_bit_address(address: str) -> tuple:
+        """Parsea una dirección de bit (ej: "I0.3" -> (0, 3))."""
+        parts = address.split('.')
+        return int(parts[0][1:]), int(parts[1])
     
-    def _read_digital_output(self, address: str) -> bool:
-        """Lee una salida digital."""
-        try:
-            parts = address.split('.')
-            byte = int(parts[0][1:])
-            bit = int(parts[1])
-            
-            data = self.plc.read_area(Area.PA, 0, byte, 1)
-            return bool(data[0] & (1 << bit))
-            
-        except Exception as e:
-            print(f"⚠️ Error leyendo salida digital {address}: {e}")
-            return False
+    @staticmethod
+    def _parse_word_address(address: str) -> int:
+        """Parsea una dirección de word (ej: "IW96" -> 96)."""
+        return int(address[2:])
     
-    def _read_analog_input(self, address: str) -> int:
-        """Lee una entrada analógica."""
-        try:
-            # Parsear dirección (ej: "IW96" -> byte=96)
-            byte = int(address[2:])
-            
-            data = self.plc.read_area(Area.PE, 0, byte, 2)
-            return int.from_bytes(data, byteorder='big', signed=True)
-            
-        except Exception as e:
-            print(f"⚠️ Error leyendo entrada analógica {address}: {e}")
-            return 0
+    @staticmethod
+    def _parse_db_address(address: str) -> tuple:
+        """Parsea una dirección de bloque de datos (ej: "DB1.DBW4" -> (1, 4))."""
+        parts = address.split('.')
+        return int(parts[0][2:]), int(parts[1][3:])
     
-    def _read_analog_output(self, address: str) -> int:
-        """Lee una salida analógica."""
-        try:
-            byte = int(address[2:])
-            
-            data = self.plc.read_area(Area.PA, 0, byte, 2)
-            return int.from_bytes(data, byteorder='big', signed=True)
-            
-        except Exception as e:
-            print(f"⚠️ Error leyendo salida analógica {address}: {e}")
-            return 0
+    @staticmethod
+    def _compute_span(entries: list) -> tuple:
+        """Calcula el rango (inicio, tamaño) que cubre todas las entradas (byte, tamaño)."""
+        start = min(byte for byte, _ in entries)
+        end = max(byte + size for byte, size in entries)
+        return start, end - start
     
-    def _read_mark(self, address: str) -> bool:
-        """Lee una marca."""
+    def _read_span(self, area: Area):
+        """Lee de una vez el rango configurado de un área."""
+        start, size = self._read_spans[area]
         try:
-            parts = address.split('.')
-            byte = int(parts[0][1:])
-            bit = int(parts[1])
-            
-            data = self.plc.read_area(Area.MK, 0, byte, 1)
-            return bool(data[0] & (1 << bit))
-            
+            return self.plc.read_area(area, 0, start, size)
         except Exception as e:
-            print(f"⚠️ Error leyendo marca {address}: {e}")
-            return False
+            print(f"⚠️ Error leyendo área {area}: {e}")
+            return None
+    
+    @staticmethod
+    def _build_bit_table(entries: list, start: int) -> tuple:
+        """Construye (direcciones, offsets, máscaras, salida) para decodificar bits."""
+        addresses = tuple(address for address, _, _ in entries)
+        offsets = np.array([byte - start for _, byte, _ in entries], dtype=np.intp)
+        masks = np.array([1 << bit for _, _, bit in entries], dtype=np.uint8)
+        out = np.zeros(len(entries), dtype=np.bool_)
+        return addresses, offsets, masks, out
     
-    def _read_data_block(self, address: str) -> int:
-        """Lee un bloque de datos."""
+    @staticmethod
+    def _build_word_table(entries: list, start: int) -> tuple:
+        """Construye (direcciones, índices de pares de bytes, salida) para decodificar words."""
+        addresses = tuple(address for address, _ in entries)
+        indices = np.array([(byte - start, byte - start + 1) for _, byte in entries], dtype=np.intp)
+        out = np.zeros(len(entries), dtype=np.int16)
+        return addresses, indices, out
+    
+    def _decode_bits(self, table: tuple, data):
+        """Decodifica los bits de un área en el array estable de la tabla."""
+        _, offsets, masks, out = table
+        if data is None:
+            out[:] = False
+        elif CYTHON_DECODER_AVAILABLE:
+            out[:] = decode_bits(data, offsets, masks)
+        elif NUMBA_AVAILABLE:
+            _jit_decode_bits(np.frombuffer(data, dtype=np.uint8), offsets, masks, out)
+        else:
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            np.not_equal(buffer[offsets] & masks, 0, out=out)
+    
+    def _decode_words(self, table: tuple, data):
+        """Decodifica words con signo (big-endian) en el array estable de la tabla."""
+        _, indices, out = table
+        if data is None:
+            out[:] = 0
+        elif CYTHON_DECODER_AVAILABLE:
+            out[:] = decode_words_be(data, indices)
+        elif NUMBA_AVAILABLE:
+            _jit_decode_words_be(np.frombuffer(data, dtype=np.uint8), indices, out)
+        else:
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            out[:] = buffer[indices].view('>i2').ravel()
+    
+    def _items(self, key: str):
+        """Genera pares (dirección, valor) de una categoría desde los arrays estables."""
+        for table in self._tables_by_key[key]:
+            yield from zip(table[0], table[-1].tolist())
+    
+    @property
+    def real_time_data(self) -> Dict[str, Dict[str, Any]]:
+        """Datos en tiempo real como diccionarios (solo se construyen al consultarlos)."""
+        return {key: dict(self._items(key)) for key in self._tables_by_key}
+    
+    def _read_data_block(self, db_number: int, start: int, size: int):
+        """Lee de una vez el rango configurado de un bloque de datos."""
         try:
-            # Parsear dirección (ej: "DB1.DBW0" -> db=1, byte=0)
-            parts = address.split('.')
-            db_number = int(parts[0][2:])
-            byte = int(parts[1][4:])
-            
-            data = self.plc.read_area(Area.DB, db_number, byte, 2)
-            return int.from_bytes(data, byteorder='big', signed=True)
-            
+            return self.plc.read_area(AREA_DB, db_number, start, size)
         except Exception as e:
-            print(f"⚠️ Error leyendo bloque de datos {address}: {e}")
-            return 0
+            print(f"⚠️ Error leyendo bloque de datos DB{db_number}: {e}")
+            return None
+    
+    def _detect_changes(self) -> bool:
+        """Indica si algún valor cambió desde el ciclo anterior."""
+        packed_bits = np.packbits(np.concatenate(self._bit_arrays))
+        words = np.concatenate(self._word_arrays)
+        
+        changed = (
+            self._prev_packed_bits is None
+            or np.bitwise_xor(packed_bits, self._prev_packed_bits).any()
+            or not np.array_equal(words, self._prev_words)
+        )
+        
+        self._prev_packed_bits = packed_bits
+        self._prev_words = words
+        return bool(changed)
     
     def _display_system_status(self):
         """Muestra el estado del sistema."""
@@ -282,40 +412,44 @@ class IndustrialMonitor:
     
     def _display_critical_data(self):
         """Muestra datos críticos del sistema."""
-        print("\n🎛️  Datos Críticos:")
+        lines = ["\n🎛️  Datos Críticos:"]
         
         # Entradas digitales
-        print("📥 Entradas Digitales:")
-        for address, value in self.real_time_data["digital_inputs"].items():
+        lines.append("📥 Entradas Digitales:")
+        for address, value in self._items("digital_inputs"):
             status = "🟢 ON" if value else "🔴 OFF"
-            print(f"   {address}: {status}")
+            lines.append(f"   {address}: {status}")
         
         # Salidas digitales
-        print("📤 Salidas Digitales:")
-        for address, value in self.real_time_data["digital_outputs"].items():
+        lines.append("📤 Salidas Digitales:")
+        for address, value in self._items("digital_outputs"):
             status = "🟢 ON" if value else "🔴 OFF"
-            print(f"   {address}: {status}")
+            lines.append(f"   {address}: {status}")
         
         # Entradas analógicas
-        print("📊 Entradas Analógicas:")
-        for address, value in self.real_time_data["analog_inputs"].items():
-            print(f"   {address}: {value}")
+        lines.append("📊 Entradas Analógicas:")
+        for address, value in self._items("analog_inputs"):
+            lines.append(f"   {address}: {value}")
         
         # Salidas analógicas
-        print("📈 Salidas Analógicas:")
-        for address, value in self.real_time_data["analog_outputs"].items():
-            print(f"   {address}: {value}")
+        lines.append("📈 Salidas Analógicas:")
+        for address, value in self._items("analog_outputs"):
+            lines.append(f"   {address}: {value}")
         
         # Marcas
-        print("🏷️  Marcas:")
-        for address, value in self.real_time_data["marks"].items():
+        lines.append("🏷️  Marcas:")
+        for address, value in self._items("marks"):
             status = "🟢 ON" if value else "🔴 OFF"
-            print(f"   {address}: {status}")
+            lines.append(f"   {address}: {status}")
         
         # Bloques de datos
-        print("💾 Bloques de Datos:")
-        for address, value in self.real_time_data["data_blocks"].items():
-            print(f"   {address}: {value}")
+        lines.append("💾 Bloques de Datos:")
+        for address, value in self._items("data_blocks"):
+            lines.append(f"   {address}: {value}")
+        
+        # Una sola escritura por ciclo
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
     
     def _on_connection_change(self, connected: bool):
         """Callback para cambios de conexión."""
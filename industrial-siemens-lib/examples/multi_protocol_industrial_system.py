@@ -13,14 +13,42 @@ Ejemplo completo que demuestra el uso de todos los protocolos industriales:
 - VFD Communication
 
 Este ejemplo simula un sistema industrial completo con múltiples dispositivos.
+
+En producción se recomienda instalar uvloop (pip install uvloop); si está
+disponible se usa automáticamente como event loop. Los logs son ASCII plano;
+con DEMO_PRETTY=1 se muestran con emojis y separadores.
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
+import os
+import signal
+import socket
+import struct
 import time
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Dict, Any, Awaitable, Callable, Optional
 import json
 
+import numpy as np
+
+try:
+    import orjson
+    
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, default=str).encode()
+    
+    _json_loads = json.loads
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,369 +56,937 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Niveles efectivos evaluados una sola vez para los logs del bucle de sondeo
+_LOG_DEBUG = logger.isEnabledFor(logging.DEBUG)
+_LOG_INFO = logger.isEnabledFor(logging.INFO)
+
+# Decoraciones (emojis, separadores largos) solo con DEMO_PRETTY=1; por defecto
+# ASCII plano, más barato en consolas serie y más limpio para ingesta de logs
+_PRETTY = os.environ.get('DEMO_PRETTY') == '1'
+
+
+def _info(msg, *args, emoji=''):
+    """logger.info con prefijo emoji solo en modo DEMO_PRETTY."""
+    logger.info(f"{emoji} {msg}" if _PRETTY and emoji else msg, *args)
+
+
+def _warning(msg, *args, emoji=''):
+    """logger.warning con prefijo emoji solo en modo DEMO_PRETTY."""
+    logger.warning(f"{emoji} {msg}" if _PRETTY and emoji else msg, *args)
+
+
+def _error(msg, *args, emoji=''):
+    """logger.error con prefijo emoji solo en modo DEMO_PRETTY."""
+    logger.error(f"{emoji} {msg}" if _PRETTY and emoji else msg, *args)
+
 # Importar módulos de la librería
 from siemens_plc.protocols import (
     S7Protocol, ModbusTCP, ModbusRTU, ProfibusDP, 
     EthernetIPProtocol, OPCUAProtocol
 )
 from siemens_plc.protocols.base import ProtocolConfig, ProtocolType, ReadRequest, WriteRequest
+from siemens_plc.protocols._decoders import _DECODERS, _ENCODERS, REGISTER_WIDTHS
 from siemens_plc.communication import PLCToPLCCommunication, PLCNetwork, VFDCommunication
 from siemens_plc.exceptions import CommunicationError
 
+# Límites por transacción Modbus (FC3 lectura / FC16 escritura de registros / FC15 de coils)
+MODBUS_MAX_READ_REGISTERS = 125
+MODBUS_MAX_WRITE_REGISTERS = 123
+MODBUS_MAX_WRITE_COILS = 1968
+
+# Periodos de sondeo por categoría de señal (s)
+SCAN_INTERVAL = {
+    'power': 0.2,    # Magnitudes rápidas: corriente, frecuencia, potencia
+    'state': 1.0,    # Estados y consignas
+    'energy': 60.0   # Totalizadores y datos de placa
+}
+
+# Pool de conexiones Modbus TCP persistentes por (host, port)
+POOL_SIZE = 2                 # Conexiones abiertas por dispositivo
+POOL_IDLE_CHECK = 60.0        # s sin uso antes de verificar la conexión
+POOL_KEEPIDLE = 30            # s de inactividad antes del primer keepalive TCP
+MUX_MAX_INFLIGHT = 8          # Solicitudes pendientes por conexión (tope del PLC)
+
+# Back-off ante fallas: el periodo se duplica por falla consecutiva hasta el tope
+BACKOFF_CAP_MS = 60_000
+BACKOFF_MAX_SHIFT = 6
+VFD_QUARANTINE = 30.0         # s sin sondear un VFD tras reportar una falla
+
+
+def _coalesce_reads(requests, max_gap=0, max_regs=MODBUS_MAX_READ_REGISTERS):
+    """
+    Agrupar solicitudes de registros contiguas en bloques de una sola transacción.
+    
+    Args:
+        requests: Solicitudes con address y data_type
+        max_gap: Registros sin usar tolerados entre dos solicitudes del mismo bloque
+        max_regs: Máximo de registros por bloque
+        
+    Returns:
+        Lista de tuplas (start, count, requests) ordenadas por dirección
+    """
+    groups = []
+    start = end = None
+    members = []
+    
+    for request in sorted(requests, key=lambda r: int(r.address)):
+        address = int(request.address)
+        width = REGISTER_WIDTHS.get(request.data_type, 1) * getattr(request, 'count', 1)
+        
+        if members and address - end <= max_gap and max(end, address + width) - start <= max_regs:
+            end = max(end, address + width)
+            members.append(request)
+        else:
+            if members:
+                groups.append((start, end - start, members))
+            start, end = address, address + width
+            members = [request]
+    
+    if members:
+        groups.append((start, end - start, members))
+    
+    return groups
+
+
+def _coalesce_writes(requests, max_regs=MODBUS_MAX_WRITE_REGISTERS):
+    """Agrupar escrituras estrictamente contiguas (FC16 no admite huecos)."""
+    return _coalesce_reads(requests, max_gap=0, max_regs=max_regs)
+
+
+def _coalesce_coils(requests, max_coils=MODBUS_MAX_WRITE_COILS):
+    """Agrupar escrituras de coils contiguas para FC15 (un bit por dirección)."""
+    return _coalesce_reads(requests, max_gap=0, max_regs=max_coils)
+
+
+class MappingTable:
+    """
+    Tabla de señales sondeadas en formato struct-of-arrays.
+    
+    Cada fila es una señal (ReadRequest) de un PLC. La comprobación de
+    vencimiento se resuelve para todas las filas con una sola operación NumPy.
+    Las filas que fallan alargan su periodo (back-off exponencial) hasta
+    volver a leerse con éxito.
+    """
+    
+    def __init__(self, rows):
+        # rows: secuencia de (índice del PLC, ReadRequest)
+        self.plc_index = np.array([plc_index for plc_index, _ in rows], dtype=np.int32)
+        self.requests = [request for _, request in rows]
+        self.base_interval_ms = np.array(
+            [int((request.scan_interval or SCAN_INTERVAL['state']) * 1000) for _, request in rows],
+            dtype=np.int64
+        )
+        self.current_interval_ms = self.base_interval_ms.copy()
+        self.failures = np.zeros(len(rows), dtype=np.uint8)
+        # Nunca sondeadas: todas vencen en el primer ciclo
+        self.last_poll_ms = np.full(len(rows), np.iinfo(np.int64).min // 2, dtype=np.int64)
+    
+    def __len__(self):
+        return len(self.requests)
+    
+    def due(self, now_ms):
+        """Índices de las filas cuyo periodo ya venció."""
+        return np.flatnonzero((now_ms - self.last_poll_ms) >= self.current_interval_ms)
+    
+    def mark_polled(self, rows, now_ms):
+        """Registrar el sondeo de las filas indicadas."""
+        self.last_poll_ms[rows] = now_ms
+    
+    def record_success(self, rows):
+        """Restablecer el periodo configurado de las filas leídas con éxito."""
+        self.failures[rows] = 0
+        self.current_interval_ms[rows] = self.base_interval_ms[rows]
+    
+    def record_failure(self, rows):
+        """Duplicar el periodo de las filas fallidas, hasta BACKOFF_CAP_MS."""
+        failures = np.minimum(self.failures[rows].astype(np.int64) + 1, 255)
+        self.failures[rows] = failures
+        
+        base = self.base_interval_ms[rows]
+        backoff = np.minimum(BACKOFF_CAP_MS, base << np.minimum(failures, BACKOFF_MAX_SHIFT))
+        self.current_interval_ms[rows] = np.maximum(base, backoff)
+
+
+@dataclass
+class ScheduledJob:
+    """Tarea periódica del planificador de demostración."""
+    name: str
+    interval: float  # s
+    callback: Callable[[], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class PLCDesc:
+    """Descripción inmutable de un PLC de la red."""
+    id: str
+    name: str
+    protocol: str
+    host: str
+    port: int = 102
+    rack: int = 0
+    slot: int = 1
+    unit_id: int = 1
+    is_master: bool = False
+
+
+@dataclass(frozen=True)
+class VFDDesc:
+    """Descripción inmutable de un VFD."""
+    id: str
+    name: str
+    protocol: str
+    host: str
+    port: int = 502
+    manufacturer: str = 'Unknown'
+    model: str = 'Unknown'
+    power_rating: float = 0.0
+    max_frequency: float = 60.0
+    max_speed: float = 1750.0
+
+
+# Cabecera MBAP: transaction id, protocol id (0), longitud; el unit id va en el byte 6
+_MBAP_HEADER = struct.Struct('>HHHB')
+
+
+class _MbapMux:
+    """
+    Multiplexor Modbus TCP sobre un único stream.
+    
+    Varias tareas pueden tener solicitudes en vuelo a la vez: cada una lleva
+    su propio transaction id en la cabecera MBAP y una tarea lectora resuelve
+    el futuro correspondiente al llegar cada respuesta.
+    """
+    
+    def __init__(self, reader, writer, max_inflight=MUX_MAX_INFLIGHT):
+        self._reader = reader
+        self._writer = writer
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_tid = itertools.count(1)
+        self._write_lock = asyncio.Lock()
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self.closed = False
+        self._reader_task = asyncio.create_task(self._read_loop())
+    
+    async def request(self, unit_id, pdu):
+        """Enviar una PDU y esperar la PDU de respuesta con el mismo transaction id."""
+        async with self._inflight:
+            if self.closed:
+                raise ConnectionError("Modbus connection closed")
+            
+            tid = next(self._next_tid) & 0xFFFF
+            while tid in self._pending:
+                tid = next(self._next_tid) & 0xFFFF
+            
+            future = asyncio.get_running_loop().create_future()
+            self._pending[tid] = future
+            try:
+                async with self._write_lock:
+                    # Cabecera nueva por petición: el transporte puede retener el buffer sin copiarlo
+                    header = _MBAP_HEADER.pack(tid, 0, len(pdu) + 1, unit_id)
+                    self._writer.writelines((header, pdu))
+                    await self._writer.drain()
+                body = await future
+            finally:
+                # Si la solicitud se cancela, una respuesta tardía se descarta en _read_loop
+                self._pending.pop(tid, None)
+        
+        if body[0] & 0x80:
+            raise CommunicationError(f"Modbus exception code {body[1]} (function {body[0] & 0x7F})")
+        
+        return body
+    
+    def close(self):
+        """Cerrar el stream y fallar las solicitudes pendientes."""
+        self.closed = True
+        self._reader_task.cancel()
+        self._writer.close()
+    
+    async def _read_loop(self):
+        """Despachar cada respuesta al futuro de su transaction id."""
+        try:
+            while True:
+                header = await self._reader.readexactly(_MBAP_HEADER.size)
+                tid, _, length, _ = _MBAP_HEADER.unpack(header)
+                body = await self._reader.readexactly(length - 1)
+                
+                future = self._pending.pop(tid, None)
+                if future is not None and not future.done():
+                    future.set_result(body)
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            logger.warning("Modbus connection lost: %s", e)
+        finally:
+            self.closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Modbus connection lost"))
+            self._pending.clear()
+
+
+@dataclass
+class PooledConnection:
+    """Conexión TCP persistente de un pool (se reabre en el próximo préstamo si se cae)."""
+    mux: Optional[_MbapMux] = None
+    last_used: float = 0.0
+    
+    @property
+    def is_open(self) -> bool:
+        return self.mux is not None and not self.mux.closed
+    
+    def close(self) -> None:
+        if self.mux is not None:
+            self.mux.close()
+        self.mux = None
+
 
 class IndustrialSystemSimulator:
     """Simulador de sistema industrial completo."""
     
+    __slots__ = (
+        'plcs', 'vfds', 'network', 'running', 'request_timeout', 'network_info_json',
+        'plc_descs', 'vfd_descs', 'plc_read_requests',
+        '_stop', '_pools', '_schedule', '_schedule_seq', '_plc_items', '_read_table', '_now',
+        '_network_config_json', '_vfd_quarantine',
+        '_cb_on_data_sync', '_cb_on_error', '_cb_on_connection_change',
+        '_cb_on_vfd_status_change', '_cb_on_vfd_fault'
+    )
+    
     def __init__(self):
+        # Callbacks enlazados una sola vez y reutilizados en cada registro
+        self._cb_on_data_sync = self._on_data_sync
+        self._cb_on_error = self._on_error
+        self._cb_on_connection_change = self._on_connection_change
+        self._cb_on_vfd_status_change = self._on_vfd_status_change
+        self._cb_on_vfd_fault = self._on_vfd_fault
+        
         self.plcs = {}
         self.vfds = {}
         self.network = None
         self.running = False
+        self._vfd_quarantine: Dict[str, float] = {}  # vfd_id -> loop.time() de fin de cuarentena
+        self.network_info_json: Optional[bytes] = None  # Último estado de la red serializado
+        self._stop = asyncio.Event()  # Señal de parada: despierta al instante a quien espera
+        self.request_timeout = 5.0  # s, por dispositivo y ciclo
         
-        # Configuraciones de ejemplo
-        self.plc_configs = {
-            'plc_main': {
-                'id': 'plc_main',
-                'name': 'Main PLC (S7-1200)',
-                'protocol': 's7',
-                'host': '192.168.1.10',
-                'rack': 0,
-                'slot': 1,
-                'is_master': True
-            },
-            'plc_aux': {
-                'id': 'plc_aux', 
-                'name': 'Auxiliary PLC (S7-300)',
-                'protocol': 's7',
-                'host': '192.168.1.11',
-                'rack': 0,
-                'slot': 1,
-                'is_master': False
-            },
-            'plc_modbus': {
-                'id': 'plc_modbus',
-                'name': 'Modbus PLC',
-                'protocol': 'modbus_tcp',
-                'host': '192.168.1.12',
-                'port': 502,
-                'is_master': False
-            }
-        }
+        # Pools de conexiones Modbus TCP: (host, port) -> Queue[PooledConnection]
+        self._pools: Dict[tuple, asyncio.Queue] = {}
         
-        self.vfd_configs = {
-            'vfd_motor1': {
-                'id': 'vfd_motor1',
-                'name': 'Motor 1 VFD',
-                'protocol': 'modbus_tcp',
-                'host': '192.168.1.20',
-                'port': 502,
-                'manufacturer': 'Siemens',
-                'model': 'G120',
-                'power_rating': 5.5,
-                'max_frequency': 60.0,
-                'max_speed': 1750.0
-            },
-            'vfd_motor2': {
-                'id': 'vfd_motor2',
-                'name': 'Motor 2 VFD',
-                'protocol': 'modbus_tcp',
-                'host': '192.168.1.21',
-                'port': 502,
-                'manufacturer': 'Allen-Bradley',
-                'model': 'PowerFlex 525',
-                'power_rating': 3.0,
-                'max_frequency': 60.0,
-                'max_speed': 1750.0
-            }
-        }
+        # Planificador: heap de (deadline, secuencia, tarea)
+        self._schedule = []
+        self._schedule_seq = itertools.count()
+        self._now = 0.0  # loop.time() del ciclo en curso, leído una vez por ciclo
+        
+        # Señales leídas de cada PLC, con su propio periodo de sondeo
+        self.plc_read_requests = [
+            ReadRequest(address=100, count=1, data_type='float32', scan_interval=SCAN_INTERVAL['power']),
+            ReadRequest(address=102, count=1, data_type='bool', scan_interval=SCAN_INTERVAL['state']),
+            ReadRequest(address=103, count=1, data_type='uint16', scan_interval=SCAN_INTERVAL['state']),
+            ReadRequest(address=104, count=1, data_type='int32', scan_interval=SCAN_INTERVAL['energy'])
+        ]
+        
+        # Configuraciones de ejemplo (inmutables, construidas una sola vez)
+        self.plc_descs = (
+            PLCDesc(
+                id='plc_main',
+                name='Main PLC (S7-1200)',
+                protocol='s7',
+                host='192.168.1.10',
+                rack=0,
+                slot=1,
+                is_master=True
+            ),
+            PLCDesc(
+                id='plc_aux',
+                name='Auxiliary PLC (S7-300)',
+                protocol='s7',
+                host='192.168.1.11',
+                rack=0,
+                slot=1,
+                is_master=False
+            ),
+            PLCDesc(
+                id='plc_modbus',
+                name='Modbus PLC',
+                protocol='modbus_tcp',
+                host='192.168.1.12',
+                port=502,
+                is_master=False
+            )
+        )
+        
+        self.vfd_descs = (
+            VFDDesc(
+                id='vfd_motor1',
+                name='Motor 1 VFD',
+                protocol='modbus_tcp',
+                host='192.168.1.20',
+                port=502,
+                manufacturer='Siemens',
+                model='G120',
+                power_rating=5.5,
+                max_frequency=60.0,
+                max_speed=1750.0
+            ),
+            VFDDesc(
+                id='vfd_motor2',
+                name='Motor 2 VFD',
+                protocol='modbus_tcp',
+                host='192.168.1.21',
+                port=502,
+                manufacturer='Allen-Bradley',
+                model='PowerFlex 525',
+                power_rating=3.0,
+                max_frequency=60.0,
+                max_speed=1750.0
+            )
+        )
+        
+        # Pares (id, descripción) recorridos en cada ciclo
+        self._plc_items = tuple((desc.id, desc) for desc in self.plc_descs)
+        
+        # Una fila por señal y PLC, cada una con su propio periodo de sondeo
+        self._read_table = MappingTable([
+            (plc_index, request)
+            for plc_index in range(len(self.plc_descs))
+            for request in self.plc_read_requests
+        ])
+        
+        # Configuración de la red serializada una sola vez
+        self._network_config_json = _json_dumps({
+            'plcs': [asdict(desc) for desc in self.plc_descs],
+            'mappings': [
+                {
+                    'source_plc': 'plc_main',
+                    'source_address': 100,
+                    'source_data_type': 'float32',
+                    'target_plc': 'plc_aux',
+                    'target_address': 200,
+                    'target_data_type': 'float32',
+                    'sync_mode': 'continuous',
+                    'sync_interval': 1000
+                },
+                {
+                    'source_plc': 'plc_main',
+                    'source_address': 101,
+                    'source_data_type': 'bool',
+                    'target_plc': 'plc_modbus',
+                    'target_address': 1,
+                    'target_data_type': 'coil',
+                    'sync_mode': 'on_change',
+                    'sync_interval': 500
+                }
+            ]
+        })
     
     async def start_system(self):
         """Iniciar el sistema industrial."""
-        logger.info("🚀 Starting Industrial System...")
+        _info("Starting Industrial System...", emoji="🚀")
         
         try:
             # Crear red PLC-PLC
             self.network = PLCNetwork("Industrial_Network")
             
             # Configurar callbacks
-            self.network.communication.on_data_sync = self._on_data_sync
-            self.network.communication.on_error = self._on_error
-            self.network.communication.on_connection_change = self._on_connection_change
-            
-            # Cargar configuración
-            config = {
-                'plcs': list(self.plc_configs.values()),
-                'mappings': [
-                    {
-                        'source_plc': 'plc_main',
-                        'source_address': 100,
-                        'source_data_type': 'float32',
-                        'target_plc': 'plc_aux',
-                        'target_address': 200,
-                        'target_data_type': 'float32',
-                        'sync_mode': 'continuous',
-                        'sync_interval': 1000
-                    },
-                    {
-                        'source_plc': 'plc_main',
-                        'source_address': 101,
-                        'source_data_type': 'bool',
-                        'target_plc': 'plc_modbus',
-                        'target_address': 1,
-                        'target_data_type': 'coil',
-                        'sync_mode': 'on_change',
-                        'sync_interval': 500
-                    }
-                ]
-            }
+            self.network.communication.on_data_sync = self._cb_on_data_sync
+            self.network.communication.on_error = self._cb_on_error
+            self.network.communication.on_connection_change = self._cb_on_connection_change
             
-            await self.network.load_config(config)
+            # Cargar configuración (copia nueva a partir de la versión serializada)
+            await self.network.load_config(_json_loads(self._network_config_json))
             
             # Iniciar red
             await self.network.start_network()
             
+            # Desactivar Nagle en los sockets TCP de los PLCs conectados
+            for plc_id, node in self.network.communication.plcs.items():
+                if node.protocol.enable_tcp_nodelay() and _LOG_DEBUG:
+                    logger.debug("TCP_NODELAY enabled for %s", plc_id)
+            
             # Crear VFDs
             await self._create_vfds()
             
+            # Abrir conexiones persistentes a los PLCs Modbus TCP
+            await self._create_pools()
+            
+            self._stop.clear()
             self.running = True
-            logger.info("✅ Industrial System started successfully")
+            _info("Industrial System started successfully", emoji="✅")
             
             # Iniciar tareas de demostración
             asyncio.create_task(self._demonstration_loop())
             
         except Exception as e:
-            logger.error(f"❌ Error starting system: {e}")
+            _error("Error starting system: %s", e, emoji="❌")
             raise
     
     async def stop_system(self):
         """Detener el sistema industrial."""
-        logger.info("🛑 Stopping Industrial System...")
+        _info("Stopping Industrial System...", emoji="🛑")
         
         self.running = False
+        self._stop.set()
         
         # Detener VFDs
         for vfd in self.vfds.values():
             try:
                 await vfd.disconnect()
             except Exception as e:
-                logger.error(f"Error stopping VFD {vfd.config.id}: {e}")
+                logger.error("Error stopping VFD %s: %s", vfd.config.id, e)
+        
+        # Cerrar pools de conexiones
+        for pool in self._pools.values():
+            while not pool.empty():
+                pool.get_nowait().close()
+        self._pools.clear()
         
         # Detener red PLC
         if self.network:
             try:
                 await self.network.stop_network()
             except Exception as e:
-                logger.error(f"Error stopping network: {e}")
+                logger.error("Error stopping network: %s", e)
         
-        logger.info("✅ Industrial System stopped")
+        _info("Industrial System stopped", emoji="✅")
     
     async def _create_vfds(self):
         """Crear y conectar VFDs."""
-        logger.info("🔌 Creating VFDs...")
+        _info("Creating VFDs...", emoji="🔌")
         
-        for vfd_id, config in self.vfd_configs.items():
+        for desc in self.vfd_descs:
+            vfd_id = desc.id
             try:
                 # Crear VFD
                 vfd = await VFDCommunication.create_vfd(
-                    config['protocol'], 
-                    config
+                    desc.protocol, 
+                    asdict(desc)
                 )
                 
                 # Configurar callbacks
-                vfd.on_status_change = self._on_vfd_status_change
-                vfd.on_fault = self._on_vfd_fault
+                vfd.on_status_change = self._cb_on_vfd_status_change
+                vfd.on_fault = partial(self._cb_on_vfd_fault, vfd_id=vfd_id)
                 
                 # Conectar
                 if await vfd.connect():
+                    vfd.protocol.enable_tcp_nodelay()
                     self.vfds[vfd_id] = vfd
-                    logger.info(f"✅ Connected to VFD {vfd_id}")
+                    _info("Connected to VFD %s", vfd_id, emoji="✅")
                 else:
-                    logger.warning(f"⚠️ Failed to connect to VFD {vfd_id}")
+                    _warning("Failed to connect to VFD %s", vfd_id, emoji="⚠️")
                     
             except Exception as e:
-                logger.error(f"❌ Error creating VFD {vfd_id}: {e}")
+                _error("Error creating VFD %s: %s", vfd_id, e, emoji="❌")
+    
+    def _build_schedule(self):
+        """Crear las tareas periódicas del planificador."""
+        # Las lecturas se despachan al ritmo de la señal más rápida;
+        # la tabla de señales decide en cada ciclo cuáles vencieron
+        poll_interval = float(self._read_table.base_interval_ms.min()) / 1000 if len(self._read_table) else SCAN_INTERVAL['state']
+        jobs = [ScheduledJob("plc_reading", poll_interval, self._poll_due_signals)]
+        
+        jobs.extend([
+            ScheduledJob("vfd_monitoring", SCAN_INTERVAL['power'], self._demonstrate_vfd_monitoring),
+            ScheduledJob("plc_writing", SCAN_INTERVAL['state'] * 10, self._demonstrate_plc_writing),
+            ScheduledJob("vfd_control", SCAN_INTERVAL['energy'], self._demonstrate_vfd_control),
+            ScheduledJob("network_status", SCAN_INTERVAL['energy'], self._demonstrate_network_status)
+        ])
+        
+        now = asyncio.get_running_loop().time()
+        self._schedule = [(now, next(self._schedule_seq), job) for job in jobs]
+        heapq.heapify(self._schedule)
     
     async def _demonstration_loop(self):
-        """Bucle de demostración del sistema."""
-        logger.info("🎯 Starting demonstration loop...")
+        """Bucle de demostración: despacha cada tarea según su propio periodo."""
+        _info("Starting demonstration loop...", emoji="🎯")
+        
+        loop = asyncio.get_running_loop()
+        self._build_schedule()
         
-        step = 0
-        while self.running:
+        while self.running and self._schedule:
+            deadline, _, job = heapq.heappop(self._schedule)
             try:
-                step += 1
-                logger.info(f"📊 Demonstration Step {step}")
-                
-                # Paso 1: Leer estado de PLCs
-                if step == 1:
-                    await self._demonstrate_plc_reading()
-                
-                # Paso 2: Escribir datos a PLCs
-                elif step == 2:
-                    await self._demonstrate_plc_writing()
-                
-                # Paso 3: Controlar VFDs
-                elif step == 3:
-                    await self._demonstrate_vfd_control()
-                
-                # Paso 4: Leer parámetros de VFDs
-                elif step == 4:
-                    await self._demonstrate_vfd_monitoring()
-                
-                # Paso 5: Mostrar estado de la red
-                elif step == 5:
-                    await self._demonstrate_network_status()
-                
-                # Reiniciar ciclo
-                elif step > 5:
-                    step = 0
-                
-                # Esperar entre pasos
-                await asyncio.sleep(10)
-                
+                # Esperar al vencimiento, o salir en cuanto se pida la parada
+                await asyncio.wait_for(self._stop.wait(), timeout=max(0, deadline - loop.time()))
+                break
+            except asyncio.TimeoutError:
+                pass
+            
+            # Reloj monotónico leído una sola vez por ciclo y compartido por la tarea
+            self._now = now = loop.time()
+            
+            try:
+                await job.callback()
             except Exception as e:
-                logger.error(f"Error in demonstration loop: {e}")
-                await asyncio.sleep(5)
+                logger.error("Error in demonstration job %s: %s", job.name, e)
+            
+            heapq.heappush(self._schedule, (now + job.interval, next(self._schedule_seq), job))
     
-    async def _demonstrate_plc_reading(self):
-        """Demostrar lectura de PLCs."""
-        logger.info("📖 Demonstrating PLC Reading...")
+    async def _gather_devices(self, action, items, handler):
+        """
+        Ejecutar handler(device_id, device) sobre pares (id, dispositivo) en paralelo.
         
-        for plc_id, plc_config in self.plc_configs.items():
-            try:
-                # Simular lectura de diferentes tipos de datos
-                read_requests = [
-                    ReadRequest(address=100, count=1, data_type='float32'),
-                    ReadRequest(address=101, count=1, data_type='bool'),
-                    ReadRequest(address=102, count=1, data_type='uint16'),
-                    ReadRequest(address=103, count=1, data_type='int32')
-                ]
-                
-                logger.info(f"Reading from {plc_id}...")
-                
-                # En un sistema real, usaríamos el protocolo correspondiente
-                # Aquí simulamos los datos
-                simulated_data = {
-                    'float32': 123.45,
-                    'bool': True,
-                    'uint16': 1234,
-                    'int32': -5678
-                }
-                
-                for i, request in enumerate(read_requests):
-                    logger.info(f"  {request.data_type}: {simulated_data[request.data_type]}")
-                
-            except Exception as e:
-                logger.error(f"Error reading from {plc_id}: {e}")
+        Cada dispositivo tiene su propio timeout y una falla no cancela al resto.
+        
+        Returns:
+            Dict[str, Any]: Resultado de cada dispositivo que terminó sin error
+        """
+        items = tuple(items)
+        device_ids = [device_id for device_id, _ in items]
+        results = await asyncio.gather(
+            *(asyncio.wait_for(handler(device_id, device), timeout=self.request_timeout)
+              for device_id, device in items),
+            return_exceptions=True
+        )
+        
+        completed = {}
+        for device_id, result in zip(device_ids, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.error("Error %s %s: timeout after %ss", action, device_id, self.request_timeout)
+            elif isinstance(result, Exception):
+                logger.error("Error %s %s: %s", action, device_id, result)
+            else:
+                completed[device_id] = result
+        return completed
+    
+    async def _poll_due_signals(self):
+        """Leer solo las señales cuyo periodo venció, agrupadas por PLC."""
+        table = self._read_table
+        now_ms = int(self._now * 1000)
+        
+        due = table.due(now_ms)
+        if not due.size:
+            return
+        table.mark_polled(due, now_ms)
+        
+        requests_by_plc = {}
+        for row in due.tolist():
+            plc_id = self.plc_descs[table.plc_index[row]].id
+            requests_by_plc.setdefault(plc_id, []).append(table.requests[row])
+        
+        results = await self._demonstrate_plc_reading(requests_by_plc)
+        
+        # Back-off por fila según si su PLC respondió
+        ok_plcs = [plc_index for plc_index, desc in enumerate(self.plc_descs) if desc.id in results]
+        ok = np.isin(table.plc_index[due], ok_plcs)
+        table.record_success(due[ok])
+        if not ok.all():
+            table.record_failure(due[~ok])
+    
+    async def _demonstrate_plc_reading(self, requests_by_plc=None):
+        """Demostrar lectura de PLCs, devolviendo los valores de cada PLC que respondió."""
+        # Corre al ritmo de la señal más rápida: sus logs por ciclo van a DEBUG
+        logger.debug("Demonstrating PLC Reading...")
+        
+        if requests_by_plc is None:
+            requests_by_plc = {plc_id: self.plc_read_requests for plc_id, _ in self._plc_items}
+        
+        results = await self._gather_devices(
+            "reading from",
+            [(plc_id, desc) for plc_id, desc in self._plc_items if plc_id in requests_by_plc],
+            lambda plc_id, desc: self._read_one(plc_id, desc, requests_by_plc[plc_id])
+        )
+        
+        if _LOG_DEBUG:
+            for plc_id, values in results.items():
+                logger.debug("Reading from %s...", plc_id)
+                for data_type, value in values:
+                    logger.debug("  %s: %s", data_type, value)
+        
+        return results
+    
+    async def _read_one(self, plc_id, desc, read_requests):
+        """Leer las solicitudes de un PLC, devolviendo (data_type, valor) en orden de dirección."""
+        values = []
+        
+        # Una sola transacción FC3 por bloque; los bloques viajan en paralelo por el multiplexor
+        groups = _coalesce_reads(read_requests)
+        buffers = await asyncio.gather(
+            *(self._read_register_block(desc, start, count, requests)
+              for start, count, requests in groups)
+        )
+        
+        for (start, count, requests), buffer in zip(groups, buffers):
+            for request in requests:
+                offset = (int(request.address) - start) * 2
+                values.append((request.data_type, _DECODERS[request.data_type](buffer, offset)[0]))
+        
+        return values
     
     async def _demonstrate_plc_writing(self):
         """Demostrar escritura a PLCs."""
-        logger.info("✍️ Demonstrating PLC Writing...")
+        _info("Demonstrating PLC Writing...", emoji="✍️")
         
-        for plc_id, plc_config in self.plc_configs.items():
-            try:
-                # Simular escritura de diferentes tipos de datos
-                write_requests = [
-                    WriteRequest(address=200, value=456.78, data_type='float32'),
-                    WriteRequest(address=201, value=True, data_type='bool'),
-                    WriteRequest(address=202, value=5678, data_type='uint16'),
-                    WriteRequest(address=203, value=-1234, data_type='int32')
-                ]
-                
-                logger.info(f"Writing to {plc_id}...")
-                
-                for request in write_requests:
-                    logger.info(f"  {request.data_type}: {request.value}")
-                
-            except Exception as e:
-                logger.error(f"Error writing to {plc_id}: {e}")
+        await self._gather_devices("writing to", self._plc_items, self._write_one)
+    
+    async def _write_one(self, plc_id, desc):
+        """Escribir los valores de demostración en un PLC."""
+        # Simular escritura de diferentes tipos de datos (registros contiguos)
+        write_requests = [
+            WriteRequest(address=200, value=456.78, data_type='float32'),
+            WriteRequest(address=202, value=5678, data_type='uint16'),
+            WriteRequest(address=203, value=-1234, data_type='int32')
+        ]
+        
+        # Los booleanos van al área de coils
+        coil_requests = [
+            WriteRequest(address=201, value=True, data_type='bool')
+        ]
+        
+        logger.info("Writing to %s...", plc_id)
+        
+        # Una sola transacción FC16 por bloque de registros contiguos
+        for start, count, requests in _coalesce_writes(write_requests):
+            buffer = bytearray(count * 2)
+            
+            for request in requests:
+                offset = (int(request.address) - start) * 2
+                _ENCODERS[request.data_type](buffer, offset, request.value)
+                logger.info("  %s: %s", request.data_type, request.value)
+            
+            await self._write_register_block(desc, start, buffer)
+        
+        # Una sola transacción FC15 por bloque de coils contiguos
+        for start, count, requests in _coalesce_coils(coil_requests):
+            bits = bytearray((count + 7) // 8)
+            
+            for request in requests:
+                if request.value:
+                    index = int(request.address) - start
+                    bits[index >> 3] |= 1 << (index & 7)
+                logger.info("  %s: %s", request.data_type, request.value)
+            
+            await self._write_coil_block(desc, start, count, bits)
+    
+    async def _create_pools(self):
+        """Crear un pool de conexiones persistentes por cada PLC Modbus TCP."""
+        for desc in self.plc_descs:
+            if desc.protocol != 'modbus_tcp':
+                continue
+            
+            plc_id = desc.id
+            key = (desc.host, desc.port)
+            connections = [PooledConnection() for _ in range(POOL_SIZE)]
+            results = await asyncio.gather(
+                *(self._open_pooled(conn, *key) for conn in connections),
+                return_exceptions=True
+            )
+            
+            if not any(conn.is_open for conn in connections):
+                _warning("No pooled connections to %s: %s (using simulated data)", plc_id, results[0], emoji="⚠️")
+                continue
+            
+            pool = asyncio.Queue()
+            for conn in connections:
+                pool.put_nowait(conn)
+            self._pools[key] = pool
+            _info("Connection pool for %s: %s/%s", plc_id, sum(c.is_open for c in connections), POOL_SIZE, emoji="🔗")
+    
+    async def _open_pooled(self, conn, host, port):
+        """Abrir (o reabrir) la conexión TCP de una entrada del pool."""
+        conn.close()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout=self.request_timeout
+        )
+        
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, POOL_KEEPIDLE)
+        
+        conn.mux = _MbapMux(reader, writer)
+        conn.last_used = time.monotonic()
+    
+    @asynccontextmanager
+    async def _borrow(self, host, port):
+        """
+        Tomar una conexión del pool, verificándola si estuvo inactiva.
+        
+        Las conexiones se reparten en rotación y no en exclusiva: el
+        multiplexor permite que varias tareas compartan la misma a la vez.
+        """
+        pool = self._pools[(host, port)]
+        conn = await asyncio.wait_for(pool.get(), timeout=self.request_timeout)
+        
+        try:
+            if not conn.is_open:
+                await self._open_pooled(conn, host, port)
+            elif time.monotonic() - conn.last_used > POOL_IDLE_CHECK and not await self._probe(conn):
+                await self._open_pooled(conn, host, port)
+        finally:
+            conn.last_used = time.monotonic()
+            pool.put_nowait(conn)
+        
+        yield conn
+    
+    async def _modbus_transaction(self, conn, unit_id, pdu):
+        """Enviar una PDU Modbus TCP por el multiplexor de la conexión."""
+        return await conn.mux.request(unit_id, pdu)
+    
+    async def _probe(self, conn):
+        """Verificar una conexión inactiva con una lectura FC3 de cantidad 0."""
+        try:
+            await asyncio.wait_for(
+                self._modbus_transaction(conn, 1, struct.pack('>BHH', 3, 0, 0)),
+                timeout=self.request_timeout
+            )
+        except CommunicationError:
+            # Una respuesta de excepción también confirma que el enlace está vivo
+            return True
+        except Exception:
+            return False
+        return True
+    
+    async def _read_register_block(self, desc, start, count, requests):
+        """Leer un bloque de registros contiguos y devolverlo como bytes big-endian."""
+        key = (desc.host, desc.port)
+        
+        if key in self._pools:
+            async with self._borrow(*key) as conn:
+                body = await self._modbus_transaction(
+                    conn, desc.unit_id, struct.pack('>BHH', 3, start, count)
+                )
+            return body[2:2 + body[1]]
+        
+        # En un sistema real, usaríamos el protocolo correspondiente
+        # Aquí simulamos los datos
+        simulated_data = {
+            'float32': 123.45,
+            'bool': True,
+            'uint16': 1234,
+            'int32': -5678
+        }
+        
+        buffer = bytearray(count * 2)
+        for request in requests:
+            offset = (int(request.address) - start) * 2
+            _ENCODERS[request.data_type](buffer, offset, simulated_data[request.data_type])
+        return buffer
+    
+    async def _write_register_block(self, desc, start, buffer):
+        """Escribir un bloque de registros contiguos en una sola transacción FC16."""
+        key = (desc.host, desc.port)
+        
+        if key in self._pools:
+            pdu = struct.pack('>BHHB', 16, start, len(buffer) // 2, len(buffer)) + bytes(buffer)
+            async with self._borrow(*key) as conn:
+                await self._modbus_transaction(conn, desc.unit_id, pdu)
+    
+    async def _write_coil_block(self, desc, start, count, bits):
+        """Escribir un bloque de coils contiguos (bits LSB primero) en una sola transacción FC15."""
+        key = (desc.host, desc.port)
+        
+        if key in self._pools:
+            pdu = struct.pack('>BHHB', 15, start, count, len(bits)) + bytes(bits)
+            async with self._borrow(*key) as conn:
+                await self._modbus_transaction(conn, desc.unit_id, pdu)
+    
+    def _active_vfds(self):
+        """Pares (id, VFD) excluyendo los que están en cuarentena por falla."""
+        now = self._now
+        return [
+            (vfd_id, vfd) for vfd_id, vfd in self.vfds.items()
+            if self._vfd_quarantine.get(vfd_id, 0.0) <= now
+        ]
     
     async def _demonstrate_vfd_control(self):
         """Demostrar control de VFDs."""
-        logger.info("⚡ Demonstrating VFD Control...")
+        _info("Demonstrating VFD Control...", emoji="⚡")
         
-        for vfd_id, vfd in self.vfds.items():
-            try:
-                logger.info(f"Controlling {vfd_id}...")
-                
-                # Simular control de VFD
-                await vfd.set_frequency(30.0)  # 30 Hz
-                logger.info(f"  Set frequency to 30 Hz")
-                
-                await vfd.set_speed(875.0)  # 875 RPM
-                logger.info(f"  Set speed to 875 RPM")
-                
-                # Simular inicio
-                await vfd.start_drive()
-                logger.info(f"  Started drive")
-                
-            except Exception as e:
-                logger.error(f"Error controlling {vfd_id}: {e}")
+        await self._gather_devices("controlling", self._active_vfds(), self._control_one)
+    
+    async def _control_one(self, vfd_id, vfd):
+        """Enviar la secuencia de control de demostración a un VFD."""
+        logger.info("Controlling %s...", vfd_id)
+        
+        # Simular control de VFD
+        await vfd.set_frequency(30.0)  # 30 Hz
+        logger.info("  %s: Set frequency to 30 Hz", vfd_id)
+        
+        await vfd.set_speed(875.0)  # 875 RPM
+        logger.info("  %s: Set speed to 875 RPM", vfd_id)
+        
+        # Simular inicio
+        await vfd.start_drive()
+        logger.info("  %s: Started drive", vfd_id)
     
     async def _demonstrate_vfd_monitoring(self):
         """Demostrar monitoreo de VFDs."""
-        logger.info("📊 Demonstrating VFD Monitoring...")
+        # Corre cada SCAN_INTERVAL['power'] (0.2 s): sus logs por ciclo van a DEBUG
+        logger.debug("Demonstrating VFD Monitoring...")
         
-        for vfd_id, vfd in self.vfds.items():
-            try:
-                logger.info(f"Monitoring {vfd_id}...")
-                
-                # Leer parámetros
-                params = await vfd.read_parameters()
-                
-                logger.info(f"  Output Frequency: {params.output_frequency} Hz")
-                logger.info(f"  Output Speed: {params.output_speed} RPM")
-                logger.info(f"  Output Current: {params.output_current} A")
-                logger.info(f"  Output Voltage: {params.output_voltage} V")
-                logger.info(f"  Status: {params.status.value}")
-                
-            except Exception as e:
-                logger.error(f"Error monitoring {vfd_id}: {e}")
+        # Leer parámetros de todos los VFDs a la vez
+        results = await self._gather_devices("monitoring", self._active_vfds(), self._monitor_one)
+        
+        if not _LOG_DEBUG:
+            return
+        
+        for vfd_id, params in results.items():
+            logger.debug("Monitoring %s...", vfd_id)
+            logger.debug("  Output Frequency: %s Hz", params.output_frequency)
+            logger.debug("  Output Speed: %s RPM", params.output_speed)
+            logger.debug("  Output Current: %s A", params.output_current)
+            logger.debug("  Output Voltage: %s V", params.output_voltage)
+            logger.debug("  Status: %s", params.status.value)
+    
+    async def _monitor_one(self, vfd_id, vfd):
+        """Leer los parámetros de un VFD."""
+        return await vfd.read_parameters()
     
     async def _demonstrate_network_status(self):
         """Demostrar estado de la red."""
-        logger.info("🌐 Demonstrating Network Status...")
+        _info("Demonstrating Network Status...", emoji="🌐")
         
         if self.network:
             try:
                 network_info = await self.network.get_network_info()
                 
-                logger.info(f"Network: {network_info['name']}")
-                logger.info(f"Running: {network_info['status']['running']}")
-                logger.info(f"PLCs: {len(network_info['status']['plcs'])}")
-                logger.info(f"Mappings: {network_info['status']['mappings']}")
+                # Serializado una vez para los publicadores (HTTP/MQTT)
+                self.network_info_json = _json_dumps(network_info)
+                
+                if not _LOG_INFO:
+                    return
+                
+                logger.info("Network: %s", network_info['name'])
+                logger.info("Running: %s", network_info['status']['running'])
+                logger.info("PLCs: %s", len(network_info['status']['plcs']))
+                logger.info("Mappings: %s", network_info['status']['mappings'])
                 
                 for plc_id, plc_status in network_info['status']['plcs'].items():
-                    logger.info(f"  {plc_id}: {plc_status['connected']} ({plc_status['name']})")
+                    logger.info("  %s: %s (%s)", plc_id, plc_status['connected'], plc_status['name'])
                 
             except Exception as e:
-                logger.error(f"Error getting network status: {e}")
+                logger.error("Error getting network status: %s", e)
     
     async def _on_data_sync(self, mapping, value):
         """Callback cuando se sincronizan datos."""
-        logger.info(f"🔄 Data synced: {mapping.source_plc} -> {mapping.target_plc}: {value}")
+        _info("Data synced: %s -> %s: %s", mapping.source_plc, mapping.target_plc, value, emoji="🔄")
     
     async def _on_error(self, mapping, error):
         """Callback cuando hay error en sincronización."""
-        logger.error(f"❌ Sync error: {mapping.source_plc} -> {mapping.target_plc}: {error}")
+        _error("Sync error: %s -> %s: %s", mapping.source_plc, mapping.target_plc, error, emoji="❌")
     
     async def _on_connection_change(self, plc_id, connected):
         """Callback cuando cambia la conexión de un PLC."""
         status = "connected" if connected else "disconnected"
-        logger.info(f"🔌 PLC {plc_id} {status}")
+        _info("PLC %s %s", plc_id, status, emoji="🔌")
     
     async def _on_vfd_status_change(self, new_status, old_status):
         """Callback cuando cambia el estado del VFD."""
-        logger.info(f"⚡ VFD status changed: {old_status} -> {new_status}")
+        _info("VFD status changed: %s -> %s", old_status, new_status, emoji="⚡")
     
-    async def _on_vfd_fault(self, fault_code):
-        """Callback cuando hay falla en el VFD."""
-        logger.error(f"🚨 VFD fault: {fault_code}")
+    async def _on_vfd_fault(self, fault_code, vfd_id=None):
+        """Callback cuando hay falla en el VFD: se deja de sondear durante VFD_QUARANTINE."""
+        _error("VFD fault: %s", fault_code, emoji="🚨")
+        
+        if vfd_id is not None:
+            self._vfd_quarantine[vfd_id] = asyncio.get_running_loop().time() + VFD_QUARANTINE
+            _warning("VFD %s quarantined for %ss", vfd_id, VFD_QUARANTINE, emoji="⚠️")
 
 
 async def main():
     """Función principal."""
-    logger.info("🏭 Industrial System Multi-Protocol Demo")
-    logger.info("=" * 50)
+    _info("Industrial System Multi-Protocol Demo", emoji="🏭")
+    logger.info("=" * 50 if _PRETTY else "-" * 10)
     
     # Crear simulador
     simulator = IndustrialSystemSimulator()
@@ -399,21 +995,36 @@ async def main():
         # Iniciar sistema
         await simulator.start_system()
         
-        # Mantener ejecutando
-        logger.info("🔄 System running. Press Ctrl+C to stop...")
-        while True:
-            await asyncio.sleep(1)
+        # Ctrl+C / SIGTERM activan la señal de parada
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, simulator._stop.set)
+            except NotImplementedError:
+                pass  # Windows: Ctrl+C llega como KeyboardInterrupt
+        
+        # Mantener ejecutando hasta recibir la señal de parada
+        _info("System running. Press Ctrl+C to stop...", emoji="🔄")
+        await simulator._stop.wait()
+        _info("Received stop signal...", emoji="🛑")
             
     except KeyboardInterrupt:
-        logger.info("🛑 Received stop signal...")
+        _info("Received stop signal...", emoji="🛑")
     except Exception as e:
-        logger.error(f"❌ System error: {e}")
+        _error("System error: %s", e, emoji="❌")
     finally:
         # Detener sistema
         await simulator.stop_system()
-        logger.info("👋 Demo completed")
+        _info("Demo completed", emoji="👋")
 
 
 if __name__ == "__main__":
+    # Usar el event loop de libuv si está instalado (pip install uvloop)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     # Ejecutar demo
     asyncio.run(main()) 
\ No newline at end of file
@@ -11,20 +11,46 @@ Versión: 1.0
 """
 
 import asyncio
-import json
+import ctypes
 import logging
+import queue
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, NamedTuple, Tuple
 import threading
 from dataclasses import dataclass, asdict
 import signal
+import socket
 import sys
 
-# Importar nuestra librería industrial
-from siemens_plc.connection import SiemensPLCConnection
-from siemens_plc.exceptions import PLCConnectionError, PLCReadError, PLCWriteError
-from siemens_plc.areas import MemoryArea
+# La librería industrial (siemens_plc), snap7, numpy y Numba se importan al conectar
+# o al guardar el primer resultado: cargarlos retrasa el arranque en el Jetson y los
+# caminos que no tocan el PLC (ayuda, get_status) no los necesitan
+
+try:
+    # Serialización JSON acelerada en C para exportar resultados
+    import orjson
+    
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    import json
+    
+    def _json_dumps(obj):
+        return json.dumps(obj, default=str).encode()
+
+try:
+    # Opcional: localizar el socket TCP que abre snap7 para activar keepalive
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def _unpack_byte_bits(value, out):
+    """Escribe los 8 bits de un byte (bit 0 primero) en el array de salida (se compila con Numba al conectar)"""
+    for i in range(8):
+        out[i] = (value >> i) & 1
 
 # Configuración de logging
 logging.basicConfig(
@@ -37,6 +63,87 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Nombre del área snap7 (snap7.Area[nombre]) de cada grupo de bits de test_areas (se leen byte a byte)
+BIT_GROUP_AREAS = {
+    'digital_inputs': 'PE',
+    'digital_outputs': 'PA',
+    'marks': 'MK'
+}
+
+# Áreas snap7 usadas por los descriptores, resueltas a snap7.Area en connect()
+S7_AREA_NAMES = ('PE', 'PA', 'MK', 'DB')
+
+def _parse_bit(area: str) -> Callable[[str], tuple]:
+    """Parser de direcciones de bit del área dada (ej: "E0.3" -> (PE, 0, 0, 3))"""
+    def parse(address: str) -> tuple:
+        byte, _, bit = address[1:].partition('.')
+        return area, 0, int(byte), int(bit)
+    return parse
+
+
+def _parse_word(area: str) -> Callable[[str], tuple]:
+    """Parser de direcciones de word del área dada (ej: "IW64" -> (PE, 0, 64, None))"""
+    def parse(address: str) -> tuple:
+        return area, 0, int(address[2:]), None
+    return parse
+
+
+def _parse_db(address: str) -> tuple:
+    """Parser de words de bloque de datos (ej: "DB1.DBW2" -> (DB, 1, 2, None))"""
+    db, _, word = address[2:].partition('.DBW')
+    return 'DB', int(db), int(word), None
+
+
+_parse_mark_bit = _parse_bit('MK')
+_parse_mark_word = _parse_word('MK')
+
+
+def _parse_mark(address: str) -> tuple:
+    """Las marcas comparten prefijo: "M0.2" es un bit y "MW2" una word"""
+    if address[1] == 'W':
+        return _parse_mark_word(address)
+    return _parse_mark_bit(address)
+
+
+# Parser según la primera letra de la dirección (bits E/A/M, words IW/QW/MW y DBn.DBWm)
+ADDRESS_PARSERS = {
+    'E': _parse_bit('PE'),
+    'A': _parse_bit('PA'),
+    'M': _parse_mark,
+    'I': _parse_word('PE'),
+    'Q': _parse_word('PA'),
+    'D': _parse_db
+}
+
+# Grupos leídos en cada ciclo de monitoreo y el tipo de prueba que registran
+MONITOR_GROUPS = (
+    ('digital_inputs', 'read_digital_input'),
+    ('analog_inputs', 'read_analog_input'),
+    ('marks', None)
+)
+
+# Keepalive TCP del socket S7: el kernel detecta la caída sin tráfico de aplicación
+S7_PORT = 102
+KEEPALIVE_IDLE = 30   # segundos sin tráfico antes de la primera sonda
+KEEPALIVE_INTERVAL = 10  # segundos entre sondas
+KEEPALIVE_COUNT = 3   # sondas fallidas antes de dar la conexión por caída
+# Con keepalive el heartbeat solo hace falta para lanzar la reconexión: basta uno
+# por cada ventana de detección del kernel (ms)
+KEEPALIVE_HEARTBEAT_INTERVAL = (KEEPALIVE_IDLE + KEEPALIVE_INTERVAL * KEEPALIVE_COUNT) * 1000
+
+# Textos de estado reutilizados en cada ciclo de monitoreo
+ON_STR = "🟢 ON"
+OFF_STR = "🔴 OFF"
+SEPARATOR = "=" * 60
+
+# Límites de una petición read_multi_vars (PDU por defecto de 240 bytes)
+MULTI_VAR_MAX_ITEMS = 15
+MULTI_VAR_MAX_BYTES = 240 - 18
+MULTI_VAR_ITEM_OVERHEAD = 4  # Cabecera de cada item en la respuesta
+
+# Máximo de bytes de un DB que se leen de una vez (incluyendo huecos entre words)
+DB_BULK_MAX_BYTES = MULTI_VAR_MAX_BYTES
+
 @dataclass
 class IOTestConfig:
     """Configuración para pruebas de I/O"""
@@ -46,9 +153,11 @@ class IOTestConfig:
     test_interval: float = 1.0
     auto_reconnect: bool = True
     heartbeat_interval: float = 5.0
+    read_cache_ms: int = 0  # TTL de la caché de lecturas (0 = desactivada)
+    result_buffer_size: int = 4096  # Resultados conservados en memoria
+    tcp_keepalive: bool = True  # Keepalive TCP si es posible (el heartbeat pasa a ser esporádico)
 
-@dataclass
-class IOTestResult:
+class IOTestResult(NamedTuple):
     """Resultado de una prueba de I/O"""
     timestamp: str
     test_type: str
@@ -58,6 +167,9 @@ class IOTestResult:
     error_message: Optional[str] = None
     response_time: float = 0.0
 
+# Campos de IOTestResult en orden, para serializar sin la copia recursiva de asdict
+RESULT_FIELDS = IOTestResult._fields
+
 class PLCIOTester:
     """Clase principal para pruebas de I/O del PLC"""
     
@@ -65,9 +177,31 @@ class PLCIOTester:
         self.config = config
         self.connection = None
         self.is_connected = False
-        self.test_results: List[IOTestResult] = []
+        self._tcp_keepalive_active = False  # Keepalive TCP activo en esta conexión (heartbeat espaciado)
+        # Buffer circular de resultados en columnas paralelas (struct-of-arrays):
+        # las estadísticas se calculan con operaciones vectorizadas de numpy
+        capacity = config.result_buffer_size
+        self._result_capacity = capacity
+        self._result_index = 0  # Próxima posición a escribir
+        self._result_count = 0  # Posiciones válidas (== capacity tras dar la vuelta)
+        # Las columnas se reservan con el primer resultado (_alloc_result_buffer)
+        self._result_columns = None
+        
+        # Contadores acumulados de toda la sesión (O(1) en get_status)
+        self._success_count = 0
+        self._failure_count = 0
+        
+        # Los resultados crudos se encolan en el camino de lectura y un hilo
+        # en background los guarda en el buffer fuera de ese camino
+        self._result_q: queue.SimpleQueue = queue.SimpleQueue()
+        self._results_lock = threading.Lock()
+        threading.Thread(target=self._result_drainer, daemon=True).start()
         self.monitoring = False
         self.monitor_thread = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        
+        # Caché de lecturas: {dirección: (valor, instante de expiración monotónico)}
+        self._cache: Dict[str, Tuple[Any, float]] = {}
         
         # Configuración de áreas de memoria para pruebas
         self.test_areas = {
@@ -121,6 +255,30 @@ class PLCIOTester:
             }
         }
         
+        # Direcciones parseadas una sola vez: {dirección: (área, DB, byte, bit o None)}
+        self._parsed = {
+            address: self._parse_addr(address)
+            for addresses in self.test_areas.values()
+            for address in addresses
+        }
+        
+        # Bits de cada grupo agrupados por byte: {grupo: [(byte, clave de caché, [(dirección, descripción, bit)])]}
+        self._bit_tables = {
+            group: self._build_bit_table(self.test_areas[group])
+            for group in BIT_GROUP_AREAS
+        }
+        
+        # Words de cada DB leídas en bloque: {DB: (inicio, tamaño, [(dirección, descripción, offset)])}
+        self._db_bulk = self._build_db_bulk(self.test_areas['data_blocks'])
+        
+        # Dependientes de snap7/numpy, preparados en la primera conexión (_prepare_io):
+        # {nombre: snap7.Area}, peticiones read_multi_vars del monitoreo y desempaquetado de bits
+        self._areas: Optional[Dict[str, Any]] = None
+        self._multi_var_requests: Optional[list] = None
+        self._jit_unpack = None
+        self._bit_out = None
+        self._client_lock = threading.Lock()
+        
         # Configurar signal handlers para cierre limpio
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -133,8 +291,12 @@ class PLCIOTester:
     
     def connect(self) -> bool:
         """Conectar al PLC"""
+        from siemens_plc.connection import SiemensPLCConnection
+        from siemens_plc.exceptions import PLCConnectionError
+        
         try:
             logger.info(f"Conectando al PLC en {self.config.plc_ip}...")
+            self._prepare_io()
             
             self.connection = SiemensPLCConnection(
                 ip_address=self.config.plc_ip,
@@ -148,6 +310,13 @@ class PLCIOTester:
             self.is_connected = True
             
             logger.info("✅ Conexión establecida exitosamente")
+            
+            self._tcp_keepalive_active = self._enable_tcp_keepalive()
+            if self._tcp_keepalive_active and self.config.heartbeat_interval:
+                # El kernel ya vigila el socket; el heartbeat se espacia (sin tocar la
+                # configuración) pero se mantiene porque es quien dispara la reconexión
+                logger.info("Keepalive TCP activo, heartbeat espaciado")
+                self.connection.set_heartbeat_interval(KEEPALIVE_HEARTBEAT_INTERVAL)
             return True
             
         except PLCConnectionError as e:
@@ -159,6 +328,65 @@ class PLCIOTester:
             self.is_connected = False
             return False
     
+    def _prepare_io(self):
+        """Importar snap7 (y Numba si está) y precalcular lo que depende de ellos, una sola vez"""
+        if self._areas is not None:
+            return
+        
+        from snap7 import Area
+        areas = {name: Area[name] for name in S7_AREA_NAMES}
+        
+        try:
+            # Opcional: desempaquetar los bytes leídos con código compilado por Numba
+            import numpy as np
+            from numba import njit
+            self._jit_unpack = njit(cache=True)(_unpack_byte_bits)
+            self._bit_out = np.zeros(8, dtype=np.uint8)
+        except ImportError:
+            self._jit_unpack = None
+        
+        # Peticiones read_multi_vars del ciclo de monitoreo, precalculadas una vez
+        self._multi_var_requests = self._build_multi_var_requests(areas)
+        self._areas = areas
+    
+    def _find_plc_socket_fd(self) -> Optional[int]:
+        """Buscar el descriptor del socket TCP abierto por snap7 hacia el PLC"""
+        process = psutil.Process()
+        list_connections = getattr(process, 'net_connections', None) or process.connections
+        for conn in list_connections(kind='tcp'):
+            if (conn.raddr and conn.raddr.ip == self.config.plc_ip and
+                    conn.raddr.port == S7_PORT and conn.fd != -1):
+                return conn.fd
+        return None
+    
+    def _enable_tcp_keepalive(self) -> bool:
+        """Activar SO_KEEPALIVE en el socket de snap7 para que el kernel vigile la conexión"""
+        if not (self.config.tcp_keepalive and PSUTIL_AVAILABLE):
+            return False
+        
+        try:
+            fd = self._find_plc_socket_fd()
+            if fd is None:
+                logger.warning("No se encontró el socket S7 para activar keepalive")
+                return False
+            
+            # fromfd duplica el descriptor: las opciones se aplican al mismo socket de snap7
+            sock = socket.fromfd(fd, socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                if hasattr(socket, 'TCP_KEEPIDLE'):
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL)
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+            finally:
+                sock.close()
+            
+            return True
+            
+        except (OSError, psutil.Error) as e:
+            logger.warning(f"No se pudo activar keepalive TCP: {e}")
+            return False
+    
     def disconnect(self):
         """Desconectar del PLC"""
         if self.connection:
@@ -169,59 +397,399 @@ class PLCIOTester:
                 logger.error(f"Error al cerrar conexión: {e}")
             finally:
                 self.is_connected = False
+                self._tcp_keepalive_active = False
                 self.connection = None
+                self._cache.clear()
     
-    def read_digital_inputs(self) -> Dict[str, Any]:
-        """Leer todas las entradas digitales"""
+    @staticmethod
+    def _parse_addr(address: str) -> tuple:
+        """Parsea una dirección a (área, DB, byte, bit); bit es None en words (ej: "E0.3", "IW64", "DB1.DBW2")"""
+        return ADDRESS_PARSERS[address[0]](address)
+    
+    def _descriptor(self, address: str) -> tuple:
+        """Descriptor precalculado de una dirección (se parsea si no está en test_areas)"""
+        parsed = self._parsed.get(address)
+        if parsed is None:
+            parsed = self._parse_addr(address)
+        return parsed
+    
+    def _build_bit_table(self, addresses: Dict[str, str]) -> list:
+        """Agrupa las direcciones de bit por byte para leer cada byte una sola vez"""
+        table = {}
+        for address, description in addresses.items():
+            _, _, byte, bit = self._parsed[address]
+            table.setdefault(byte, []).append((address, description, bit))
+        return [
+            (byte, self._byte_cache_key(bits[0][0]), bits)
+            for byte, bits in table.items()
+        ]
+    
+    @staticmethod
+    def _byte_cache_key(address: str) -> str:
+        """Clave de caché del byte que contiene un bit (ej: "E0.3" -> "EB0")"""
+        return f"{address[0]}B{address[1:].split('.')[0]}"
+    
+    def _cached_read(self, address: str, reader: Callable[[], Any]) -> Any:
+        """Leer a través de la caché con TTL; con read_cache_ms=0 siempre se va al PLC"""
+        ttl = self.config.read_cache_ms
+        if ttl <= 0:
+            return reader()
+        
+        now = time.monotonic()
+        entry = self._cache.get(address)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        
+        value = reader()
+        self._cache[address] = (value, now + ttl / 1000)
+        return value
+    
+    def _invalidate_cache(self, address: str):
+        """Descartar de la caché la dirección escrita (y el byte o DB que la contiene)"""
+        self._cache.pop(address, None)
+        if address.startswith('DB'):
+            self._cache.pop(address.split('.')[0], None)
+        elif '.' in address:
+            self._cache.pop(self._byte_cache_key(address), None)
+    
+    def _build_db_bulk(self, addresses: Dict[str, str]) -> Dict[int, tuple]:
+        """Agrupa las words de cada DB en un único rango para leerlas con una sola petición"""
+        words = {}
+        for address, description in addresses.items():
+            _, db_number, byte, _ = self._parsed[address]
+            words.setdefault(db_number, []).append((address, description, byte))
+        
+        bulk = {}
+        for db_number, entries in words.items():
+            start = min(byte for _, _, byte in entries)
+            size = max(byte for _, _, byte in entries) + 2 - start
+            if size <= DB_BULK_MAX_BYTES:
+                bulk[db_number] = (
+                    start, size,
+                    [(address, description, byte - start) for address, description, byte in entries]
+                )
+        return bulk
+    
+    def _read_byte(self, area: str, byte_offset: int) -> int:
+        """Leer un byte completo de un área en una sola petición S7"""
+        return self.connection.read_area(self._areas[area], 0, byte_offset, 1)[0]
+    
+    def _read_word(self, address: str) -> int:
+        """Leer una word con signo (big-endian) usando su descriptor precalculado"""
+        area, db_number, byte, _ = self._descriptor(address)
+        data = self.connection.read_area(self._areas[area], db_number, byte, 2)
+        return int.from_bytes(data[:2], 'big', signed=True)
+    
+    def _write_word(self, address: str, value: int):
+        """Escribir una word (con o sin signo) usando su descriptor precalculado"""
+        area, db_number, byte, _ = self._descriptor(address)
+        self.connection.write_area(self._areas[area], db_number, byte,
+                                   (int(value) & 0xFFFF).to_bytes(2, 'big'))
+    
+    def _read_bit_group(self, group: str, test_type: Optional[str] = None) -> Dict[str, Any]:
+        """Leer un grupo de bits con una petición por byte en lugar de una por bit"""
         results = {}
         
         if not self.is_connected:
             logger.error("No hay conexión al PLC")
             return results
         
-        for address, description in self.test_areas['digital_inputs'].items():
+        area = BIT_GROUP_AREAS[group]
+        timestamp = time.time()  # Un único instante para todos los resultados de la llamada
+        
+        for byte_offset, cache_key, bits in self._bit_tables[group]:
             try:
-                start_time = time.time()
-                value = self.connection.read_bit(address)
-                response_time = time.time() - start_time
-                
-                results[address] = {
-                    'value': bool(value),
-                    'description': description,
-                    'response_time': response_time,
-                    'success': True
-                }
-                
-                # Registrar resultado
-                self.test_results.append(IOTestResult(
-                    timestamp=datetime.now().isoformat(),
-                    test_type='read_digital_input',
-                    address=address,
-                    value=bool(value),
-                    success=True,
-                    response_time=response_time
-                ))
-                
+                start_time = time.monotonic()
+                byte_value = self._cached_read(
+                    cache_key,
+                    lambda: self._read_byte(area, byte_offset)
+                )
+                response_time = time.monotonic() - start_time
+                error = None
             except Exception as e:
-                logger.error(f"Error leyendo {address}: {e}")
-                results[address] = {
-                    'value': None,
-                    'description': description,
-                    'error': str(e),
-                    'success': False
-                }
-                
-                self.test_results.append(IOTestResult(
-                    timestamp=datetime.now().isoformat(),
-                    test_type='read_digital_input',
-                    address=address,
-                    value=None,
-                    success=False,
-                    error_message=str(e)
-                ))
+                logger.error(f"Error leyendo byte {byte_offset} de {group}: {e}")
+                byte_value = None
+                error = str(e)
+            
+            # Los bits del byte comparten el tiempo de respuesta de la única lectura
+            unpacked = self._unpack_byte(byte_value) if error is None else None
+            for address, description, bit in bits:
+                if error is None:
+                    value = bool(unpacked[bit])
+                    self._record_read(results, test_type, address, description, value,
+                                      response_time, timestamp)
+                else:
+                    self._record_read_error(results, test_type, address, description, error, timestamp)
         
         return results
     
+    def _unpack_byte(self, byte_value: int) -> List[int]:
+        """Bits de un byte como lista indexada por número de bit"""
+        if self._jit_unpack is not None:
+            self._jit_unpack(byte_value, self._bit_out)
+            return self._bit_out.tolist()
+        return [(byte_value >> i) & 1 for i in range(8)]
+    
+    def _add_result(self, test_type: str, address: str, value: Any, success: bool,
+                    error_message: Optional[str] = None, response_time: float = 0.0,
+                    timestamp: Optional[float] = None):
+        """Encolar un resultado crudo; el hilo drenador construye el IOTestResult"""
+        if timestamp is None:
+            timestamp = time.time()
+        self._result_q.put_nowait(
+            (timestamp, test_type, address, value, success, error_message, response_time)
+        )
+    
+    def _store_result(self, item: tuple):
+        """Guardar un resultado encolado en el buffer circular y actualizar los contadores"""
+        timestamp, test_type, address, value, success, error_message, response_time = item
+        if self._result_columns is None:
+            self._alloc_result_buffer()
+        
+        i = self._result_index
+        self._ts_arr[i] = timestamp
+        self._type_arr[i] = test_type
+        self._addr_arr[i] = address
+        self._value_arr[i] = value
+        self._success_arr[i] = success
+        self._error_arr[i] = error_message
+        self._rt_arr[i] = response_time
+        
+        self._result_index = (i + 1) % self._result_capacity
+        if self._result_count < self._result_capacity:
+            self._result_count += 1
+        
+        if success:
+            self._success_count += 1
+        else:
+            self._failure_count += 1
+    
+    def _alloc_result_buffer(self):
+        """Reservar las columnas del buffer circular (importa numpy con el primer resultado)"""
+        import numpy as np
+        
+        capacity = self._result_capacity
+        self._ts_arr = np.zeros(capacity, dtype=np.float64)
+        self._type_arr = np.empty(capacity, dtype=object)
+        self._addr_arr = np.empty(capacity, dtype=object)
+        self._value_arr = np.empty(capacity, dtype=object)
+        self._success_arr = np.zeros(capacity, dtype=bool)
+        self._error_arr = np.empty(capacity, dtype=object)
+        self._rt_arr = np.zeros(capacity, dtype=np.float64)
+        # Columnas en el orden de RESULT_FIELDS
+        self._result_columns = (
+            self._ts_arr, self._type_arr, self._addr_arr, self._value_arr,
+            self._success_arr, self._error_arr, self._rt_arr
+        )
+    
+    def _snapshot_results(self) -> tuple:
+        """Copia de las columnas en orden cronológico como listas (llamar con _results_lock tomado)"""
+        if not self._result_count:
+            return tuple([] for _ in RESULT_FIELDS)
+        
+        import numpy as np
+        order = np.arange(self._result_index - self._result_count, self._result_index) % self._result_capacity
+        return tuple(column[order].tolist() for column in self._result_columns)
+    
+    @staticmethod
+    def _iter_result_rows(columns: tuple):
+        """Recorrer una copia de las columnas como filas en el orden de RESULT_FIELDS"""
+        timestamps, *rest = columns
+        last_ts, last_iso = None, ''
+        for timestamp, *row in zip(timestamps, *rest):
+            # Los resultados de un mismo ciclo comparten instante: se formatea una sola vez
+            if timestamp != last_ts:
+                last_ts, last_iso = timestamp, datetime.fromtimestamp(timestamp).isoformat()
+            yield (last_iso, *row)
+    
+    @property
+    def test_results(self) -> List[IOTestResult]:
+        """Resultados conservados en el buffer, del más antiguo al más reciente"""
+        self._flush_results()
+        with self._results_lock:
+            columns = self._snapshot_results()
+        return [IOTestResult(*row) for row in self._iter_result_rows(columns)]
+    
+    def _result_drainer(self):
+        """Hilo que guarda en el buffer los resultados encolados"""
+        while True:
+            item = self._result_q.get()
+            with self._results_lock:
+                self._store_result(item)
+    
+    def _flush_results(self):
+        """Procesar en el hilo actual los resultados aún pendientes en la cola"""
+        with self._results_lock:
+            while True:
+                try:
+                    item = self._result_q.get_nowait()
+                except queue.Empty:
+                    return
+                self._store_result(item)
+    
+    def _record_read(self, results: Dict[str, Any], test_type: Optional[str],
+                     address: str, description: str, value: Any, response_time: float,
+                     timestamp: Optional[float] = None):
+        """Registrar una lectura exitosa en los resultados y, si aplica, en el historial"""
+        results[address] = {
+            'value': value,
+            'description': description,
+            'response_time': response_time,
+            'success': True
+        }
+        
+        if test_type:
+            self._add_result(
+                test_type=test_type,
+                address=address,
+                value=value,
+                success=True,
+                response_time=response_time,
+                timestamp=timestamp
+            )
+    
+    def _record_read_error(self, results: Dict[str, Any], test_type: Optional[str],
+                           address: str, description: str, error: str,
+                           timestamp: Optional[float] = None):
+        """Registrar una lectura fallida en los resultados y, si aplica, en el historial"""
+        results[address] = {
+            'value': None,
+            'description': description,
+            'error': error,
+            'success': False
+        }
+        
+        if test_type:
+            self._add_result(
+                test_type=test_type,
+                address=address,
+                value=None,
+                success=False,
+                error_message=error,
+                timestamp=timestamp
+            )
+    
+    def _build_multi_var_requests(self, areas: Dict[str, Any]) -> list:
+        """Precalcular los S7DataItem del monitoreo, troceados según los límites del PDU"""
+        try:
+            from snap7.type import S7DataItem, WordLen
+        except ImportError:  # python-snap7 < 2.0
+            from snap7.types import S7DataItem, WordLen
+        
+        spans = []
+        for group, test_type in MONITOR_GROUPS:
+            entries = []
+            for address, description in self.test_areas[group].items():
+                area, _, byte, bit = self._parsed[address]
+                entries.append((address, description, byte, bit, 1 if bit is not None else 2))
+            
+            start = min(entry[2] for entry in entries)
+            size = max(entry[2] + entry[4] for entry in entries) - start
+            
+            # Campos como (dirección, descripción, offset en el buffer, bit o None para words)
+            fields = [(address, description, byte - start, bit)
+                      for address, description, byte, bit, _ in entries]
+            spans.append((group, test_type, area, start, size, fields))
+        
+        # Trocear en peticiones que respeten el máximo de items y de bytes
+        chunks = []
+        current = []
+        current_bytes = 0
+        for span in spans:
+            cost = span[4] + MULTI_VAR_ITEM_OVERHEAD
+            if current and (len(current) >= MULTI_VAR_MAX_ITEMS or
+                            current_bytes + cost > MULTI_VAR_MAX_BYTES):
+                chunks.append(current)
+                current = []
+                current_bytes = 0
+            current.append(span)
+            current_bytes += cost
+        if current:
+            chunks.append(current)
+        
+        # Descriptores y buffers se reservan una sola vez: cada ciclo read_multi_vars
+        # rellena los mismos buffers y se decodifican a través de vistas precalculadas
+        requests = []
+        for chunk in chunks:
+            items = (S7DataItem * len(chunk))()
+            views = []
+            for item, (_, _, area, start, size, _) in zip(items, chunk):
+                buffer = ctypes.create_string_buffer(size)
+                item.Area = int(areas[area])
+                item.WordLen = int(WordLen.Byte)
+                item.DBNumber = 0
+                item.Start = start
+                item.Amount = size
+                item.pData = ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+                # La vista mantiene vivo el buffer y se indexa sin copiar sus bytes
+                views.append(memoryview(buffer).cast('B'))
+            requests.append((items, views, chunk))
+        
+        return requests
+    
+    def _read_multi_var_chunk(self, request: tuple) -> Tuple[Optional[str], float]:
+        """Ejecutar una petición read_multi_vars; devuelve (error, tiempo de respuesta)"""
+        items = request[0]
+        try:
+            # Un cliente snap7 no admite llamadas concurrentes desde varios hilos
+            with self._client_lock:
+                start_time = time.monotonic()
+                self.connection.read_multi_vars(items)
+                return None, time.monotonic() - start_time
+        except Exception as e:
+            logger.error(f"Error en lectura multi-variable: {e}")
+            return str(e), 0.0
+    
+    def _decode_multi_var_chunk(self, request: tuple, error: Optional[str], response_time: float,
+                                timestamp: float, snapshot: Dict[str, Dict[str, Any]]):
+        """Repartir los buffers de una petición read_multi_vars en los resultados por dirección"""
+        items, views, spans = request
+        for item, data, (group, test_type, _, _, _, fields) in zip(items, views, spans):
+            item_error = error
+            if item_error is None and item.Result != 0:
+                item_error = f"Error S7 en item {group}: {item.Result:#x}"
+            
+            results = snapshot[group]
+            for address, description, offset, bit in fields:
+                if item_error is not None:
+                    self._record_read_error(results, test_type, address, description,
+                                            item_error, timestamp)
+                    continue
+                
+                if bit is None:
+                    value = int.from_bytes(data[offset:offset + 2], 'big', signed=True)
+                else:
+                    value = bool(data[offset] & (1 << bit))
+                self._record_read(results, test_type, address, description, value,
+                                  response_time, timestamp)
+    
+    async def _read_monitor_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Leer todos los grupos del monitoreo lanzando todas las peticiones read_multi_vars a la vez"""
+        snapshot = {group: {} for group, _ in MONITOR_GROUPS}
+        
+        if not self.is_connected:
+            logger.error("No hay conexión al PLC")
+            return snapshot
+        
+        timestamp = time.time()  # Un único instante para todo el ciclo
+        outcomes = await asyncio.gather(*(
+            asyncio.to_thread(self._read_multi_var_chunk, request)
+            for request in self._multi_var_requests
+        ))
+        
+        for request, (error, response_time) in zip(self._multi_var_requests, outcomes):
+            self._decode_multi_var_chunk(request, error, response_time, timestamp, snapshot)
+        
+        return snapshot
+    
+    def read_digital_inputs(self) -> Dict[str, Any]:
+        """Leer todas las entradas digitales"""
+        return self._read_bit_group('digital_inputs', 'read_digital_input')
+    
+    def read_digital_outputs(self) -> Dict[str, Any]:
+        """Leer el estado de todas las salidas digitales"""
+        return self._read_bit_group('digital_outputs', 'read_digital_output')
+    
     def read_analog_inputs(self) -> Dict[str, Any]:
         """Leer todas las entradas analógicas"""
         results = {}
@@ -230,45 +798,21 @@ class PLCIOTester:
             logger.error("No hay conexión al PLC")
             return results
         
+        timestamp = time.time()  # Un único instante para todos los resultados de la llamada
+        
         for address, description in self.test_areas['analog_inputs'].items():
             try:
-                start_time = time.time()
-                value = self.connection.read_word(address)
-                response_time = time.time() - start_time
-                
-                results[address] = {
-                    'value': value,
-                    'description': description,
-                    'response_time': response_time,
-                    'success': True
-                }
+                start_time = time.monotonic()
+                value = self._cached_read(address, lambda: self._read_word(address))
+                response_time = time.monotonic() - start_time
                 
-                self.test_results.append(IOTestResult(
-                    timestamp=datetime.now().isoformat(),
-                    test_type='read_analog_input',
-                    address=address,
-                    value=value,
-                    success=True,
-                    response_time=response_time
-                ))
+                self._record_read(results, 'read_analog_input', address, description, value,
+                                  response_time, timestamp)
                 
             except Exception as e:
                 logger.error(f"Error leyendo {address}: {e}")
-                results[address] = {
-                    'value': None,
-                    'description': description,
-                    'error': str(e),
-                    'success': False
-                }
-                
-                self.test_results.append(IOTestResult(
-                    timestamp=datetime.now().isoformat(),
-                    test_type='read_analog_input',
-                    address=address,
-                    value=None,
-                    success=False,
-                    error_message=str(e)
-                ))
+                self._record_read_error(results, 'read_analog_input', address, description,
+                                        str(e), timestamp)
         
         return results
     
@@ -279,34 +823,33 @@ class PLCIOTester:
             return False
         
         try:
-            start_time = time.time()
+            start_time = time.monotonic()
             self.connection.write_bit(address, value)
-            response_time = time.time() - start_time
+            response_time = time.monotonic() - start_time
+            self._invalidate_cache(address)
             
             logger.info(f"✅ Escrito {address} = {value}")
             
-            self.test_results.append(IOTestResult(
-                timestamp=datetime.now().isoformat(),
+            self._add_result(
                 test_type='write_digital_output',
                 address=address,
                 value=value,
                 success=True,
                 response_time=response_time
-            ))
+            )
             
             return True
             
         except Exception as e:
             logger.error(f"❌ Error escribiendo {address}: {e}")
             
-            self.test_results.append(IOTestResult(
-                timestamp=datetime.now().isoformat(),
+            self._add_result(
                 test_type='write_digital_output',
                 address=address,
                 value=value,
                 success=False,
                 error_message=str(e)
-            ))
+            )
             
             return False
     
@@ -317,68 +860,39 @@ class PLCIOTester:
             return False
         
         try:
-            start_time = time.time()
-            self.connection.write_word(address, value)
-            response_time = time.time() - start_time
+            start_time = time.monotonic()
+            self._write_word(address, value)
+            response_time = time.monotonic() - start_time
+            self._invalidate_cache(address)
             
             logger.info(f"✅ Escrito {address} = {value}")
             
-            self.test_results.append(IOTestResult(
-                timestamp=datetime.now().isoformat(),
+            self._add_result(
                 test_type='write_analog_output',
                 address=address,
                 value=value,
                 success=True,
                 response_time=response_time
-            ))
+            )
             
             return True
             
         except Exception as e:
             logger.error(f"❌ Error escribiendo {address}: {e}")
             
-            self.test_results.append(IOTestResult(
-                timestamp=datetime.now().isoformat(),
+            self._add_result(
                 test_type='write_analog_output',
                 address=address,
                 value=value,
                 success=False,
                 error_message=str(e)
-            ))
+            )
             
             return False
     
     def read_marks(self) -> Dict[str, Any]:
         """Leer marcas (memoria interna)"""
-        results = {}
-        
-        if not self.is_connected:
-            logger.error("No hay conexión al PLC")
-            return results
-        
-        for address, description in self.test_areas['marks'].items():
-            try:
-                start_time = time.time()
-                value = self.connection.read_bit(address)
-                response_time = time.time() - start_time
-                
-                results[address] = {
-                    'value': bool(value),
-                    'description': description,
-                    'response_time': response_time,
-                    'success': True
-                }
-                
-            except Exception as e:
-                logger.error(f"Error leyendo {address}: {e}")
-                results[address] = {
-                    'value': None,
-                    'description': description,
-                    'error': str(e),
-                    'success': False
-                }
-        
-        return results
+        return self._read_bit_group('marks')
     
     def write_mark(self, address: str, value: bool) -> bool:
         """Escribir una marca"""
@@ -388,6 +902,7 @@ class PLCIOTester:
         
         try:
             self.connection.write_bit(address, value)
+            self._invalidate_cache(address)
             logger.info(f"✅ Escrito {address} = {value}")
             return True
         except Exception as e:
@@ -402,27 +917,41 @@ class PLCIOTester:
             logger.error("No hay conexión al PLC")
             return results
         
+        # Una petición por DB para todas sus words
+        bulk_addresses = set()
+        for db_number, (start, size, entries) in self._db_bulk.items():
+            try:
+                start_time = time.monotonic()
+                data = self._cached_read(
+                    f"DB{db_number}",
+                    lambda: self.connection.read_area(self._areas['DB'], db_number, start, size)
+                )
+                response_time = time.monotonic() - start_time
+                error = None
+            except Exception as e:
+                logger.error(f"Error leyendo DB{db_number}: {e}")
+                error = str(e)
+            
+            for address, description, offset in entries:
+                bulk_addresses.add(address)
+                if error is None:
+                    value = int.from_bytes(data[offset:offset + 2], 'big', signed=True)
+                    self._record_read(results, None, address, description, value, response_time)
+                else:
+                    self._record_read_error(results, None, address, description, error)
+        
+        # Words de DBs demasiado dispersos para un solo rango: lectura individual
         for address, description in self.test_areas['data_blocks'].items():
+            if address in bulk_addresses:
+                continue
             try:
-                start_time = time.time()
-                value = self.connection.read_word(address)
-                response_time = time.time() - start_time
-                
-                results[address] = {
-                    'value': value,
-                    'description': description,
-                    'response_time': response_time,
-                    'success': True
-                }
-                
+                start_time = time.monotonic()
+                value = self._cached_read(address, lambda: self._read_word(address))
+                response_time = time.monotonic() - start_time
+                self._record_read(results, None, address, description, value, response_time)
             except Exception as e:
                 logger.error(f"Error leyendo {address}: {e}")
-                results[address] = {
-                    'value': None,
-                    'description': description,
-                    'error': str(e),
-                    'success': False
-                }
+                self._record_read_error(results, None, address, description, str(e))
         
         return results
     
@@ -433,7 +962,8 @@ class PLCIOTester:
             return False
         
         try:
-            self.connection.write_word(address, value)
+            self._write_word(address, value)
+            self._invalidate_cache(address)
             logger.info(f"✅ Escrito {address} = {value}")
             return True
         except Exception as e:
@@ -447,61 +977,86 @@ class PLCIOTester:
             return
         
         self.monitoring = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        self.monitor_thread.start()
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Uso síncrono (sin event loop): el loop asíncrono corre en su propio hilo
+            self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self.monitor_thread.start()
+        else:
+            # Dentro de un event loop el monitoreo es una tarea más, sin hilo extra
+            self._monitor_task = loop.create_task(self._monitor_loop_async())
+        
         logger.info("🔄 Monitoreo iniciado")
     
     def stop_monitoring(self):
         """Detener monitoreo"""
         self.monitoring = False
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            self._monitor_task = None
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
+            self.monitor_thread = None
         logger.info("⏹️ Monitoreo detenido")
     
     def _monitor_loop(self):
+        """Hilo de monitoreo: ejecuta el loop asíncrono en su propio event loop"""
+        asyncio.run(self._monitor_loop_async())
+    
+    async def _monitor_loop_async(self):
         """Loop de monitoreo en tiempo real"""
+        loop = asyncio.get_running_loop()
+        next_cycle = loop.time()
+        
         while self.monitoring:
             try:
                 if self.is_connected:
-                    # Leer entradas
-                    digital_inputs = self.read_digital_inputs()
-                    analog_inputs = self.read_analog_inputs()
-                    marks = self.read_marks()
+                    # Leer entradas, analógicas y marcas con peticiones multi-variable
+                    snapshot = await self._read_monitor_snapshot()
+                    digital_inputs = snapshot['digital_inputs']
+                    analog_inputs = snapshot['analog_inputs']
+                    marks = snapshot['marks']
                     
-                    # Mostrar estado
-                    print("\n" + "="*60)
-                    print(f"📊 MONITOREO PLC - {datetime.now().strftime('%H:%M:%S')}")
-                    print("="*60)
+                    # Mostrar estado: se arma todo el bloque y se escribe de una vez
+                    lines = [
+                        "\n" + SEPARATOR,
+                        f"📊 MONITOREO PLC - {datetime.now().strftime('%H:%M:%S')}",
+                        SEPARATOR
+                    ]
                     
                     # Entradas digitales
-                    print("\n🔌 ENTRADAS DIGITALES:")
+                    lines.append("\n🔌 ENTRADAS DIGITALES:")
                     for addr, data in digital_inputs.items():
-                        status = "🟢 ON" if data.get('value') else "🔴 OFF"
-                        print(f"  {addr}: {status} ({data.get('description', '')})")
+                        status = ON_STR if data.get('value') else OFF_STR
+                        lines.append(f"  {addr}: {status} ({data.get('description', '')})")
                     
                     # Entradas analógicas
-                    print("\n📊 ENTRADAS ANALÓGICAS:")
+                    lines.append("\n📊 ENTRADAS ANALÓGICAS:")
                     for addr, data in analog_inputs.items():
                         if data.get('success'):
-                            print(f"  {addr}: {data.get('value')} ({data.get('description', '')})")
+                            lines.append(f"  {addr}: {data.get('value')} ({data.get('description', '')})")
                         else:
-                            print(f"  {addr}: ❌ ERROR")
+                            lines.append(f"  {addr}: ❌ ERROR")
                     
                     # Marcas
-                    print("\n🏷️ MARCAS:")
+                    lines.append("\n🏷️ MARCAS:")
                     for addr, data in marks.items():
-                        status = "🟢 ON" if data.get('value') else "🔴 OFF"
-                        print(f"  {addr}: {status} ({data.get('description', '')})")
+                        status = ON_STR if data.get('value') else OFF_STR
+                        lines.append(f"  {addr}: {status} ({data.get('description', '')})")
                     
-                    print("\n" + "="*60)
-                
-                time.sleep(self.config.test_interval)
+                    lines.append("\n" + SEPARATOR)
+                    sys.stdout.write("\n".join(lines) + "\n")
+                    sys.stdout.flush()
                 
-            except KeyboardInterrupt:
-                break
             except Exception as e:
                 logger.error(f"Error en monitoreo: {e}")
-                time.sleep(self.config.test_interval)
+            
+            # test_interval se mide entre inicios de ciclo, no tras la lectura;
+            # si un ciclo se retrasa se reprograma desde ahora en lugar de encadenar ciclos
+            next_cycle = max(next_cycle + self.config.test_interval, loop.time())
+            await asyncio.sleep(next_cycle - loop.time())
     
     def run_quick_test(self):
         """Ejecutar prueba rápida de todas las funciones"""
@@ -551,33 +1106,88 @@ class PLCIOTester:
     
     def get_status(self) -> Dict[str, Any]:
         """Obtener estado actual del sistema"""
+        self._flush_results()
+        
+        response_times, last_ts = None, None
+        with self._results_lock:
+            n = self._result_count
+            if n:
+                # Las posiciones válidas son [0, n) tanto antes como después de dar la vuelta
+                response_times = self._rt_arr[:n][self._success_arr[:n]]
+                last_ts = self._ts_arr[self._result_index - 1]
+        
+        avg_response_time = p99_response_time = None
+        if response_times is not None and response_times.size:
+            import numpy as np
+            avg_response_time = float(response_times.mean())
+            p99_response_time = float(np.quantile(response_times, 0.99))
+        
         return {
             'connected': self.is_connected,
             'monitoring': self.monitoring,
             'plc_ip': self.config.plc_ip,
+            'tcp_keepalive': self._tcp_keepalive_active,
             'test_interval': self.config.test_interval,
-            'total_tests': len(self.test_results),
-            'successful_tests': len([r for r in self.test_results if r.success]),
-            'failed_tests': len([r for r in self.test_results if not r.success]),
-            'last_test': self.test_results[-1].timestamp if self.test_results else None
+            'total_tests': self._success_count + self._failure_count,
+            'successful_tests': self._success_count,
+            'failed_tests': self._failure_count,
+            'avg_response_time': avg_response_time,
+            'p99_response_time': p99_response_time,
+            'last_test': datetime.fromtimestamp(last_ts).isoformat() if last_ts is not None else None
         }
     
-    def export_results(self, filename: str = None):
-        """Exportar resultados a JSON"""
+    def export_results(self, filename: str = None) -> threading.Thread:
+        """Exportar resultados a JSON por líneas (NDJSON) en un hilo en background"""
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"plc_test_results_{timestamp}.json"
+            filename = f"plc_test_results_{timestamp}.ndjson"
+        
+        status = self.get_status()
+        
+        # El hilo drenador sigue agregando resultados: copiar las columnas bajo el lock
+        with self._results_lock:
+            columns = self._snapshot_results()
         
-        data = {
+        header = {
             'config': asdict(self.config),
-            'status': self.get_status(),
-            'results': [asdict(result) for result in self.test_results]
+            'status': status
         }
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        logger.info(f"Resultados exportados a {filename}")
+        thread = threading.Thread(
+            target=self._write_export,
+            args=(filename, header, columns),
+            daemon=True
+        )
+        thread.start()
+        return thread
+    
+    def _write_export(self, filename: str, header: Dict[str, Any], columns: tuple):
+        """Escribir la cabecera (config + estado) y un resultado por línea"""
+        try:
+            with open(filename, 'wb') as f:
+                f.write(_json_dumps(header))
+                f.write(b"\n")
+                for row in self._iter_result_rows(columns):
+                    f.write(_json_dumps(dict(zip(RESULT_FIELDS, row))))
+                    f.write(b"\n")
+            
+            logger.info(f"Resultados exportados a {filename}")
+        except Exception as e:
+            logger.error(f"Error exportando resultados a {filename}: {e}")
+
+async def _monitor_until_stopped(tester: PLCIOTester):
+    """Monitorear como tarea del event loop hasta recibir Ctrl+C o SIGTERM"""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    
+    tester.start_monitoring()
+    try:
+        await stop_event.wait()
+    finally:
+        print("\n⏹️ Deteniendo monitoreo...")
+        tester.stop_monitoring()
 
 def main():
     """Función principal"""
@@ -602,15 +1212,8 @@ def main():
             if response in ['s', 'si', 'sí', 'y', 'yes']:
                 print("\n🔄 Iniciando monitoreo... (Ctrl+C para detener)")
                 tester.connect()
-                tester.start_monitoring()
-                
-                try:
-                    while True:
-                        time.sleep(1)
-                except KeyboardInterrupt:
-                    print("\n⏹️ Deteniendo monitoreo...")
-                    tester.stop_monitoring()
-                    tester.disconnect()
+                asyncio.run(_monitor_until_stopped(tester))
+                tester.disconnect()
         else:
             print("\n❌ La prueba falló. Revisa la conexión al PLC.")
     
@@ -7,29 +7,168 @@ Servicio de comunicación con PLC Siemens que puede ser integrado
 con la interfaz web de SAMABOT UI Light.
 """
 
+import asyncio
+import copy
+import os
+import queue
 import time
 import json
+import struct
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
+import ctypes
 import snap7
 from snap7 import Area
 import logging
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    # Serialización JSON acelerada en C para get_json
+    import orjson
+    
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+try:
+    from snap7.type import S7DataItem, WordLen, Parameter
+    PDU_REQUEST_PARAM = Parameter.PDURequest
+except ImportError:  # python-snap7 < 2.0
+    from snap7.types import S7DataItem, WordLen, PDURequest as PDU_REQUEST_PARAM
+
+try:
+    # Opcional: decodificar la imagen de I/O con código compilado por Numba
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _jit_decode_image(pe, pa, analog_offset, bits_out, analog_out):
+        """Desempaqueta E0 y A0 en bits_out[0:8] y [8:16] y las words big-endian de PE en analog_out."""
+        for i in range(8):
+            bits_out[i] = (pe[0] >> i) & 1
+            bits_out[8 + i] = (pa[0] >> i) & 1
+        for w in range(analog_out.shape[0]):
+            analog_out[w] = (pe[analog_offset + 2 * w] << 8) | pe[analog_offset + 2 * w + 1]
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("PLC_Service")
 
+# Mientras haya algún monitoreo activo el servicio solo encola sus registros y un
+# hilo aparte los formatea y escribe con los handlers raíz, fuera del hilo del ciclo
+_log_queue = queue.SimpleQueue()
+_log_handler = QueueHandler(_log_queue)
+_log_listener: Optional[QueueListener] = None
+_log_users = 0
+_log_users_lock = threading.Lock()
+
+
+def _start_queued_logging():
+    """Desvía los registros de PLC_Service a la cola (el primer monitoreo arranca el listener)."""
+    global _log_listener, _log_users
+    with _log_users_lock:
+        _log_users += 1
+        if _log_users == 1:
+            _log_listener = QueueListener(_log_queue, *logging.getLogger().handlers,
+                                          respect_handler_level=True)
+            _log_listener.start()
+            logger.addHandler(_log_handler)
+            logger.propagate = False
+
+
+def _stop_queued_logging():
+    """Vuelve al logging directo y vacía la cola al detenerse el último monitoreo."""
+    global _log_listener, _log_users
+    with _log_users_lock:
+        if _log_users == 0:
+            return
+        _log_users -= 1
+        if _log_users == 0:
+            logger.removeHandler(_log_handler)
+            logger.propagate = True
+            _log_listener.stop()
+            _log_listener = None
+
+# Un mismo error repetido en el ciclo se registra como mucho cada ERROR_LOG_INTERVAL segundos
+ERROR_LOG_INTERVAL = 5.0
+
+# Imagen de I/O publicada: E0.x y AIW0..AIW6 en el área PE, A0.x en el área PA
+INPUT_KEYS = tuple(f"E0.{i}" for i in range(8))
+OUTPUT_KEYS = tuple(f"A0.{i}" for i in range(8))
+ANALOG_KEYS = ("AIW0", "AIW2", "AIW4", "AIW6")
+ANALOG_OFFSET = 0  # Byte de PE donde empieza AIW0
+PE_READ_SIZE = ANALOG_OFFSET + 2 * len(ANALOG_KEYS)  # Cubre E0 y las 4 words
+ANALOG_STRUCT = struct.Struct(f">{len(ANALOG_KEYS)}H")  # Words big-endian sin signo
+
+# Ciclo del monitoreo: los últimos MONITOR_SPIN segundos de cada espera se hacen en
+# busy-wait para que el jitter del planificador no retrase la siguiente lectura
+MONITOR_INTERVAL = 0.5
+MONITOR_SPIN = 0.001
+
+# Núcleo reservado a los hilos del monitoreo (Jetson Nano: 0-3) y su prioridad (nice)
+MONITOR_CPU = 3
+MONITOR_NICE = -5
+
+# Espera máxima (s) de write_output a que el monitoreo escriba el byte acumulado
+WRITE_CONFIRM_TIMEOUT = 4 * MONITOR_INTERVAL
+
+# Antigüedad máxima (s) de la imagen de PA para usarla al escribir salidas; más vieja se lee del PLC
+PA_IMAGE_TTL = 0.1
+
+# PDU pedida al conectar (máximo de un S7-1500); el PLC negocia la que admite
+PDU_SIZE_REQUESTED = 960
+S7_PDU_OVERHEAD = 18  # Cabeceras de una respuesta de lectura: datos útiles = PDU - 18
+
+# Salidas precalculadas: {"A0.3": (byte 0, bit 3)}; las de bytes superiores se parsean en cada uso
+OUTPUT_ADDRESSES = {f"A{byte}.{bit}": (byte, bit) for byte in range(4) for bit in range(8)}
+
+# Tabla de los 256 bytes posibles con sus 8 bits ya convertidos a bool (bit 0 primero)
+BYTE_TO_BITS = tuple(tuple(bool(b & (1 << i)) for i in range(8)) for b in range(256))
+
 class PLCService:
     """Servicio de comunicación con PLC Siemens."""
     
+    __slots__ = (
+        "ip", "rack", "slot", "client", "connected", "running", "monitor_thread",
+        "data", "connection_time",
+        "_read_area", "_write_area", "_read_multi_vars",
+        "_loop", "_monitor_future", "_io_executor", "_lock", "_io_lock",
+        "_pdu_len", "_last_err", "_last_err_ts",
+        "_multi_items", "_multi_views",
+        "_pe", "_pa", "_pa_valid", "_pending_writes",
+        "_flush_cond", "_flush_started", "_flush_done", "_flush_failed",
+        "_image_version", "_view_version", "_read_ts", "_pa_ttl",
+        "_pe_np", "_pa_np", "_bits_out", "_analog_out",
+        "_json_data", "_json_cache", "_ts_epoch", "_ts_str"
+    )
+    
     def __init__(self, ip: str = "192.168.1.5", rack: int = 0, slot: int = 1):
         self.ip = ip
         self.rack = rack
         self.slot = slot
         self.client = snap7.client.Client()
+        # Métodos del cliente resueltos una vez para no buscarlos en cada ciclo
+        self._read_area = self.client.read_area
+        self._write_area = self.client.write_area
+        self._read_multi_vars = self.client.read_multi_vars
         self.connected = False
         self.running = False
-        self.monitor_thread = None
+        self.monitor_thread = None  # Hilo que ejecuta el event loop del monitoreo
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._monitor_future = None
+        self._io_executor: Optional[ThreadPoolExecutor] = None  # Hilo dedicado a la E/S S7
+        # self.data se publica copy-on-write: cada cambio crea un dict nuevo bajo el
+        # lock y los lectores obtienen siempre una versión completa que no cambia
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()  # Serializa las llamadas al cliente snap7 entre hilos
         self.data = {
             "connection": {
                 "status": "disconnected",
@@ -73,18 +212,79 @@ class PLCService:
             }
         }
         self.connection_time = 0
+        self._pdu_len = 0  # PDU negociada en la última conexión
+        self._last_err = None     # Último error registrado por el ciclo y cuándo
+        self._last_err_ts = 0.0
+        
+        # Petición read_multi_vars del ciclo (PE y PA en un solo trabajo S7),
+        # con los buffers reservados una vez y reutilizados en cada lectura
+        self._multi_items = (S7DataItem * 2)()
+        self._multi_views = []
+        for item, (area, size) in zip(self._multi_items, ((Area.PE, PE_READ_SIZE), (Area.PA, 1))):
+            buffer = ctypes.create_string_buffer(size)
+            item.Area = int(area)
+            item.WordLen = int(WordLen.Byte)
+            item.DBNumber = 0
+            item.Start = 0
+            item.Amount = size
+            item.pData = ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+            self._multi_views.append(memoryview(buffer).cast('B'))
+        
+        # Imagen de I/O en crudo: bytes de PE (E0 y AIW0..AIW6) y de PA. Las secciones
+        # "inputs", "outputs" y "analog" se generan a partir de ella al consultar los datos
+        self._pe = bytearray(PE_READ_SIZE)
+        self._pa = bytearray(1)
+        self._pa_valid = False   # La imagen de PA refleja una lectura de esta conexión
+        
+        # Escrituras de salidas pendientes: {byte: (máscara de bits, valores)}
+        self._pending_writes: Dict[int, tuple] = {}
+        # Escrituras lanzadas y terminadas, y bytes que fallaron en la última
+        self._flush_cond = threading.Condition(self._lock)
+        self._flush_started = 0
+        self._flush_done = 0
+        self._flush_failed = frozenset()
+        self._image_version = 0  # Se incrementa con cada cambio de la imagen
+        self._view_version = 0   # Versión de la imagen reflejada en self.data
+        
+        self._read_ts = 0.0  # time.monotonic() de la última lectura de la imagen
+        self._pa_ttl = PA_IMAGE_TTL
+        
+        if NUMBA_AVAILABLE:
+            # Vistas sin copia de la imagen y arrays de salida reutilizados por el decodificador
+            self._pe_np = np.frombuffer(self._pe, dtype=np.uint8)
+            self._pa_np = np.frombuffer(self._pa, dtype=np.uint8)
+            self._bits_out = np.zeros(16, dtype=np.bool_)
+            self._analog_out = np.zeros(len(ANALOG_KEYS), dtype=np.uint16)
+        
+        # JSON de la última versión de self.data (cada cambio publica un dict nuevo)
+        self._json_data = None
+        self._json_cache = None
+        
+        # Marca de tiempo formateada, recalculada solo al cambiar de segundo
+        self._ts_epoch = None
+        self._ts_str = None
         
     def connect(self) -> bool:
         """Conecta al PLC."""
         try:
-            logger.info(f"Conectando al PLC {self.ip}...")
+            logger.info("Conectando al PLC %s...", self.ip)
+            try:
+                # Pedir la PDU más grande para que las lecturas en bloque quepan en un trabajo S7
+                self.client.set_param(PDU_REQUEST_PARAM, PDU_SIZE_REQUESTED)
+            except Exception as e:
+                logger.warning("No se pudo solicitar PDU de %d bytes: %s", PDU_SIZE_REQUESTED, e)
             self.client.connect(self.ip, self.rack, self.slot)
             
             if self.client.get_connected():
                 self.connected = True
                 self.connection_time = time.time()
-                self.data["connection"]["status"] = "connected"
-                self.data["connection"]["last_update"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                self._pdu_len = self.client.get_pdu_length()
+                logger.info("📦 PDU negociada: %d bytes (%d de datos por petición)",
+                            self._pdu_len, self._pdu_len - S7_PDU_OVERHEAD)
+                self._publish({"connection": {
+                    "status": "connected",
+                    "last_update": self._timestamp()
+                }})
                 logger.info("✅ Conectado exitosamente al PLC")
                 
                 # Obtener información del PLC
@@ -95,29 +295,65 @@ class PLCService:
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ Error conectando al PLC: {e}")
-            self.data["status"]["last_error"] = str(e)
-            self.data["status"]["error_count"] += 1
+            logger.error("❌ Error conectando al PLC: %s", e)
+            self._record_error(e)
             return False
     
     def disconnect(self):
         """Desconecta del PLC."""
         try:
             self.stop_monitoring()
+            if self.connected and self._pending_writes:
+                self.flush_writes()  # No perder salidas acumuladas en el último ciclo
+            with self._lock:
+                self._pending_writes = {}  # Lo que no se pudo escribir no se aplica al reconectar
             if self.client.get_connected():
                 self.client.disconnect()
             self.connected = False
-            self.data["connection"]["status"] = "disconnected"
+            self._pa_valid = False
+            self._publish({"connection": {"status": "disconnected"}})
             logger.info("🔌 Desconectado del PLC")
         except Exception as e:
-            logger.error(f"Error desconectando: {e}")
+            logger.error("Error desconectando: %s", e)
+    
+    def _timestamp(self) -> str:
+        """Hora actual formateada; strftime solo se llama una vez por segundo."""
+        now = int(time.time())
+        if now != self._ts_epoch:
+            self._ts_epoch = now
+            self._ts_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        return self._ts_str
+    
+    def _publish(self, changes: Dict[str, Dict[str, Any]]):
+        """Publica una nueva versión de self.data con las secciones modificadas."""
+        with self._lock:
+            data = dict(self.data)
+            for section, values in changes.items():
+                data[section] = {**data[section], **values}
+            self.data = data
+    
+    def _record_error(self, error: Exception):
+        """Registra un error en la sección de estado."""
+        with self._lock:
+            self._publish({"status": {
+                "last_error": str(error),
+                "error_count": self.data["status"]["error_count"] + 1
+            }})
+    
+    def _log_cycle_error(self, message: str):
+        """Registra un error del ciclo sin repetir el mismo mensaje antes de ERROR_LOG_INTERVAL."""
+        now = time.monotonic()
+        if message != self._last_err or now - self._last_err_ts > ERROR_LOG_INTERVAL:
+            logger.error("%s", message)
+            self._last_err = message
+            self._last_err_ts = now
     
     def _get_plc_info(self):
         """Obtiene información del PLC."""
         try:
             # CPU Info
             cpu_info = self.client.get_cpu_info()
-            self.data["status"]["cpu_info"] = {
+            cpu_info = {
                 "module_type": str(cpu_info.get('ModuleTypeName', 'N/A')),
                 "serial_number": str(cpu_info.get('SerialNumber', 'N/A')),
                 "as_name": str(cpu_info.get('ASName', 'N/A')),
@@ -126,48 +362,28 @@ class PLCService:
             
             # Order Code
             order_code = self.client.get_order_code()
-            self.data["status"]["order_code"] = str(order_code)
+            self._publish({"status": {"cpu_info": cpu_info, "order_code": str(order_code)}})
             
         except Exception as e:
-            logger.warning(f"No se pudo obtener información del PLC: {e}")
+            logger.warning("No se pudo obtener información del PLC: %s", e)
     
-    def read_inputs(self):
-        """Lee todas las entradas digitales."""
-        if not self.connected:
-            return
+    def _parse_output(self, output: str) -> tuple:
+        """Parsea una salida (ej: "A0.3" -> byte 0, bit 3)."""
+        parsed = OUTPUT_ADDRESSES.get(output)
+        if parsed is not None:
+            return parsed
         
-        try:
-            # Leer 1 byte de entradas digitales (E área)
-            data = self.client.read_area(Area.PE, 0, 0, 1)
-            
-            # Actualizar cada entrada
-            for i in range(8):
-                bit_value = bool(data[0] & (1 << i))
-                self.data["inputs"][f"E0.{i}"] = bit_value
-                
-        except Exception as e:
-            logger.error(f"Error leyendo entradas: {e}")
-            self.data["status"]["last_error"] = str(e)
-            self.data["status"]["error_count"] += 1
-    
-    def read_outputs(self):
-        """Lee todas las salidas digitales."""
-        if not self.connected:
-            return
+        if not output.startswith("A"):
+            raise ValueError("Solo se pueden escribir salidas (A)")
         
-        try:
-            # Leer 1 byte de salidas digitales (A área)
-            data = self.client.read_area(Area.PA, 0, 0, 1)
-            
-            # Actualizar cada salida
-            for i in range(8):
-                bit_value = bool(data[0] & (1 << i))
-                self.data["outputs"][f"A0.{i}"] = bit_value
-                
-        except Exception as e:
-            logger.error(f"Error leyendo salidas: {e}")
-            self.data["status"]["last_error"] = str(e)
-            self.data["status"]["error_count"] += 1
+        parts = output.split(".")
+        if len(parts) != 2:
+            raise ValueError("Formato inválido. Use A0.0, A0.1, etc.")
+        
+        parsed = int(parts[0][1:]), int(parts[1])
+        if parsed[0] < 0 or not 0 <= parsed[1] <= 7:
+            raise ValueError("Formato inválido. Use A0.0, A0.1, etc.")
+        return parsed
     
     def write_output(self, output: str, value: bool) -> bool:
         """Escribe una salida digital específica."""
@@ -176,80 +392,243 @@ class PLCService:
         
         try:
             # Parsear salida (ej: "A0.0" -> byte 0, bit 0)
-            if not output.startswith("A"):
-                raise ValueError("Solo se pueden escribir salidas (A)")
-            
-            parts = output.split(".")
-            if len(parts) != 2:
-                raise ValueError("Formato inválido. Use A0.0, A0.1, etc.")
+            byte_num, bit_num = self._parse_output(output)
+            with self._lock:
+                flush = self._flush_started + 1  # Primera escritura que incluirá este cambio
+                self._queue_output(byte_num, bit_num, value)
             
-            byte_num = int(parts[0][1:])  # 0
-            bit_num = int(parts[1])       # 0-7
-            
-            # Leer estado actual
-            current_data = self.client.read_area(Area.PA, 0, byte_num, 1)
-            
-            # Modificar bit específico
-            new_data = bytearray(current_data)
+        except Exception as e:
+            logger.error("Error escribiendo %s: %s", output, e)
+            self._record_error(e)
+            return False
+        
+        logger.info("📝 %s = %s", output, "ON" if value else "OFF")
+        
+        # Con el monitoreo activo la escritura sale en el próximo ciclo
+        if self.running:
+            return self._wait_flush(flush, {byte_num: 1 << bit_num})
+        return self.flush_writes()
+    
+    def write_outputs(self, outputs: Dict[str, bool]) -> Dict[str, bool]:
+        """Escribe varias salidas digitales con una escritura por byte."""
+        results = {output: False for output in outputs}
+        if not self.connected:
+            return results
+        
+        masks = {}
+        with self._lock:
+            flush = self._flush_started + 1
+            for output, value in outputs.items():
+                try:
+                    byte_num, bit_num = self._parse_output(output)
+                except Exception as e:
+                    logger.error("Error escribiendo %s: %s", output, e)
+                    self._record_error(e)
+                    continue
+                self._queue_output(byte_num, bit_num, value)
+                masks[byte_num] = masks.get(byte_num, 0) | (1 << bit_num)
+                results[output] = True
+        
+        if self.running:
+            success = self._wait_flush(flush, masks)
+        else:
+            success = self.flush_writes()
+        if not success:
+            return {output: False for output in outputs}
+        return results
+    
+    def _queue_output(self, byte_num: int, bit_num: int, value: bool):
+        """Acumula el cambio de un bit de salida como (máscara, valor) de su byte."""
+        bit_mask = 1 << bit_num
+        with self._lock:
+            mask, bits = self._pending_writes.get(byte_num, (0, 0))
             if value:
-                new_data[0] |= (1 << bit_num)   # Set bit
+                bits |= bit_mask
             else:
-                new_data[0] &= ~(1 << bit_num)  # Clear bit
-            
-            # Escribir
-            self.client.write_area(Area.PA, 0, byte_num, bytes(new_data))
-            
-            # Actualizar datos locales
-            self.data["outputs"][output] = value
+                bits &= ~bit_mask
+            self._pending_writes[byte_num] = (mask | bit_mask, bits)
+    
+    def flush_writes(self) -> bool:
+        """Escribe en el PLC las salidas pendientes con una escritura por byte.
+        
+        Los bytes que fallan vuelven a la cola para el próximo intento.
+        """
+        failed = {}
+        with self._io_lock:
+            with self._flush_cond:
+                pending = self._pending_writes
+                self._pending_writes = {}
+                self._flush_started += 1
+                self._flush_cond.notify_all()
             
-            logger.info(f"✅ {output} = {'ON' if value else 'OFF'}")
-            return True
+            for byte_num, (mask, bits) in pending.items():
+                try:
+                    # Estado actual: de la imagen si es reciente o, si no, leído del PLC
+                    current = self._pa_byte(byte_num)
+                    new = (current & ~mask) | bits
+                    
+                    # Escribir solo si el byte cambia (current nunca es más viejo que PA_IMAGE_TTL)
+                    if new != current:
+                        self._write_area(Area.PA, 0, byte_num, bytes([new]))
+                        
+                        # Actualizar la imagen local; el próximo ciclo la corrige con el byte leído
+                        self._set_output_image(byte_num, new)
+                    
+                    logger.info("✅ AB%d = %s", byte_num, format(new, "08b"))
+                    
+                except Exception as e:
+                    logger.error("Error escribiendo byte de salidas %d: %s", byte_num, e)
+                    self._record_error(e)
+                    failed[byte_num] = (mask, bits)
             
-        except Exception as e:
-            logger.error(f"Error escribiendo {output}: {e}")
-            self.data["status"]["last_error"] = str(e)
-            self.data["status"]["error_count"] += 1
-            return False
+            with self._flush_cond:
+                for byte_num, (mask, bits) in failed.items():
+                    # Los cambios acumulados mientras tanto mandan sobre los reencolados
+                    newer_mask, newer_bits = self._pending_writes.get(byte_num, (0, 0))
+                    self._pending_writes[byte_num] = (mask | newer_mask,
+                                                      (bits & ~newer_mask) | newer_bits)
+                self._flush_failed = frozenset(failed)
+                self._flush_done += 1
+                self._flush_cond.notify_all()
+        
+        return not failed
     
-    def read_analog(self):
-        """Lee entradas analógicas."""
-        if not self.connected:
-            return
+    def _wait_flush(self, flush: int, masks: Dict[int, int]) -> bool:
+        """Espera a que el monitoreo complete la escritura número flush; True si sus bytes se escribieron.
         
+        Si vence WRITE_CONFIRM_TIMEOUT antes de que esa escritura empiece, retira de la cola
+        los bits del llamador (masks: byte -> máscara) para que no se escriban después.
+        """
+        with self._flush_cond:
+            self._flush_cond.wait_for(
+                lambda: self._flush_started >= flush or not self.running, WRITE_CONFIRM_TIMEOUT)
+            if self._flush_started >= flush:
+                # La escritura que lleva el cambio ya empezó: se espera su resultado
+                self._flush_cond.wait_for(lambda: self._flush_done >= flush)
+                return not self._flush_failed.intersection(masks)
+            if self.running:
+                for byte_num, bit_mask in masks.items():
+                    if byte_num not in self._pending_writes:
+                        continue
+                    mask, bits = self._pending_writes[byte_num]
+                    mask &= ~bit_mask
+                    if mask:
+                        self._pending_writes[byte_num] = (mask, bits & ~bit_mask)
+                    else:
+                        del self._pending_writes[byte_num]
+                logger.warning("Escritura no confirmada en %.1fs, cambio descartado", WRITE_CONFIRM_TIMEOUT)
+                return False
+        # El monitoreo se detuvo antes de escribir: se escribe directamente
+        return self.flush_writes()
+    
+    def _pa_byte(self, byte_num: int) -> int:
+        """Byte actual de salidas: de la imagen leída por el monitoreo o, si no la cubre o está vieja, del PLC."""
+        if (self._pa_valid and byte_num < len(self._pa) and
+                time.monotonic() - self._read_ts < self._pa_ttl):
+            return self._pa[byte_num]
+        return self._read_area(Area.PA, 0, byte_num, 1)[0]
+    
+    def _set_output_image(self, byte_num: int, value: int):
+        """Refleja en la imagen de PA un byte recién escrito."""
+        if byte_num < len(self._pa):
+            with self._lock:
+                self._pa[byte_num] = value
+                self._image_version += 1
+    
+    def _read_all(self):
+        """Lee la imagen de I/O con una sola petición read_multi_vars."""
         try:
-            # Leer 4 words analógicas (AIW0, AIW2, AIW4, AIW6)
-            for i in range(4):
-                word_addr = i * 2
-                data = self.client.read_area(Area.PE, 0, word_addr, 2)
-                value = int.from_bytes(data, byteorder='big')
-                self.data["analog"][f"AIW{word_addr}"] = value
+            with self._io_lock:
+                # E0 y AIW0..AIW6 comparten los bytes 0-7 del área PE: un item por área
+                self._read_multi_vars(self._multi_items)
+                for item in self._multi_items:
+                    if item.Result != 0:
+                        raise RuntimeError(f"Error S7 leyendo área {item.Area:#x}: {item.Result:#x}")
+                pe, pa = self._multi_views
+                self._read_ts = time.monotonic()
+                
+                # snap7 no ofrece suscripciones por cambio: se compara con la imagen anterior
+                if pe != self._pe or pa != self._pa:
+                    with self._lock:
+                        self._pe[:] = pe
+                        self._pa[:] = pa
+                        self._image_version += 1
+                self._pa_valid = True
                 
         except Exception as e:
-            logger.error(f"Error leyendo analógicas: {e}")
-            self.data["status"]["last_error"] = str(e)
-            self.data["status"]["error_count"] += 1
+            self._pa_valid = False  # La imagen ya no refleja el PLC: las escrituras leerán el byte
+            self._log_cycle_error(f"Error leyendo I/O: {e}")
+            self._record_error(e)
     
-    def _monitor_loop(self):
+    def _io_sections(self) -> Dict[str, Dict[str, Any]]:
+        """Genera las secciones de I/O publicadas a partir de la imagen en crudo."""
+        if NUMBA_AVAILABLE:
+            _jit_decode_image(self._pe_np, self._pa_np, ANALOG_OFFSET,
+                              self._bits_out, self._analog_out)
+            bits = self._bits_out.tolist()
+            return {
+                "inputs": dict(zip(INPUT_KEYS, bits[:8])),
+                "outputs": dict(zip(OUTPUT_KEYS, bits[8:])),
+                "analog": dict(zip(ANALOG_KEYS, self._analog_out.tolist()))
+            }
+        return {
+            "inputs": dict(zip(INPUT_KEYS, BYTE_TO_BITS[self._pe[0]])),
+            "outputs": dict(zip(OUTPUT_KEYS, BYTE_TO_BITS[self._pa[0]])),
+            "analog": dict(zip(ANALOG_KEYS, ANALOG_STRUCT.unpack_from(self._pe, ANALOG_OFFSET)))
+        }
+    
+    async def _monitor_loop(self):
         """Loop principal de monitoreo."""
+        loop = asyncio.get_running_loop()
+        next_cycle = time.perf_counter()
         while self.running:
+            next_cycle = max(next_cycle + MONITOR_INTERVAL, time.perf_counter())
             if self.connected:
                 try:
                     # Actualizar tiempo de conexión
                     uptime = time.time() - self.connection_time
-                    self.data["connection"]["uptime"] = int(uptime)
-                    self.data["connection"]["last_update"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                    self._publish({"connection": {
+                        "uptime": int(uptime),
+                        "last_update": self._timestamp()
+                    }})
                     
-                    # Leer datos
-                    self.read_inputs()
-                    self.read_outputs()
-                    self.read_analog()
+                    # Leer datos y escribir las salidas acumuladas (snap7 es bloqueante: va al hilo de E/S)
+                    await loop.run_in_executor(self._io_executor, self._read_all)
+                    if self._pending_writes:
+                        await loop.run_in_executor(self._io_executor, self.flush_writes)
                     
                 except Exception as e:
-                    logger.error(f"Error en loop de monitoreo: {e}")
-                    self.data["status"]["last_error"] = str(e)
-                    self.data["status"]["error_count"] += 1
+                    self._log_cycle_error(f"Error en loop de monitoreo: {e}")
+                    self._record_error(e)
             
-            time.sleep(0.5)  # Actualizar cada 500ms
+            await self._wait_until(next_cycle)
+    
+    @staticmethod
+    async def _wait_until(deadline: float):
+        """Espera hasta deadline (perf_counter): sleep y busy-wait en el último tramo."""
+        remaining = deadline - time.perf_counter() - MONITOR_SPIN
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        while time.perf_counter() < deadline:
+            pass
+    
+    @staticmethod
+    def _tune_monitor_thread():
+        """Fija el hilo actual al núcleo del monitoreo y sube su prioridad si el sistema lo permite."""
+        try:
+            if hasattr(os, "sched_setaffinity") and MONITOR_CPU in os.sched_getaffinity(0):
+                os.sched_setaffinity(0, {MONITOR_CPU})  # 0 = hilo actual en Linux
+        except OSError as e:
+            logger.warning("No se pudo fijar el monitoreo al núcleo %d: %s", MONITOR_CPU, e)
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, MONITOR_NICE)  # Requiere privilegios
+        except (AttributeError, OSError) as e:
+            logger.debug("Prioridad del monitoreo sin cambiar: %s", e)
+    
+    def _run_monitor_thread(self):
+        """Cuerpo del hilo del monitoreo: ajusta el hilo y ejecuta el event loop."""
+        self._tune_monitor_thread()
+        self._loop.run_forever()
     
     def start_monitoring(self):
         """Inicia el monitoreo en background."""
@@ -257,24 +636,79 @@ class PLCService:
             return
         
         self.running = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plc-io",
+                                               initializer=self._tune_monitor_thread)
+        self._loop = asyncio.new_event_loop()
+        self.monitor_thread = threading.Thread(target=self._run_monitor_thread, daemon=True)
+        _start_queued_logging()
         self.monitor_thread.start()
+        self._monitor_future = asyncio.run_coroutine_threadsafe(self._monitor_loop(), self._loop)
         logger.info("🔄 Monitoreo iniciado")
     
+    async def _cancel_monitor(self):
+        """Cancela las tareas del loop de monitoreo y espera a que terminen."""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
     def stop_monitoring(self):
         """Detiene el monitoreo."""
         self.running = False
+        monitoring = self._loop is not None
+        if self._loop:
+            try:
+                # Cancelar el ciclo dentro del propio loop antes de pararlo
+                asyncio.run_coroutine_threadsafe(self._cancel_monitor(), self._loop).result(timeout=1)
+            except Exception as e:
+                logger.warning("No se pudo cancelar el monitoreo: %s", e)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._monitor_future = None
         if self.monitor_thread:
             self.monitor_thread.join(timeout=1)
+        if self._loop and not self._loop.is_running():
+            self._loop.close()
+        self._loop = None
+        if self._io_executor:
+            self._io_executor.shutdown(wait=False)
+            self._io_executor = None
         logger.info("⏹️ Monitoreo detenido")
+        if monitoring:
+            _stop_queued_logging()
     
-    def get_data(self) -> Dict[str, Any]:
-        """Obtiene los datos actuales del PLC."""
-        return self.data.copy()
+    def get_data(self, snapshot: bool = False) -> Dict[str, Any]:
+        """Obtiene la última versión publicada de los datos (no se modifica; snapshot=True devuelve una copia profunda).
+        
+        Nunca accede al PLC: la imagen de I/O solo la actualiza el monitoreo.
+        """
+        with self._lock:
+            if self._view_version != self._image_version:
+                # Las secciones de I/O solo se regeneran si la imagen cambió desde la última consulta
+                self._view_version = self._image_version
+                self.data = {**self.data, **self._io_sections()}
+            data = self.data
+        if snapshot:
+            return copy.deepcopy(data)
+        return data
+    
+    def get_connection_info(self) -> Dict[str, Any]:
+        """Obtiene solo el estado de la conexión, sin copiar datos de I/O."""
+        connection = self.data["connection"]
+        return {
+            "status": connection["status"],
+            "uptime": connection["uptime"],
+            "last_update": connection["last_update"]
+        }
     
     def get_json(self) -> str:
         """Obtiene los datos en formato JSON."""
-        return json.dumps(self.data, indent=2)
+        data = self.get_data()
+        with self._lock:
+            if data is not self._json_data:
+                # Solo se serializa de nuevo si se publicó otra versión de los datos
+                self._json_cache = _json_dumps(data)
+                self._json_data = data
+            return self._json_cache
     
     def __enter__(self):
         """Context manager entry."""
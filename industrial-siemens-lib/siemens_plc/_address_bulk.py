@@ -0,0 +1,215 @@
+"""
+Bulk Address Parser
+===================
+
+Parseo en lote de direcciones de memoria a un array estructurado de NumPy
+(una fila por dirección), pensado para cargar tablas de miles de tags.
+
+Con Numba disponible el parseo se hace en un kernel compilado sobre los
+bytes ASCII de las direcciones; las filas que el kernel no reconoce (o todo
+el lote, sin Numba) pasan por AddressParser.parse_address_tuple, de modo que las
+direcciones aceptadas son exactamente las mismas.
+"""
+
+import numpy as np
+
+from .areas import AddressParser, Areas
+
+try:
+    # Opcional: parsear el lote con código compilado por Numba
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Fila del resultado: área (MemoryArea.value, 0 si no es válida), código de tipo
+# (índice en ADDRESS_TYPES) y los campos numéricos de la dirección
+ADDRESS_DTYPE = np.dtype([
+    ('area', np.int8),
+    ('type', np.int8),
+    ('db_number', np.int32),
+    ('byte', np.int32),
+    ('bit', np.int32),
+    ('number', np.int32),
+    ('size', np.int8),
+    ('valid', np.bool_)
+])
+
+# Tipos en el orden de sus códigos; los de DB conservan la letra ('b', 'w', 'd')
+ADDRESS_TYPES = ('bit', 'byte', 'word', 'dword', 'b', 'w', 'd', 'timer', 'counter')
+TYPE_CODES = {name: code for code, name in enumerate(ADDRESS_TYPES)}
+
+# Máximo de dígitos que el kernel acepta por número: con 9 siempre cabe en int32;
+# los números más largos pasan por el parser de Python
+MAX_DIGITS = 9
+
+# Código Snap7 y solo lectura por área, indexables con la columna 'area' - 1
+SNAP7_CODES = np.array(Areas._SNAP7_CODES, dtype=np.uint8)
+READ_ONLY = np.array(Areas._READ_ONLY, dtype=np.bool_)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _digits(row, pos, end):
+        """Lee un entero decimal desde pos; devuelve (valor, posición final, válido).
+        
+        No es válido sin dígitos ni con más de MAX_DIGITS (podría desbordar int32).
+        """
+        value = 0
+        start = pos
+        while pos < end and 48 <= row[pos] <= 57:
+            if pos - start == MAX_DIGITS:
+                return 0, pos, False
+            value = value * 10 + (row[pos] - 48)
+            pos += 1
+        return value, pos, pos > start
+
+    @njit(cache=True)
+    def _parse_row(row, end, out, i):
+        """Parsea una dirección ASCII en la fila i de las columnas de out; False si no encaja."""
+        area_out, type_out, db_out, byte_out, bit_out, number_out, size_out = out
+        if end == 0:
+            return False
+        c = row[0]
+
+        # I/Q/M: bit (I0.0), byte (IB0), word (IW0) o double word (ID0)
+        area = 1 if c == 73 else 2 if c == 81 else 3 if c == 77 else 0
+        if area != 0:
+            kind = row[1] if end > 1 else 0
+            if kind == 66 or kind == 87 or kind == 68:
+                value, pos, ok = _digits(row, 2, end)
+                if not ok or pos != end:
+                    return False
+                area_out[i] = area
+                type_out[i] = 1 if kind == 66 else 2 if kind == 87 else 3
+                size_out[i] = 1 if kind == 66 else 2 if kind == 87 else 4
+                byte_out[i] = value
+                return True
+            byte, pos, ok = _digits(row, 1, end)
+            if not ok or pos >= end or row[pos] != 46:
+                return False
+            bit, pos, ok = _digits(row, pos + 1, end)
+            if not ok or pos != end:
+                return False
+            area_out[i] = area
+            type_out[i] = 0
+            size_out[i] = 1
+            byte_out[i] = byte
+            bit_out[i] = bit
+            return True
+
+        # Data blocks: DB1.DBW0, DB2.DBD10, DB3.DBB4, DB3.DBX5.0
+        if c == 68:
+            if end < 2 or row[1] != 66:
+                return False
+            db, pos, ok = _digits(row, 2, end)
+            if not ok or pos + 4 > end or row[pos] != 46 or row[pos + 1] != 68 or row[pos + 2] != 66:
+                return False
+            kind = row[pos + 3]
+            byte, pos, ok = _digits(row, pos + 4, end)
+            if not ok:
+                return False
+            if kind == 88:
+                if pos >= end or row[pos] != 46:
+                    return False
+                bit, pos, ok = _digits(row, pos + 1, end)
+                if not ok or pos != end:
+                    return False
+                type_out[i] = 0
+                size_out[i] = 1
+                bit_out[i] = bit
+            elif kind == 66 or kind == 87 or kind == 68:
+                if pos != end:
+                    return False
+                type_out[i] = 4 if kind == 66 else 5 if kind == 87 else 6
+                size_out[i] = 1 if kind == 66 else 2 if kind == 87 else 4
+            else:
+                return False
+            area_out[i] = 4
+            db_out[i] = db
+            byte_out[i] = byte
+            return True
+
+        # Temporizadores y contadores: T1, C2
+        if c == 84 or c == 67:
+            number, pos, ok = _digits(row, 1, end)
+            if not ok or pos != end:
+                return False
+            area_out[i] = 5 if c == 84 else 6
+            type_out[i] = 7 if c == 84 else 8
+            size_out[i] = 2
+            number_out[i] = number
+            return True
+
+        return False
+
+    @njit(cache=True, parallel=True)
+    def _parse_rows(rows, lengths, out, valid):
+        """Parsea todas las filas en paralelo."""
+        for i in prange(rows.shape[0]):
+            valid[i] = _parse_row(rows[i], lengths[i], out, i)
+
+
+def _fill_row(result: np.ndarray, i: int, address: str):
+    """Rellena la fila i con AddressParser.parse_address_tuple; la deja inválida si no parsea
+    o si algún número no cabe en su columna."""
+    try:
+        parsed = AddressParser.parse_address_tuple(address)
+    except ValueError:
+        return
+    values = {
+        'area': parsed.area.value,
+        'type': TYPE_CODES[parsed.type],
+        'db_number': parsed.db_number,
+        'byte': parsed.byte,
+        'bit': parsed.bit,
+        'number': parsed.number,
+        'size': parsed.size,
+    }
+    # NumPy 1.x no lanza OverflowError al asignar: avisa y trunca el valor
+    for name, value in values.items():
+        limits = np.iinfo(ADDRESS_DTYPE[name])
+        if not limits.min <= value <= limits.max:
+            return
+    row = result[i]
+    for name, value in values.items():
+        row[name] = value
+    row['valid'] = True
+
+
+def parse_many(addresses) -> np.ndarray:
+    """Parsea un lote de direcciones a un array con dtype ADDRESS_DTYPE."""
+    addresses = list(addresses)
+    result = np.zeros(len(addresses), dtype=ADDRESS_DTYPE)
+    if not addresses:
+        return result
+
+    if not NUMBA_AVAILABLE:
+        for i, address in enumerate(addresses):
+            _fill_row(result, i, address)
+        return result
+
+    # Bytes ASCII de cada dirección en una matriz de ancho fijo (los no ASCII se
+    # sustituyen por '?' y esas filas acaban en el parser de Python)
+    encoded = [address.encode('ascii', 'replace') for address in addresses]
+    width = max(1, max(len(data) for data in encoded))
+    rows = np.zeros((len(encoded), width), dtype=np.uint8)
+    for i, data in enumerate(encoded):
+        rows[i, :len(data)] = np.frombuffer(data, dtype=np.uint8)
+    lengths = np.fromiter((len(data) for data in encoded), dtype=np.int64, count=len(encoded))
+
+    columns = tuple(np.zeros(len(addresses), dtype=ADDRESS_DTYPE[name])
+                    for name in ('area', 'type', 'db_number', 'byte', 'bit', 'number', 'size'))
+    valid = np.zeros(len(addresses), dtype=np.bool_)
+    _parse_rows(rows, lengths, columns, valid)
+
+    for name, column in zip(('area', 'type', 'db_number', 'byte', 'bit', 'number', 'size'), columns):
+        result[name] = column
+    result['valid'] = valid
+
+    # Formatos que el kernel no cubre (dígitos no ASCII, salto de línea final...)
+    for i in np.flatnonzero(~valid):
+        _fill_row(result, i, addresses[i])
+
+    return result
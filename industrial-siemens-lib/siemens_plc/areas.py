@@ -5,8 +5,10 @@ Industrial Siemens Library - Memory Areas
 Definición de todas las áreas de memoria del PLC Siemens.
 """
 
+import re
+from functools import lru_cache
 from enum import Enum, auto
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterable, NamedTuple, Tuple
 from dataclasses import dataclass
 
 
@@ -27,7 +29,7 @@ class MemoryArea(Enum):
     SYS_FLAGS = auto() # System flags (Banderas del sistema)
 
 
-@dataclass
+@dataclass(frozen=True)
 class AreaInfo:
     """Información detallada de un área de memoria."""
     name: str
@@ -36,7 +38,19 @@ class AreaInfo:
     read_only: bool
     size_bytes: Optional[int] = None
     address_format: str = ""
-    examples: List[str] = None
+    examples: Tuple[str, ...] = ()
+
+
+class ParsedAddress(NamedTuple):
+    """Dirección de memoria parseada; los campos que no aplican quedan a 0."""
+    address: str
+    area: MemoryArea
+    type: str
+    size: int
+    byte: int = 0
+    bit: int = 0
+    db_number: int = 0
+    number: int = 0
 
 
 class Areas:
@@ -50,7 +64,7 @@ class Areas:
             snap7_code=129,
             read_only=True,
             address_format="I[byte].[bit] o I[W][byte]",
-            examples=["I0.0", "I0.1", "IB0", "IW96", "ID100"]
+            examples=("I0.0", "I0.1", "IB0", "IW96", "ID100")
         ),
         
         MemoryArea.PA: AreaInfo(
@@ -59,7 +73,7 @@ class Areas:
             snap7_code=130,
             read_only=False,
             address_format="Q[byte].[bit] o Q[W][byte]",
-            examples=["Q0.0", "Q0.1", "QB0", "QW96", "QD100"]
+            examples=("Q0.0", "Q0.1", "QB0", "QW96", "QD100")
         ),
         
         MemoryArea.MK: AreaInfo(
@@ -68,7 +82,7 @@ class Areas:
             snap7_code=131,
             read_only=False,
             address_format="M[byte].[bit] o M[W][byte]",
-            examples=["M0.0", "M0.1", "MB0", "MW10", "MD20"]
+            examples=("M0.0", "M0.1", "MB0", "MW10", "MD20")
         ),
         
         MemoryArea.DB: AreaInfo(
@@ -77,7 +91,7 @@ class Areas:
             snap7_code=132,
             read_only=False,
             address_format="DB[number].DB[W][byte]",
-            examples=["DB1.DBW0", "DB2.DBD10", "DB3.DBX5.0"]
+            examples=("DB1.DBW0", "DB2.DBD10", "DB3.DBX5.0")
         ),
         
         MemoryArea.TM: AreaInfo(
@@ -86,7 +100,7 @@ class Areas:
             snap7_code=29,
             read_only=False,
             address_format="T[number]",
-            examples=["T1", "T2", "T10"]
+            examples=("T1", "T2", "T10")
         ),
         
         MemoryArea.CT: AreaInfo(
@@ -95,7 +109,7 @@ class Areas:
             snap7_code=28,
             read_only=False,
             address_format="C[number]",
-            examples=["C1", "C2", "C10"]
+            examples=("C1", "C2", "C10")
         ),
         
         MemoryArea.SYS: AreaInfo(
@@ -104,7 +118,7 @@ class Areas:
             snap7_code=3,
             read_only=True,
             address_format="SYS[address]",
-            examples=["SYS0", "SYS1", "SYS100"]
+            examples=("SYS0", "SYS1", "SYS100")
         ),
         
         MemoryArea.SYS_INFO: AreaInfo(
@@ -113,7 +127,7 @@ class Areas:
             snap7_code=4,
             read_only=True,
             address_format="SYS_INFO[address]",
-            examples=["SYS_INFO0", "SYS_INFO1"]
+            examples=("SYS_INFO0", "SYS_INFO1")
         ),
         
         MemoryArea.SYS_FLAGS: AreaInfo(
@@ -122,10 +136,19 @@ class Areas:
             snap7_code=5,
             read_only=True,
             address_format="SYS_FLAGS[address]",
-            examples=["SYS_FLAGS0", "SYS_FLAGS1"]
+            examples=("SYS_FLAGS0", "SYS_FLAGS1")
         )
     }
     
+    # Mapeo inverso de código Snap7 a área
+    _SNAP7_TO_AREA: Dict[int, MemoryArea] = {
+        info.snap7_code: area for area, info in AREA_INFO.items()
+    }
+    
+    # Columnas paralelas indexadas por MemoryArea.value - 1
+    _SNAP7_CODES = tuple(info.snap7_code for info in map(AREA_INFO.__getitem__, MemoryArea))
+    _READ_ONLY = tuple(info.read_only for info in map(AREA_INFO.__getitem__, MemoryArea))
+    
     @classmethod
     def get_info(cls, area: MemoryArea) -> AreaInfo:
         """Obtiene información detallada de un área de memoria."""
@@ -133,15 +156,19 @@ class Areas:
     
     @classmethod
     def get_snap7_code(cls, area: MemoryArea) -> int:
-        """Obtiene el código Snap7 de un área de memoria."""
-        info = cls.get_info(area)
-        return info.snap7_code if info else 0
+        """Obtiene el código Snap7 de un área de memoria (0 si no es un área conocida)."""
+        try:
+            return cls._SNAP7_CODES[area.value - 1]
+        except (AttributeError, IndexError):
+            return 0
     
     @classmethod
     def is_read_only(cls, area: MemoryArea) -> bool:
-        """Verifica si un área de memoria es de solo lectura."""
-        info = cls.get_info(area)
-        return info.read_only if info else True
+        """Verifica si un área de memoria es de solo lectura (True si no es un área conocida)."""
+        try:
+            return cls._READ_ONLY[area.value - 1]
+        except (AttributeError, IndexError):
+            return True
     
     @classmethod
     def get_address_format(cls, area: MemoryArea) -> str:
@@ -153,15 +180,189 @@ class Areas:
     def get_examples(cls, area: MemoryArea) -> List[str]:
         """Obtiene ejemplos de direcciones para un área de memoria."""
         info = cls.get_info(area)
-        return info.examples if info else []
+        return list(info.examples) if info else []
     
     @classmethod
     def get_area_by_snap7_code(cls, snap7_code: int) -> Optional[MemoryArea]:
         """Obtiene un área de memoria por su código Snap7."""
-        for area, info in cls.AREA_INFO.items():
-            if info.snap7_code == snap7_code:
-                return area
+        return cls._SNAP7_TO_AREA.get(snap7_code)
+
+
+# Área de cada prefijo I/Q/M y (tipo, tamaño) de cada sufijo B/W/D, compartidas por
+# los patrones y el parser rápido
+_FAST_AREAS = {'I': MemoryArea.PE, 'Q': MemoryArea.PA, 'M': MemoryArea.MK}
+_FAST_SIZES = {'B': ('byte', 1), 'W': ('word', 2), 'D': ('dword', 4)}
+
+# Patrones para diferentes tipos de direcciones, compilados una sola vez al importar.
+# Cada patrón lleva las primeras letras de las direcciones que puede aceptar
+_ADDRESS_PATTERNS = tuple((prefixes, re.compile(pattern), config)
+                          for pattern, (prefixes, config) in {
+    # Bits de entradas, salidas y marcas: I0.0, Q1.5, M3.1
+    r'^([IQM])(\d+)\.(\d+)$': ('IQM', {
+        'area': lambda m: _FAST_AREAS[m.group(1)],
+        'type': 'bit',
+        'byte': lambda m: int(m.group(2)),
+        'bit': lambda m: int(m.group(3)),
+        'size': 1
+    }),
+    
+    # Byte, word y double word de entradas, salidas y marcas: IB0, QW2, MD20
+    r'^([IQM])([BWD])(\d+)$': ('IQM', {
+        'area': lambda m: _FAST_AREAS[m.group(1)],
+        'type': lambda m: _FAST_SIZES[m.group(2)][0],
+        'byte': lambda m: int(m.group(3)),
+        'size': lambda m: _FAST_SIZES[m.group(2)][1]
+    }),
+    
+    # Data blocks: DB1.DBW0, DB2.DBD10
+    r'^DB(\d+)\.DB([BWD])(\d+)$': ('D', {
+        'area': MemoryArea.DB,
+        'type': lambda m: m.group(2).lower(),
+        'db_number': lambda m: int(m.group(1)),
+        'byte': lambda m: int(m.group(3)),
+        'size': lambda m: {'b': 1, 'w': 2, 'd': 4}[m.group(2).lower()]
+    }),
+    
+    # Data blocks bit: DB1.DBX5.0
+    r'^DB(\d+)\.DBX(\d+)\.(\d+)$': ('D', {
+        'area': MemoryArea.DB,
+        'type': 'bit',
+        'db_number': lambda m: int(m.group(1)),
+        'byte': lambda m: int(m.group(2)),
+        'bit': lambda m: int(m.group(3)),
+        'size': 1
+    }),
+    
+    # Temporizadores: T1, T2
+    r'^T(\d+)$': ('T', {
+        'area': MemoryArea.TM,
+        'type': 'timer',
+        'number': lambda m: int(m.group(1)),
+        'size': 2
+    }),
+    
+    # Contadores: C1, C2
+    r'^C(\d+)$': ('C', {
+        'area': MemoryArea.CT,
+        'type': 'counter',
+        'number': lambda m: int(m.group(1)),
+        'size': 2
+    })
+}.items())
+
+# Patrones agrupados por la primera letra de la dirección ('I', 'Q', 'M', 'D', 'T', 'C'):
+# cada dirección solo se compara con los patrones de su prefijo. La config se separa
+# al importar en campos fijos y (campo, función) a evaluar sobre el match
+_PATTERNS_BY_PREFIX: Dict[str, List[tuple]] = {}
+for _prefixes, _pattern, _config in _ADDRESS_PATTERNS:
+    for _prefix in _prefixes:
+        _PATTERNS_BY_PREFIX.setdefault(_prefix, []).append((
+            _pattern,
+            {key: value for key, value in _config.items() if not callable(value)},
+            tuple((key, value) for key, value in _config.items() if callable(value))
+        ))
+del _pattern, _config, _prefixes, _prefix
+
+# Tablas del parser rápido: tamaño de cada sufijo de DB y área/tipo de T y C
+_FAST_DB_SIZES = {'B': 1, 'W': 2, 'D': 4}
+_FAST_COUNTERS = {'T': (MemoryArea.TM, 'timer'), 'C': (MemoryArea.CT, 'counter')}
+
+
+def _parse_fast(address: str) -> Optional[ParsedAddress]:
+    """
+    Parser sin expresiones regulares para los formatos habituales.
+    
+    Devuelve el mismo resultado que los patrones o None si la dirección no
+    encaja, en cuyo caso parse_address recurre a los patrones.
+    """
+    prefix = address[:1]
+    
+    area = _FAST_AREAS.get(prefix)
+    if area is not None:
+        rest = address[1:]
+        kind = _FAST_SIZES.get(rest[:1])
+        if kind is not None:
+            # Byte, word o double word: IB0, QW2, MD20
+            if rest[1:].isdecimal():
+                return ParsedAddress(address=address, area=area, type=kind[0], size=kind[1],
+                                     byte=int(rest[1:]))
+            return None
+        
+        # Bit: I0.0, Q1.5, M3.1
+        byte, dot, bit = rest.partition('.')
+        if dot and byte.isdecimal() and bit.isdecimal():
+            return ParsedAddress(address=address, area=area, type='bit', size=1,
+                                 byte=int(byte), bit=int(bit))
+        return None
+    
+    if prefix == 'D':
+        # Data blocks: DB1.DBW0, DB2.DBD10, DB3.DBX5.0
+        db_number, dot, rest = address[2:].partition('.')
+        if not (address[1:2] == 'B' and dot and db_number.isdecimal() and rest[:2] == 'DB'):
+            return None
+        kind, tail = rest[2:3], rest[3:]
+        if kind == 'X':
+            byte, dot, bit = tail.partition('.')
+            if dot and byte.isdecimal() and bit.isdecimal():
+                return ParsedAddress(address=address, area=MemoryArea.DB, type='bit', size=1,
+                                     db_number=int(db_number), byte=int(byte), bit=int(bit))
+            return None
+        size = _FAST_DB_SIZES.get(kind)
+        if size is not None and tail.isdecimal():
+            return ParsedAddress(address=address, area=MemoryArea.DB, type=kind.lower(), size=size,
+                                 db_number=int(db_number), byte=int(tail))
         return None
+    
+    counter = _FAST_COUNTERS.get(prefix)
+    if counter is not None and address[1:].isdecimal():
+        # Temporizadores y contadores: T1, C2
+        return ParsedAddress(address=address, area=counter[0], type=counter[1], size=2,
+                             number=int(address[1:]))
+    return None
+
+
+def _find_match(address: str) -> Optional[Tuple[Dict[str, Any], tuple, re.Match]]:
+    """Busca el patrón que encaja con la dirección; devuelve (fijos, getters, match) o None."""
+    for pattern, fixed, getters in _PATTERNS_BY_PREFIX.get(address[:1], ()):
+        match = pattern.match(address)
+        if match:
+            return fixed, getters, match
+    return None
+
+
+def _parse_address_impl(address: str) -> ParsedAddress:
+    """Parsea una dirección: parser rápido y, si no encaja, los patrones."""
+    result = _parse_fast(address)
+    if result is not None:
+        return result
+    
+    # Formatos que el parser rápido no reconoce: probar los patrones
+    found = _find_match(address)
+    if found is not None:
+        fixed, getters, match = found
+        return ParsedAddress(address=address, **fixed,
+                             **{key: getter(match) for key, getter in getters})
+    
+    raise ValueError(f"Formato de dirección no válido: {address}")
+
+
+# Resultados memoizados por dirección (ParsedAddress es inmutable, se puede compartir)
+_parse_address_cached = lru_cache(maxsize=4096)(_parse_address_impl)
+
+
+def _legacy_fields(parsed: ParsedAddress) -> Dict[str, Any]:
+    """Diccionario con solo los campos que aplican al tipo de dirección (formato anterior)."""
+    result = {'address': parsed.address, 'area': parsed.area, 'type': parsed.type,
+              'size': parsed.size}
+    if parsed.area is MemoryArea.DB:
+        result['db_number'] = parsed.db_number
+    if parsed.area is MemoryArea.TM or parsed.area is MemoryArea.CT:
+        result['number'] = parsed.number
+    else:
+        result['byte'] = parsed.byte
+    if parsed.type == 'bit':
+        result['bit'] = parsed.bit
+    return result
 
 
 class AddressParser:
@@ -178,183 +379,46 @@ class AddressParser:
         Returns:
             Diccionario con información de la dirección parseada
         """
-        import re
-        
-        # Patrones para diferentes tipos de direcciones
-        patterns = {
-            # Entradas digitales: I0.0, I1.5
-            r'^I(\d+)\.(\d+)$': {
-                'area': MemoryArea.PE,
-                'type': 'bit',
-                'byte': lambda m: int(m.group(1)),
-                'bit': lambda m: int(m.group(2)),
-                'size': 1
-            },
-            
-            # Salidas digitales: Q0.0, Q1.5
-            r'^Q(\d+)\.(\d+)$': {
-                'area': MemoryArea.PA,
-                'type': 'bit',
-                'byte': lambda m: int(m.group(1)),
-                'bit': lambda m: int(m.group(2)),
-                'size': 1
-            },
-            
-            # Marcas: M0.0, M1.5
-            r'^M(\d+)\.(\d+)$': {
-                'area': MemoryArea.MK,
-                'type': 'bit',
-                'byte': lambda m: int(m.group(1)),
-                'bit': lambda m: int(m.group(2)),
-                'size': 1
-            },
-            
-            # Entradas byte: IB0, IB1
-            r'^IB(\d+)$': {
-                'area': MemoryArea.PE,
-                'type': 'byte',
-                'byte': lambda m: int(m.group(1)),
-                'size': 1
-            },
-            
-            # Salidas byte: QB0, QB1
-            r'^QB(\d+)$': {
-                'area': MemoryArea.PA,
-                'type': 'byte',
-                'byte': lambda m: int(m.group(1)),
-                'size': 1
-            },
-            
-            # Marcas byte: MB0, MB1
-            r'^MB(\d+)$': {
-                'area': MemoryArea.MK,
-                'type': 'byte',
-                'byte': lambda m: int(m.group(1)),
-                'size': 1
-            },
-            
-            # Entradas word: IW0, IW2
-            r'^IW(\d+)$': {
-                'area': MemoryArea.PE,
-                'type': 'word',
-                'byte': lambda m: int(m.group(1)),
-                'size': 2
-            },
-            
-            # Salidas word: QW0, QW2
-            r'^QW(\d+)$': {
-                'area': MemoryArea.PA,
-                'type': 'word',
-                'byte': lambda m: int(m.group(1)),
-                'size': 2
-            },
-            
-            # Marcas word: MW0, MW2
-            r'^MW(\d+)$': {
-                'area': MemoryArea.MK,
-                'type': 'word',
-                'byte': lambda m: int(m.group(1)),
-                'size': 2
-            },
-            
-            # Entradas double word: ID0, ID4
-            r'^ID(\d+)$': {
-                'area': MemoryArea.PE,
-                'type': 'dword',
-                'byte': lambda m: int(m.group(1)),
-                'size': 4
-            },
-            
-            # Salidas double word: QD0, QD4
-            r'^QD(\d+)$': {
-                'area': MemoryArea.PA,
-                'type': 'dword',
-                'byte': lambda m: int(m.group(1)),
-                'size': 4
-            },
-            
-            # Marcas double word: MD0, MD4
-            r'^MD(\d+)$': {
-                'area': MemoryArea.MK,
-                'type': 'dword',
-                'byte': lambda m: int(m.group(1)),
-                'size': 4
-            },
-            
-            # Data blocks: DB1.DBW0, DB2.DBD10
-            r'^DB(\d+)\.DB([BWD])(\d+)$': {
-                'area': MemoryArea.DB,
-                'type': lambda m: m.group(2).lower(),
-                'db_number': lambda m: int(m.group(1)),
-                'byte': lambda m: int(m.group(3)),
-                'size': lambda m: {'b': 1, 'w': 2, 'd': 4}[m.group(2).lower()]
-            },
-            
-            # Data blocks bit: DB1.DBX5.0
-            r'^DB(\d+)\.DBX(\d+)\.(\d+)$': {
-                'area': MemoryArea.DB,
-                'type': 'bit',
-                'db_number': lambda m: int(m.group(1)),
-                'byte': lambda m: int(m.group(2)),
-                'bit': lambda m: int(m.group(3)),
-                'size': 1
-            },
-            
-            # Temporizadores: T1, T2
-            r'^T(\d+)$': {
-                'area': MemoryArea.TM,
-                'type': 'timer',
-                'number': lambda m: int(m.group(1)),
-                'size': 2
-            },
-            
-            # Contadores: C1, C2
-            r'^C(\d+)$': {
-                'area': MemoryArea.CT,
-                'type': 'counter',
-                'number': lambda m: int(m.group(1)),
-                'size': 2
-            }
-        }
-        
-        for pattern, config in patterns.items():
-            match = re.match(pattern, address)
-            if match:
-                result = {
-                    'address': address,
-                    'area': config['area'],
-                    'type': config['type'](match) if callable(config['type']) else config['type'],
-                    'size': config['size'](match) if callable(config['size']) else config['size']
-                }
-                
-                # Agregar campos específicos según el tipo
-                for key, value in config.items():
-                    if key not in ['area', 'type', 'size'] and callable(value):
-                        result[key] = value(match)
-                    elif key not in ['area', 'type', 'size']:
-                        result[key] = value
-                
-                return result
+        return _legacy_fields(_parse_address_cached(address))
+
+    @staticmethod
+    def parse_address_tuple(address: str) -> ParsedAddress:
+        """
+        Parsea una dirección a un ParsedAddress inmutable y memoizado.
         
-        raise ValueError(f"Formato de dirección no válido: {address}")
-    
+        Evita construir un diccionario por llamada; los campos que no aplican
+        al tipo de dirección quedan a 0.
+        """
+        return _parse_address_cached(address)
+
+    @staticmethod
+    def parse_many(addresses: Iterable[str]):
+        """
+        Parsea un lote de direcciones (carga masiva de tablas de símbolos).
+
+        Args:
+            addresses: Direcciones en formato estándar
+
+        Returns:
+            Array estructurado de NumPy con una fila por dirección (ver
+            _address_bulk.ADDRESS_DTYPE); las no válidas quedan con valid=False
+        """
+        from ._address_bulk import parse_many
+        return parse_many(addresses)
+
     @staticmethod
     def validate_address(address: str) -> bool:
         """Valida si una dirección tiene el formato correcto."""
-        try:
-            AddressParser.parse_address(address)
-            return True
-        except ValueError:
-            return False
+        return _find_match(address) is not None
     
     @staticmethod
     def get_address_info(address: str) -> Dict[str, Any]:
         """Obtiene información completa de una dirección."""
-        parsed = AddressParser.parse_address(address)
-        area_info = Areas.get_info(parsed['area'])
+        parsed = AddressParser.parse_address_tuple(address)
+        area_info = Areas.get_info(parsed.area)
         
         return {
-            **parsed,
+            **_legacy_fields(parsed),
             'area_name': area_info.name if area_info else "Unknown",
             'area_description': area_info.description if area_info else "",
             'read_only': area_info.read_only if area_info else True,
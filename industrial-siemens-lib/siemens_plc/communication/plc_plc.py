@@ -7,18 +7,50 @@ Soporte para redes de PLCs con sincronización de datos.
 """
 
 import asyncio
+import heapq
+import threading
 import time
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union, Callable
 import logging
 from dataclasses import dataclass
 from datetime import datetime
+from types import MappingProxyType
 
-from ..protocols.base import BaseProtocol, ProtocolConfig, ProtocolType
-from ..protocols.modbus import ModbusTCP, ModbusRTU
+from ..protocols.base import BaseProtocol, ProtocolConfig, ProtocolType, ReadRequest, WriteRequest
+from ..protocols.modbus import ModbusProtocol, ModbusTCP, ModbusRTU
 from ..protocols.s7 import S7Protocol
 from ..protocols.profibus import ProfibusDP
 from ..exceptions import CommunicationError
 
+# Pipeline de sincronización: lectores por PLC origen -> cola -> escritores
+SYNC_QUEUE_SIZE = 256
+SYNC_WRITERS = 4
+
+# Tipos Modbus con un valor por dirección: los mapeos cercanos de un mismo PLC se
+# leen en un solo bloque y los consecutivos de un mismo destino se escriben juntos
+BLOCK_DATA_TYPES = frozenset({
+    'coil', 'discrete_input', 'holding_register', 'input_register', 'uint16', 'int16'
+})
+BLOCK_GAP_THRESHOLD = 8  # direcciones sin mapear que se leen de más para unir dos tramos
+BLOCK_MAX_SPAN = 125  # máximo de registros por petición Modbus
+
+# Escrituras simultáneas como máximo contra un mismo PLC destino
+TARGET_MAX_WRITES = 2
+
+# Modos que el bucle de sincronización sondea; "on_change" solo escribe si el valor cambió
+POLLED_SYNC_MODES = ("continuous", "on_change")
+
+
+def _block_address(protocol: Optional[BaseProtocol], address: Union[int, str],
+                   data_type: str) -> Optional[int]:
+    """Dirección entera si el valor puede transferirse dentro de un bloque, si no None."""
+    if data_type not in BLOCK_DATA_TYPES or not isinstance(protocol, ModbusProtocol):
+        return None
+    try:
+        return int(address)
+    except (TypeError, ValueError):
+        return None
+
 
 @dataclass
 class PLCNode:
@@ -44,6 +76,7 @@ class DataMapping:
     sync_mode: str = "continuous"  # continuous, on_change, periodic
     sync_interval: int = 1000  # ms
     enabled: bool = True
+    deadband: float = 0.0  # variación mínima de un float para contar como cambio (on_change)
 
 
 class PLCToPLCCommunication:
@@ -58,10 +91,44 @@ class PLCToPLCCommunication:
         self.logger = logging.getLogger("PLC-PLC-Communication")
         self.plcs: Dict[str, PLCNode] = {}
         self.data_mappings: List[DataMapping] = []
-        self.sync_tasks: Dict[str, asyncio.Task] = {}
+        # PLCs origen sincronizados -> próximo vencimiento de cada mapeo (por id)
+        self.sync_tasks: Dict[str, Dict[int, float]] = {}
         self.running = False
+        
+        # Cola ([mapeos], [valores]) entre los lectores y los escritores del pipeline
+        self._sync_q: asyncio.Queue = asyncio.Queue(maxsize=SYNC_QUEUE_SIZE)
+        self._writer_tasks: List[asyncio.Task] = []
+        
+        # Planificador único: heap (vencimiento, plc_id), vencimiento vigente de cada
+        # PLC (las entradas que no coinciden quedaron obsoletas) y evento para despertarlo
+        self._sync_heap: List[Tuple[float, str]] = []
+        self._sync_deadline: Dict[str, float] = {}
+        self._intervals: Dict[str, float] = {}  # sync_interval de cada PLC en segundos
+        self._sched_wakeup = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
+        
+        # Se activa en stop_communication: despierta al instante a quien espera
+        self._stop_event = asyncio.Event()
+        
+        # Las mutaciones de PLCs y mapeos son solo memoria: lock síncrono, nunca
+        # tomado durante un await. Los lectores usan la instantánea publicada sin lock
+        self._sync_lock = threading.Lock()
+        self._plcs_snapshot: Mapping[str, PLCNode] = MappingProxyType({})
+        
+        # Serializa start/stop, que sí esperan a tareas y escritores
         self._lock = asyncio.Lock()
         
+        # Mapeos continuos habilitados por PLC origen (tuplas inmutables que el bucle
+        # de sincronización lee sin lock) y plan de lecturas en bloque por PLC
+        self._active_by_source: Dict[str, Tuple[DataMapping, ...]] = {}
+        self._batch_plans: Dict[str, tuple] = {}
+        
+        # Límite de escrituras concurrentes por PLC destino
+        self._per_plc_sem: Dict[str, asyncio.Semaphore] = {}
+        
+        # Último valor escrito con éxito por mapeo (id), para el modo on_change
+        self._last_value: Dict[int, Any] = {}
+        
         # Callbacks
         self.on_data_sync: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
@@ -70,27 +137,37 @@ class PLCToPLCCommunication:
     async def add_plc(self, plc_config: PLCNode) -> bool:
         """Agregar PLC a la red."""
         try:
-            async with self._lock:
-                if plc_config.id in self.plcs:
-                    self.logger.warning(f"PLC {plc_config.id} already exists")
-                    return False
-                
-                # Conectar al PLC
-                if await plc_config.protocol.connect():
+            if plc_config.id in self._plcs_snapshot:
+                self.logger.warning(f"PLC {plc_config.id} already exists")
+                return False
+            
+            # Conectar al PLC (fuera del lock: puede tardar lo que el timeout TCP)
+            if not await plc_config.protocol.connect():
+                self.logger.error(f"Failed to connect to PLC {plc_config.id}")
+                return False
+            
+            with self._sync_lock:
+                added = plc_config.id not in self.plcs
+                if added:
                     self.plcs[plc_config.id] = plc_config
-                    self.logger.info(f"Added PLC {plc_config.id} ({plc_config.name})")
-                    
-                    # Iniciar sincronización si es master
-                    if plc_config.is_master:
-                        await self._start_sync_for_plc(plc_config.id)
-                    
-                    if self.on_connection_change:
-                        await self.on_connection_change(plc_config.id, True)
-                    
-                    return True
-                else:
-                    self.logger.error(f"Failed to connect to PLC {plc_config.id}")
-                    return False
+                    self._publish_plcs()
+            
+            if not added:
+                # Otro add_plc con el mismo id ganó mientras se conectaba
+                self.logger.warning(f"PLC {plc_config.id} already exists")
+                await plc_config.protocol.disconnect()
+                return False
+            
+            self.logger.info(f"Added PLC {plc_config.id} ({plc_config.name})")
+            
+            # Iniciar sincronización si es master
+            if plc_config.is_master:
+                await self._start_sync_for_plc(plc_config.id)
+            
+            if self.on_connection_change:
+                await self.on_connection_change(plc_config.id, True)
+            
+            return True
                     
         except Exception as e:
             self.logger.error(f"Error adding PLC {plc_config.id}: {e}")
@@ -99,24 +176,24 @@ class PLCToPLCCommunication:
     async def remove_plc(self, plc_id: str) -> bool:
         """Remover PLC de la red."""
         try:
-            async with self._lock:
-                if plc_id not in self.plcs:
+            with self._sync_lock:
+                plc = self.plcs.pop(plc_id, None)
+                if plc is None:
                     return False
-                
-                # Detener sincronización
-                await self._stop_sync_for_plc(plc_id)
-                
-                # Desconectar PLC
-                plc = self.plcs[plc_id]
-                await plc.protocol.disconnect()
-                
-                del self.plcs[plc_id]
-                self.logger.info(f"Removed PLC {plc_id}")
-                
-                if self.on_connection_change:
-                    await self.on_connection_change(plc_id, False)
-                
-                return True
+                self._per_plc_sem.pop(plc_id, None)
+                self._publish_plcs()
+            
+            # Detener sincronización
+            await self._stop_sync_for_plc(plc_id)
+            
+            # Desconectar PLC
+            await plc.protocol.disconnect()
+            self.logger.info(f"Removed PLC {plc_id}")
+            
+            if self.on_connection_change:
+                await self.on_connection_change(plc_id, False)
+            
+            return True
                 
         except Exception as e:
             self.logger.error(f"Error removing PLC {plc_id}: {e}")
@@ -125,7 +202,7 @@ class PLCToPLCCommunication:
     async def add_data_mapping(self, mapping: DataMapping) -> bool:
         """Agregar mapeo de datos entre PLCs."""
         try:
-            async with self._lock:
+            with self._sync_lock:
                 # Verificar que ambos PLCs existan
                 if mapping.source_plc not in self.plcs:
                     raise CommunicationError(f"Source PLC {mapping.source_plc} not found")
@@ -134,9 +211,10 @@ class PLCToPLCCommunication:
                     raise CommunicationError(f"Target PLC {mapping.target_plc} not found")
                 
                 self.data_mappings.append(mapping)
-                self.logger.info(f"Added data mapping: {mapping.source_plc} -> {mapping.target_plc}")
-                
-                return True
+                self._rebuild_mapping_index()
+            
+            self.logger.info(f"Added data mapping: {mapping.source_plc} -> {mapping.target_plc}")
+            return True
                 
         except Exception as e:
             self.logger.error(f"Error adding data mapping: {e}")
@@ -145,20 +223,54 @@ class PLCToPLCCommunication:
     async def remove_data_mapping(self, source_plc: str, target_plc: str) -> bool:
         """Remover mapeo de datos."""
         try:
-            async with self._lock:
+            with self._sync_lock:
                 # Encontrar y remover mapeo
                 for i, mapping in enumerate(self.data_mappings):
                     if mapping.source_plc == source_plc and mapping.target_plc == target_plc:
                         del self.data_mappings[i]
-                        self.logger.info(f"Removed data mapping: {source_plc} -> {target_plc}")
-                        return True
-                
-                return False
+                        self._last_value.pop(id(mapping), None)
+                        self._rebuild_mapping_index()
+                        break
+                else:
+                    return False
+            
+            self.logger.info(f"Removed data mapping: {source_plc} -> {target_plc}")
+            return True
                 
         except Exception as e:
             self.logger.error(f"Error removing data mapping: {e}")
             return False
     
+    async def set_mapping_enabled(self, mapping: DataMapping, enabled: bool) -> None:
+        """Habilitar o deshabilitar un mapeo."""
+        with self._sync_lock:
+            mapping.enabled = enabled
+            self._rebuild_mapping_index()
+    
+    async def set_mapping_sync_mode(self, mapping: DataMapping, sync_mode: str) -> None:
+        """Cambiar el modo de sincronización de un mapeo."""
+        with self._sync_lock:
+            mapping.sync_mode = sync_mode
+            self._rebuild_mapping_index()
+    
+    def _publish_plcs(self) -> None:
+        """Publicar una instantánea inmutable de los PLCs y reindexar (con _sync_lock tomado)."""
+        self._plcs_snapshot = MappingProxyType(dict(self.plcs))
+        self._rebuild_mapping_index()
+    
+    def _rebuild_mapping_index(self) -> None:
+        """Reconstruir el índice de mapeos activos por PLC origen."""
+        index: Dict[str, List[DataMapping]] = {}
+        for mapping in self.data_mappings:
+            if (mapping.source_plc in self.plcs and
+                mapping.enabled and
+                mapping.sync_mode in POLLED_SYNC_MODES):
+                index.setdefault(mapping.source_plc, []).append(mapping)
+        
+        # Reasignación atómica: el bucle ve el índice anterior o el nuevo
+        self._active_by_source = {plc_id: tuple(mappings) for plc_id, mappings in index.items()}
+        self._batch_plans.clear()
+    
     async def start_communication(self) -> bool:
         """Iniciar comunicación PLC-PLC."""
         try:
@@ -167,12 +279,24 @@ class PLCToPLCCommunication:
                     return True
                 
                 self.running = True
+                self._stop_event.clear()
+                
+                # El destino pudo cambiar mientras estaba detenida: reescribir todo
+                self._last_value.clear()
+                
+                # Escritores que drenan la cola de sincronización
+                self._writer_tasks = [
+                    asyncio.create_task(self._sync_writer())
+                    for _ in range(SYNC_WRITERS)
+                ]
                 
                 # Iniciar sincronización para todos los PLCs master
-                for plc_id, plc in self.plcs.items():
+                for plc_id, plc in self._plcs_snapshot.items():
                     if plc.is_master and plc.enabled:
                         await self._start_sync_for_plc(plc_id)
                 
+                self._scheduler_task = asyncio.create_task(self._sync_scheduler())
+                
                 self.logger.info("PLC-PLC communication started")
                 return True
                 
@@ -188,10 +312,28 @@ class PLCToPLCCommunication:
                     return True
                 
                 self.running = False
+                self._stop_event.set()
+                self._sched_wakeup.set()
+                
+                # Detener el planificador y la sincronización de todos los PLCs
+                if self._scheduler_task is not None:
+                    self._scheduler_task.cancel()
+                    await asyncio.gather(self._scheduler_task, return_exceptions=True)
+                    self._scheduler_task = None
                 
-                # Detener todas las tareas de sincronización
                 for plc_id in list(self.sync_tasks.keys()):
                     await self._stop_sync_for_plc(plc_id)
+                self._sync_heap.clear()
+                self._sync_deadline.clear()
+                self._intervals.clear()
+                
+                for task in self._writer_tasks:
+                    task.cancel()
+                await asyncio.gather(*self._writer_tasks, return_exceptions=True)
+                self._writer_tasks = []
+                
+                # Descartar valores pendientes de una sesión anterior
+                self._sync_q = asyncio.Queue(maxsize=SYNC_QUEUE_SIZE)
                 
                 self.logger.info("PLC-PLC communication stopped")
                 return True
@@ -204,8 +346,7 @@ class PLCToPLCCommunication:
         """Sincronizar datos una vez según el mapeo."""
         try:
             # Leer datos del PLC origen
-            source_plc = self.plcs[mapping.source_plc]
-            from ..protocols.base import ReadRequest, WriteRequest
+            source_plc = self._plcs_snapshot[mapping.source_plc]
             
             read_request = ReadRequest(
                 address=mapping.source_address,
@@ -218,28 +359,111 @@ class PLCToPLCCommunication:
             if not source_data:
                 return False
             
-            # Escribir datos al PLC destino
-            target_plc = self.plcs[mapping.target_plc]
-            
-            write_request = WriteRequest(
-                address=mapping.target_address,
-                value=source_data[0],
-                data_type=mapping.target_data_type
-            )
-            
-            success = await target_plc.protocol.write_data(write_request)
-            
-            if success and self.on_data_sync:
-                await self.on_data_sync(mapping, source_data[0])
+            if self._unchanged(mapping, source_data[0]):
+                return True
             
-            return success
+            # Escribir datos al PLC destino
+            return await self._write_target(mapping, source_data[0])
             
         except Exception as e:
+            self._last_value.pop(id(mapping), None)
             self.logger.error(f"Error syncing data: {e}")
             if self.on_error:
                 await self.on_error(mapping, e)
             return False
     
+    async def sync_all_once(self) -> List[bool]:
+        """Sincronizar una vez todos los mapeos habilitados, en paralelo."""
+        results = await asyncio.gather(
+            *(self.sync_data_once(mapping) for mapping in self.data_mappings if mapping.enabled),
+            return_exceptions=True
+        )
+        return [result is True for result in results]
+    
+    def _unchanged(self, mapping: DataMapping, value: Any) -> bool:
+        """True si el mapeo es on_change y el valor coincide con el último escrito."""
+        if mapping.sync_mode != "on_change" or id(mapping) not in self._last_value:
+            return False
+        last = self._last_value[id(mapping)]
+        if isinstance(value, float) or isinstance(last, float):
+            return abs(value - last) <= mapping.deadband
+        return value == last
+    
+    def _remember_write(self, mapping: DataMapping, value: Any, success: bool) -> None:
+        """Guardar el valor escrito; si falló, olvidarlo para reintentar en el próximo ciclo."""
+        if success:
+            self._last_value[id(mapping)] = value
+        else:
+            self._last_value.pop(id(mapping), None)
+    
+    def _target_semaphore(self, plc_id: str) -> asyncio.Semaphore:
+        """Semáforo que limita las escrituras concurrentes a un PLC destino."""
+        semaphore = self._per_plc_sem.get(plc_id)
+        if semaphore is None:
+            semaphore = self._per_plc_sem[plc_id] = asyncio.Semaphore(TARGET_MAX_WRITES)
+        return semaphore
+    
+    async def _write_target(self, mapping: DataMapping, value: Any) -> bool:
+        """Escribir un valor ya leído en el PLC destino del mapeo."""
+        target_plc = self._plcs_snapshot[mapping.target_plc]
+        
+        write_request = WriteRequest(
+            address=mapping.target_address,
+            value=value,
+            data_type=mapping.target_data_type
+        )
+        
+        async with self._target_semaphore(mapping.target_plc):
+            success = await target_plc.protocol.write_data(write_request)
+        self._remember_write(mapping, value, success)
+        
+        if success and self.on_data_sync:
+            await self.on_data_sync(mapping, value)
+        
+        return success
+    
+    async def _write_block(self, mappings: List[DataMapping], values: List[Any]) -> bool:
+        """Escribir en una sola petición los valores de mapeos con destinos consecutivos."""
+        first = mappings[0]
+        target_plc = self._plcs_snapshot[first.target_plc]
+        
+        write_request = WriteRequest(
+            address=first.target_address,
+            value=list(values),
+            data_type=first.target_data_type
+        )
+        
+        async with self._target_semaphore(first.target_plc):
+            success = await target_plc.protocol.write_data(write_request)
+        for mapping, value in zip(mappings, values):
+            self._remember_write(mapping, value, success)
+        
+        if success and self.on_data_sync:
+            for mapping, value in zip(mappings, values):
+                await self.on_data_sync(mapping, value)
+        
+        return success
+    
+    async def _sync_writer(self) -> None:
+        """Consumidor del pipeline: escribe en destino los valores encolados."""
+        while True:
+            mappings, values = await self._sync_q.get()
+            try:
+                if mappings[0].target_plc in self._plcs_snapshot:
+                    if len(mappings) == 1:
+                        await self._write_target(mappings[0], values[0])
+                    else:
+                        await self._write_block(mappings, values)
+            except Exception as e:
+                for mapping in mappings:
+                    self._last_value.pop(id(mapping), None)
+                self.logger.error(f"Error syncing data: {e}")
+                if self.on_error:
+                    for mapping in mappings:
+                        await self.on_error(mapping, e)
+            finally:
+                self._sync_q.task_done()
+    
     async def get_network_status(self) -> Dict[str, Any]:
         """Obtener estado de la red PLC-PLC."""
         status = {
@@ -249,7 +473,7 @@ class PLCToPLCCommunication:
             'sync_tasks': len(self.sync_tasks)
         }
         
-        for plc_id, plc in self.plcs.items():
+        for plc_id, plc in self._plcs_snapshot.items():
             plc_status = await plc.protocol.get_status()
             status['plcs'][plc_id] = {
                 'name': plc.name,
@@ -268,40 +492,208 @@ class PLCToPLCCommunication:
         if plc_id in self.sync_tasks:
             return
         
-        plc = self.plcs[plc_id]
+        # El planificador lo atiende en su próxima vuelta
+        self.sync_tasks[plc_id] = {}
+        self._intervals[plc_id] = self._plcs_snapshot[plc_id].sync_interval / 1000
+        self._schedule(plc_id, asyncio.get_running_loop().time())
+        self._sched_wakeup.set()
+        self.logger.info(f"Started sync for PLC {plc_id}")
+    
+    def set_sync_interval(self, plc_id: str, interval_ms: int) -> None:
+        """Cambiar en caliente el intervalo de sincronización de un PLC."""
+        self._plcs_snapshot[plc_id].sync_interval = interval_ms
+        if plc_id in self.sync_tasks:
+            self._intervals[plc_id] = interval_ms / 1000
+    
+    def _schedule(self, plc_id: str, deadline: float) -> None:
+        """Encolar el próximo vencimiento de un PLC."""
+        self._sync_deadline[plc_id] = deadline
+        heapq.heappush(self._sync_heap, (deadline, plc_id))
+    
+    async def _sync_scheduler(self) -> None:
+        """
+        Planificador único de sincronización.
         
-        async def sync_loop():
-            while self.running and plc_id in self.plcs:
+        Mantiene un heap (vencimiento, plc_id): duerme hasta el primero, sincroniza
+        a la vez todos los PLCs vencidos y los vuelve a encolar con su próximo
+        vencimiento. Un solo task y un solo sleep para toda la red.
+        """
+        loop = asyncio.get_running_loop()
+        heap = self._sync_heap
+        stop = self._stop_event
+        wakeup = self._sched_wakeup
+        deadlines = self._sync_deadline
+        synced = self.sync_tasks
+        sync_tick = self._sync_tick
+        heappop = heapq.heappop
+        
+        while not stop.is_set():
+            delay = heap[0][0] - loop.time() if heap else None
+            if delay is None or delay > 0:
+                # Dormir hasta el próximo vencimiento, hasta que se añada un PLC o
+                # hasta la parada (stop_communication también activa el evento)
+                wakeup.clear()
                 try:
-                    # Encontrar mapeos donde este PLC es origen
-                    for mapping in self.data_mappings:
-                        if (mapping.source_plc == plc_id and 
-                            mapping.enabled and 
-                            mapping.sync_mode == "continuous"):
-                            
-                            await self.sync_data_once(mapping)
-                    
-                    # Esperar intervalo de sincronización
-                    await asyncio.sleep(plc.sync_interval / 1000)
-                    
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    self.logger.error(f"Error in sync loop for PLC {plc_id}: {e}")
-                    await asyncio.sleep(1)
+                    await asyncio.wait_for(wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            now = loop.time()
+            due_plcs = []
+            while heap and heap[0][0] <= now:
+                deadline, plc_id = heappop(heap)
+                # remove_plc detiene su sincronización, no hace falta mirar self.plcs
+                if deadlines.get(plc_id) == deadline and plc_id in synced:
+                    due_plcs.append(plc_id)
+            
+            wake_times = await asyncio.gather(
+                *(sync_tick(plc_id, now) for plc_id in due_plcs)
+            )
+            
+            for plc_id, wake_at in zip(due_plcs, wake_times):
+                if plc_id in synced:
+                    self._schedule(plc_id, wake_at)
+    
+    async def _sync_tick(self, plc_id: str, now: float) -> float:
+        """Sincronizar los mapeos vencidos de un PLC; devuelve su próximo vencimiento."""
+        try:
+            plc = self._plcs_snapshot[plc_id]
+            
+            # Próximo vencimiento de cada mapeo según su propio sync_interval,
+            # en el reloj monotónico del event loop
+            next_due = self.sync_tasks.get(plc_id, {})
+            due_times = {}
+            due_mappings: List[DataMapping] = []
+            
+            # Mapeos activos donde este PLC es origen
+            for mapping in self._active_by_source.get(plc_id, ()):
+                due = next_due.get(id(mapping), now)
+                if due <= now:
+                    due_mappings.append(mapping)
+                    due = now + mapping.sync_interval / 1000
+                due_times[id(mapping)] = due
+            
+            # Solo se conservan los mapeos vigentes
+            if plc_id in self.sync_tasks:
+                self.sync_tasks[plc_id] = due_times
+            
+            if due_mappings:
+                await self._read_and_enqueue(plc, due_mappings)
+            
+            # Volver cuando venza el mapeo más próximo
+            return min(due_times.values(), default=now + self._intervals.get(plc_id, 1.0))
+            
+        except Exception as e:
+            self.logger.error(f"Error in sync loop for PLC {plc_id}: {e}")
+            return now + 1
+    
+    def _plan_batches(self, plc: PLCNode,
+                      mappings: List[DataMapping]) -> List[Tuple[ReadRequest, List[Tuple[int, DataMapping]]]]:
+        """
+        Agrupar las lecturas de un PLC en bloques de direcciones cercanas.
         
-        self.sync_tasks[plc_id] = asyncio.create_task(sync_loop())
-        self.logger.info(f"Started sync for PLC {plc_id}")
+        Devuelve (petición, [(offset, mapeo), ...]) por lectura; los mapeos que no
+        admiten bloque se leen por separado con offset 0.
+        """
+        batches = []
+        runs: Dict[str, List[Tuple[int, DataMapping]]] = {}
+        
+        for mapping in mappings:
+            address = _block_address(plc.protocol, mapping.source_address, mapping.source_data_type)
+            if address is None:
+                request = ReadRequest(
+                    address=mapping.source_address,
+                    count=1,
+                    data_type=mapping.source_data_type
+                )
+                batches.append((request, [(0, mapping)]))
+            else:
+                runs.setdefault(mapping.source_data_type, []).append((address, mapping))
+        
+        # Fusionar por tipo las direcciones ordenadas mientras el hueco sea pequeño
+        for data_type, entries in runs.items():
+            entries.sort(key=lambda entry: entry[0])
+            members: List[Tuple[int, DataMapping]] = []
+            start = last = entries[0][0]
+            
+            for address, mapping in entries:
+                if members and (address - last > BLOCK_GAP_THRESHOLD or
+                                address - start >= BLOCK_MAX_SPAN):
+                    batches.append((ReadRequest(address=start, count=last - start + 1,
+                                                data_type=data_type), members))
+                    members = []
+                if not members:
+                    start = address
+                members.append((address - start, mapping))
+                last = address
+            
+            batches.append((ReadRequest(address=start, count=last - start + 1,
+                                        data_type=data_type), members))
+        
+        return batches
+    
+    def _plan_writes(self, values: List[Tuple[DataMapping, Any]]) -> List[Tuple[list, list]]:
+        """Agrupar los valores leídos en escrituras, omitiendo los on_change sin cambios."""
+        writes = []
+        runs: Dict[Tuple[str, str], List[Tuple[int, DataMapping, Any]]] = {}
+        
+        for mapping, value in values:
+            if self._unchanged(mapping, value):
+                continue
+            target_plc = self._plcs_snapshot.get(mapping.target_plc)
+            address = _block_address(target_plc.protocol if target_plc else None,
+                                     mapping.target_address, mapping.target_data_type)
+            if address is None:
+                writes.append(([mapping], [value]))
+            else:
+                runs.setdefault((mapping.target_plc, mapping.target_data_type), []).append(
+                    (address, mapping, value)
+                )
+        
+        # Solo se unen direcciones estrictamente consecutivas para no pisar huecos
+        for entries in runs.values():
+            entries.sort(key=lambda entry: entry[0])
+            last = None
+            for address, mapping, value in entries:
+                if last is None or address != last + 1:
+                    writes.append(([], []))
+                writes[-1][0].append(mapping)
+                writes[-1][1].append(value)
+                last = address
+        
+        return writes
+    
+    async def _read_and_enqueue(self, plc: PLCNode, mappings: List[DataMapping]) -> None:
+        """Leer en bloques los mapeos vencidos de un PLC y encolar sus escrituras."""
+        key = tuple(map(id, mappings))
+        cached = self._batch_plans.get(plc.id)
+        if cached is None or cached[0] != key:
+            cached = (key, self._plan_batches(plc, mappings))
+            self._batch_plans[plc.id] = cached
+        batches = cached[1]
+        
+        results = await plc.protocol.read_multiple([request for request, _ in batches])
+        
+        values = []
+        for index, (_, members) in enumerate(batches):
+            data = results.get(index)
+            if not data:
+                continue
+            for offset, mapping in members:
+                if offset < len(data):
+                    values.append((mapping, data[offset]))
+        
+        for write in self._plan_writes(values):
+            # put() bloquea si los escritores van atrasados (back-pressure)
+            await self._sync_q.put(write)
     
     async def _stop_sync_for_plc(self, plc_id: str) -> None:
         """Detener sincronización para un PLC específico."""
-        if plc_id in self.sync_tasks:
-            self.sync_tasks[plc_id].cancel()
-            try:
-                await self.sync_tasks[plc_id]
-            except asyncio.CancelledError:
-                pass
-            del self.sync_tasks[plc_id]
+        if self.sync_tasks.pop(plc_id, None) is not None:
+            # Su entrada en el heap se descarta al vencer
+            self._sync_deadline.pop(plc_id, None)
+            self._intervals.pop(plc_id, None)
             self.logger.info(f"Stopped sync for PLC {plc_id}")
 
 
@@ -320,6 +712,7 @@ class PLCNetwork:
         self.config: Dict[str, Any] = {}
         self.auto_recovery = True
         self.recovery_interval = 5000  # ms
+        self._recovery_task: Optional[asyncio.Task] = None
         
         # Configurar callbacks
         self.communication.on_data_sync = self._on_data_sync
@@ -351,9 +744,12 @@ class PLCNetwork:
         try:
             success = await self.communication.start_communication()
             
-            if success and self.auto_recovery:
-                # Iniciar tarea de recuperación automática
-                asyncio.create_task(self._auto_recovery_loop())
+            if success and self.auto_recovery and (
+                    self._recovery_task is None or self._recovery_task.done()):
+                # Iniciar tarea de recuperación automática (se guarda para cancelarla)
+                self._recovery_task = asyncio.create_task(
+                    self._auto_recovery_loop(), name="plc-recovery"
+                )
             
             return success
             
@@ -364,6 +760,12 @@ class PLCNetwork:
     async def stop_network(self) -> bool:
         """Detener la red de PLCs."""
         try:
+            # Cancelar la recuperación sin esperar a que termine su sleep
+            if self._recovery_task is not None:
+                self._recovery_task.cancel()
+                await asyncio.gather(self._recovery_task, return_exceptions=True)
+                self._recovery_task = None
+            
             return await self.communication.stop_communication()
         except Exception as e:
             self.logger.error(f"Error stopping network: {e}")
@@ -411,13 +813,17 @@ class PLCNetwork:
             port=config.get('port', 502),
             timeout=config.get('timeout', 5000),
             retry_count=config.get('retry_count', 3),
-            debug=config.get('debug', False)
+            debug=config.get('debug', False),
+            tcp_no_delay=config.get('tcp_no_delay', True)
         )
         
         if protocol_type == 's7':
             return S7Protocol(protocol_config)
         elif protocol_type == 'modbus_tcp':
-            return ModbusTCP(config['host'], config.get('port', 502))
+            return ModbusTCP(
+                config['host'], config.get('port', 502),
+                tcp_no_delay=config.get('tcp_no_delay', True)
+            )
         elif protocol_type == 'modbus_rtu':
             return ModbusRTU(config['host'], config.get('baudrate', 9600))
         elif protocol_type == 'profibus_dp':
@@ -437,7 +843,8 @@ class PLCNetwork:
                 target_data_type=mapping_config['target_data_type'],
                 sync_mode=mapping_config.get('sync_mode', 'continuous'),
                 sync_interval=mapping_config.get('sync_interval', 1000),
-                enabled=mapping_config.get('enabled', True)
+                enabled=mapping_config.get('enabled', True),
+                deadband=mapping_config.get('deadband', 0.0)
             )
             
             await self.communication.add_data_mapping(mapping)
@@ -447,22 +854,45 @@ class PLCNetwork:
     
     async def _auto_recovery_loop(self) -> None:
         """Bucle de recuperación automática."""
+        stop = self.communication._stop_event
         while self.communication.running:
             try:
-                await asyncio.sleep(self.recovery_interval / 1000)
+                # Esperar el intervalo, saliendo en cuanto se detenga la comunicación
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.recovery_interval / 1000)
+                    break
+                except asyncio.TimeoutError:
+                    pass
                 
-                # Verificar conexiones y reconectar si es necesario
-                for plc_id, plc in self.communication.plcs.items():
-                    status = await plc.protocol.get_status()
-                    if not status.is_connected and plc.enabled:
-                        self.logger.info(f"Attempting to reconnect PLC {plc_id}")
-                        await plc.protocol.connect()
+                # Verificar todas las conexiones a la vez
+                plcs = [plc for plc in self.communication._plcs_snapshot.values() if plc.enabled]
+                statuses = await asyncio.gather(
+                    *(plc.protocol.get_status() for plc in plcs),
+                    return_exceptions=True
+                )
+                
+                # Reconectar en paralelo los caídos: un PLC muerto no retrasa a los demás
+                await asyncio.gather(*(
+                    self._reconnect_plc(plc)
+                    for plc, status in zip(plcs, statuses)
+                    if isinstance(status, Exception) or not status.is_connected
+                ))
                         
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Error in auto recovery loop: {e}")
     
+    async def _reconnect_plc(self, plc: PLCNode) -> None:
+        """Intentar reconectar un PLC, sin pasar de medio intervalo de recuperación."""
+        self.logger.info(f"Attempting to reconnect PLC {plc.id}")
+        try:
+            await asyncio.wait_for(plc.protocol.connect(), timeout=self.recovery_interval / 2000)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Reconnect of PLC {plc.id} timed out")
+        except Exception as e:
+            self.logger.error(f"Error reconnecting PLC {plc.id}: {e}")
+    
     async def _on_data_sync(self, mapping: DataMapping, value: Any) -> None:
         """Callback cuando se sincronizan datos."""
         self.logger.debug(f"Data synced: {mapping.source_plc} -> {mapping.target_plc}: {value}")
@@ -510,12 +510,16 @@ class VFDProtocol:
             port=config.get('port', 502),
             timeout=config.get('timeout', 5000),
             retry_count=config.get('retry_count', 3),
-            debug=config.get('debug', False)
+            debug=config.get('debug', False),
+            tcp_no_delay=config.get('tcp_no_delay', True)
         )
         
         # Crear protocolo
         if protocol_type == 'modbus_tcp':
-            protocol = ModbusTCP(config['host'], config.get('port', 502))
+            protocol = ModbusTCP(
+                config['host'], config.get('port', 502),
+                tcp_no_delay=config.get('tcp_no_delay', True)
+            )
         elif protocol_type == 'modbus_rtu':
             protocol = ModbusRTU(config['host'], config.get('baudrate', 9600))
         elif protocol_type == 'profibus_dp':
@@ -132,7 +132,7 @@ class PLCConnection:
             if self.state == ConnectionState.DISCONNECTED:
                 return
             
-            self._stop_heartbeat()
+            self.stop_heartbeat()
             self.state = ConnectionState.DISCONNECTED
             
             try:
@@ -196,12 +196,20 @@ class PLCConnection:
         )
         self._heartbeat_thread.start()
     
-    def _stop_heartbeat(self):
-        """Detiene el thread de heartbeat."""
+    def stop_heartbeat(self):
+        """Detiene el thread de heartbeat (una reconexión lo vuelve a iniciar)."""
         self._stop_event.set()
         if self._heartbeat_thread and self._heartbeat_thread.is_alive():
             self._heartbeat_thread.join(timeout=1.0)
     
+    def set_heartbeat_interval(self, interval: int):
+        """Cambia el intervalo del heartbeat en ms; 0 lo detiene."""
+        self.config.heartbeat_interval = interval
+        if interval <= 0:
+            self.stop_heartbeat()
+        elif self.is_connected():
+            self._start_heartbeat()
+    
     def _heartbeat_loop(self):
         """Loop principal del heartbeat."""
         while not self._stop_event.is_set():
@@ -335,6 +343,14 @@ class SiemensPLC:
         """Verifica si está conectado."""
         return self.connection.is_connected()
     
+    def stop_heartbeat(self):
+        """Detiene el heartbeat de la conexión actual (una reconexión lo vuelve a iniciar)."""
+        self.connection.stop_heartbeat()
+    
+    def set_heartbeat_interval(self, interval: int):
+        """Cambia el intervalo del heartbeat en ms; 0 lo detiene."""
+        self.connection.set_heartbeat_interval(interval)
+    
     def get_connection_info(self) -> Dict[str, Any]:
         """Obtiene información de la conexión."""
         return self.connection.get_connection_info()
@@ -353,6 +369,20 @@ class SiemensPLC:
                 details={"area": area, "db_number": db_number, "start": start, "size": size, "error": str(e)}
             )
     
+    def read_multi_vars(self, items):
+        """Lee varias áreas en una sola petición S7 (array de S7DataItem, rellenado en el sitio)."""
+        if not self.is_connected():
+            raise PLCConnectionError("No hay conexión activa con el PLC")
+        
+        try:
+            return self.connection.client.read_multi_vars(items)
+        except Exception as e:
+            raise PLCCommunicationError(
+                "Error en lectura multi-variable",
+                operation="read_multi_vars",
+                details={"items": len(items), "error": str(e)}
+            )
+    
     def write_area(self, area: Area, db_number: int, start: int, data: bytes) -> bool:
         """Escribe en un área de memoria del PLC."""
         if not self.is_connected():
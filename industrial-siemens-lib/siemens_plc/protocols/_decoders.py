@@ -0,0 +1,58 @@
+"""
+Modbus Register Codecs
+======================
+
+Decodificadores y codificadores precompilados (struct.Struct) para valores
+big-endian dentro de bloques de registros Modbus.
+
+Cada decodificador tiene la firma de Struct.unpack_from (buffer, offset) y
+devuelve una tupla; cada codificador la de Struct.pack_into
+(buffer, offset, value).
+"""
+
+import struct
+
+_UINT16 = struct.Struct('>H')
+_INT16 = struct.Struct('>h')
+_UINT32 = struct.Struct('>I')
+_INT32 = struct.Struct('>i')
+_FLOAT32 = struct.Struct('>f')
+
+
+def _decode_bool(buffer, offset):
+    """Decodificar un booleano como el bit 0 de un registro."""
+    return (bool(_UINT16.unpack_from(buffer, offset)[0] & 0x0001),)
+
+
+def _encode_bool(buffer, offset, value):
+    """Codificar un booleano como registro 0/1."""
+    _UINT16.pack_into(buffer, offset, 1 if value else 0)
+
+
+_DECODERS = {
+    'bool': _decode_bool,
+    'uint16': _UINT16.unpack_from,
+    'int16': _INT16.unpack_from,
+    'uint32': _UINT32.unpack_from,
+    'int32': _INT32.unpack_from,
+    'float32': _FLOAT32.unpack_from
+}
+
+_ENCODERS = {
+    'bool': _encode_bool,
+    'uint16': _UINT16.pack_into,
+    'int16': _INT16.pack_into,
+    'uint32': _UINT32.pack_into,
+    'int32': _INT32.pack_into,
+    'float32': _FLOAT32.pack_into
+}
+
+# Ancho en registros de 16 bits de cada tipo de dato
+REGISTER_WIDTHS = {
+    'bool': 1,
+    'uint16': _UINT16.size // 2,
+    'int16': _INT16.size // 2,
+    'uint32': _UINT32.size // 2,
+    'int32': _INT32.size // 2,
+    'float32': _FLOAT32.size // 2
+}
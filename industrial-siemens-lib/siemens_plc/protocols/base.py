@@ -11,6 +11,7 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 import asyncio
 import logging
+import socket
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -40,6 +41,7 @@ class ProtocolConfig:
     debug: bool = False
     auto_reconnect: bool = True
     heartbeat_interval: int = 30000
+    tcp_no_delay: bool = True  # Desactivar Nagle: cada PDU sale sin esperar
     
     # Configuraciones específicas
     modbus_unit_id: int = 1
@@ -57,6 +59,7 @@ class ReadRequest:
     count: int = 1
     data_type: str = "uint16"
     timeout: Optional[int] = None
+    scan_interval: Optional[float] = None  # s, periodo de sondeo propio de la señal
 
 
 @dataclass
@@ -198,6 +201,33 @@ class BaseProtocol(ABC):
             self.logger.warning(f"Ping failed: {e}")
             return False
     
+    def get_socket(self) -> Optional[socket.socket]:
+        """
+        Obtener el socket TCP subyacente, si el protocolo lo expone.
+        
+        Returns:
+            Optional[socket.socket]: Socket de la conexión o None
+        """
+        return None
+    
+    def enable_tcp_nodelay(self) -> bool:
+        """
+        Desactivar el algoritmo de Nagle en el socket de la conexión.
+        
+        Returns:
+            bool: True si la opción quedó aplicada
+        """
+        sock = self.get_socket()
+        if sock is None or not self.config.tcp_no_delay:
+            return False
+        
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return True
+        except OSError as e:
+            self.logger.warning(f"Could not set TCP_NODELAY: {e}")
+            return False
+    
     async def get_status(self) -> ProtocolStatus:
         """
         Obtener estado actual del protocolo.
@@ -65,6 +65,7 @@ class ModbusProtocol(BaseProtocol):
                 # Conectar
                 if self._client.connect():
                     self.status.is_connected = True
+                    self.enable_tcp_nodelay()
                     await self._start_heartbeat()
                     self.logger.info(f"Connected to Modbus device at {self.config.host}")
                     return True
@@ -94,6 +95,12 @@ class ModbusProtocol(BaseProtocol):
             self.logger.error(f"Modbus disconnect error: {e}")
             return False
     
+    def get_socket(self):
+        """Obtener el socket TCP del cliente pymodbus (None en RTU)."""
+        if self.config.protocol_type != ProtocolType.MODBUS_TCP or not self._client:
+            return None
+        return getattr(self._client, 'socket', None)
+    
     async def read_data(self, request: ReadRequest) -> List[Any]:
         """Leer datos Modbus."""
         start_time = time.time()